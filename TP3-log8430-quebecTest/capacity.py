@@ -0,0 +1,116 @@
+"""Throughput / latency curves of a concurrency sweep and their saturation knee.
+
+'orchestrator.py --sweep' runs every topology at increasing client thread
+counts (and optionally target throughputs) and records them in the
+Threads and Target columns of the results.  Each sweep point is summarised
+by the median throughput and p99 latency of its tries, where the p99
+latency of a try is that of its slowest operation type.
+
+The saturation knee of each Database x Nodes x Workload curve (and driver and
+client option set, see ycsb_parser.CONFIG_DIMENSIONS, record count and number
+of client processes) is found with
+the Kneedle method: with throughput and p99 latency normalised to [0, 1]
+and the points in offered-load order, the knee is the point maximising
+throughput - latency, i.e. the last point where adding load still bought
+throughput before latency took off.  Its throughput is the capacity used
+for planning.
+
+Usage: python3 capacity.py results/sweep/ --phase run
+"""
+import argparse
+
+import numpy as np
+
+from ycsb_parser import INTENDED_PREFIX, config_dimensions
+
+CURVE_KEYS = ['Database', 'Nodes', 'Workload']
+
+# Settings of a curve beside the sweep, with the value of the tries that did not set them
+CURVE_SETTINGS = {'RecordCount': 0, 'Clients': 1}
+
+# Sections whose 99th percentile is not a request latency
+IGNORED_SECTIONS = ('OVERALL', 'CLEANUP', 'CONFIG')
+
+# Fewer points than this and a curve has no knee
+MIN_POINTS = 3
+
+
+def p99_columns(df):
+    return [column for column in df.columns
+            if column.endswith('.99thPercentileLatency(us)')
+            and not column.startswith(IGNORED_SECTIONS + (INTENDED_PREFIX,)) and '-FAILED' not in column]
+
+
+def knee_index(throughput, latency):
+    """Return the position of the Kneedle knee of a curve given in offered-load order, or None."""
+    x = np.asarray(throughput, dtype=float)
+    y = np.asarray(latency, dtype=float)
+    if len(x) < MIN_POINTS:
+        return None
+
+    def normalise(values):
+        span = np.ptp(values)
+        return (values - values.min()) / span if span else np.zeros_like(values)
+
+    return int(np.argmax(normalise(x) - normalise(y)))
+
+
+def capacity_frame(df):
+    """Return one row per sweep point with its median Throughput and P99Latency.
+
+    'Point' orders the points of a curve by offered load (thread count, then
+    target throughput with unthrottled runs last) and 'Knee' marks the
+    saturation knee of each curve.
+    """
+    import pandas as pd
+
+    if df.empty or 'Threads' not in df.columns or 'Throughput' not in df.columns:
+        return pd.DataFrame()
+    columns = p99_columns(df)
+    if not columns:
+        return pd.DataFrame()
+
+    settings = [column for column in CURVE_SETTINGS if column in df.columns]
+    keys = CURVE_KEYS + config_dimensions(df) + settings
+    df = df.assign(P99Latency=df[columns].max(axis=1),
+                   Target=df['Target'].fillna(0) if 'Target' in df.columns else 0,
+                   **{column: df[column].fillna(CURVE_SETTINGS[column]) for column in settings})
+    points = (df.groupby(keys + ['Threads', 'Target'])
+              .agg(Throughput=('Throughput', 'median'), P99Latency=('P99Latency', 'median'),
+                   Tries=('Throughput', 'size'))
+              .reset_index())
+
+    # Offered-load order: unthrottled (target 0) is the highest load of a thread count
+    points['Load'] = points['Target'].where(points['Target'] > 0, np.inf)
+    points = points.sort_values(keys + ['Threads', 'Load'], kind='stable').drop(columns='Load')
+    points['Point'] = points.groupby(keys).cumcount()
+
+    points['Knee'] = False
+    for _, curve in points.groupby(keys):
+        knee = knee_index(curve['Throughput'], curve['P99Latency'])
+        if knee is not None:
+            points.loc[curve.index[knee], 'Knee'] = True
+    return points.reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the saturation knee of each throughput / latency curve.')
+    parser.add_argument('results_dir', nargs='?', default='results/sweep/',
+                        help='directory containing the sweep result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    parser.add_argument('--all', action='store_true', help='print every sweep point, not only the knees')
+    args = parser.parse_args(argv)
+
+    from results_cache import load_results
+
+    points = capacity_frame(load_results(args.results_dir, args.phase))
+    if points.empty:
+        print(f'No sweep results (threads=... headers) found in {args.results_dir}')
+        return
+    if not args.all:
+        points = points[points['Knee']]
+    print(points.drop(columns=['Point']).to_string(index=False, float_format='%.1f'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Client processes sharing one phase, and the merging of their outputs into one section.
+
+A single YCSB process saturates before a large cluster does, and loading
+10^8 records through it takes hours, so the orchestrator can split a phase
+over several client processes started together.  A load phase gives each
+client a disjoint 'insertstart'/'insertcount' key range (partition_ranges());
+a run phase splits the operations and the target throughput between the
+clients, which either all draw keys from the whole record range or each
+from its own range.  Their outputs are merged into one logical run, written
+to the results file under a single header like any other try:
+
+- operation counts and return codes are summed;
+- the run time is the wall-clock span from the earliest client start to the
+  latest client end, and the throughput the operations of all the clients
+  over that span (a client's last status line is printed as it ends, its
+  start is that time minus its run time);
+- average latencies are weighted by the operation counts;
+- the minimum and maximum latencies are the extremes of the clients;
+- the percentiles come from the HdrHistogram logs of the clients merged
+  losslessly (hdr.py); without logs the highest percentile of the clients
+  is reported, an upper bound;
+- the status lines are merged by elapsed second, with the operations of
+  the clients summed; their interval percentiles are the clients' highest.
+
+Usage:
+    python3 clients.py results/clients/loadMongo3-A-threads=1-clients=4-try1-client*.txt \\
+        --hdr results/hdr/loadMongo3-A-threads=1-clients=4-try1-client
+"""
+import argparse
+import glob
+import os
+import re
+from datetime import datetime
+
+from timeseries import STATUS_RE, STATUS_SECTION_RE, STATUS_VALUE_RE
+from ycsb_parser import METRIC_RE
+
+# Metrics summed over the clients; the other metrics take the maximum of
+# the clients unless they are averages, minimums or percentiles
+SUMMED_METRICS = ('Operations', 'Count', 'Time(ms)')
+
+# Time stamp of the YCSB status lines: '2019-12-03 02:09:22:437'
+STAMP_FORMAT = '%Y-%m-%d %H:%M:%S:%f'
+
+# '95thPercentileLatency(us)', '99.9PercentileLatency(us)'
+PERCENTILE_RE = re.compile(r'^([\d.]+)(?:st|nd|rd|th)?PercentileLatency\(us\)$')
+
+
+def partition_ranges(insertstart, insertcount, clients):
+    """Split 'insertcount' keys from 'insertstart' into 'clients' contiguous (start, count) ranges."""
+    ranges = []
+    start = insertstart
+    for i in range(clients):
+        count = insertcount // clients + (1 if i < insertcount % clients else 0)
+        ranges.append((start, count))
+        start += count
+    return ranges
+
+
+def parse_summary(lines):
+    """Return the {(section, metric): value} summary of a client output, ignoring the other lines."""
+    summary = {}
+    for line in lines:
+        match = METRIC_RE.match(line.strip())
+        # '[READ], 100, 117.6' lines are time-series buckets
+        if not match or match.group(2).isdigit():
+            continue
+        try:
+            summary[(match.group(1), match.group(2))] = float(match.group(3))
+        except ValueError:
+            continue
+    return summary
+
+
+def parse_status(lines):
+    """Return {second: (stamp, operations, ops/sec, {section: {key: value}})} for the status lines of a client."""
+    statuses = {}
+    for line in lines:
+        line = line.strip()
+        match = STATUS_RE.search(line)
+        if not match or METRIC_RE.match(line):
+            continue
+        sections = {}
+        for section, body in STATUS_SECTION_RE.findall(match.group(4)):
+            sections[section] = {key: float(value) for key, value in STATUS_VALUE_RE.findall(body)}
+        current = float(match.group(3)) if match.group(3) is not None else 0.0
+        statuses[int(match.group(1))] = (line[:match.start()].strip(), int(match.group(2)), current, sections)
+    return statuses
+
+
+def client_end(statuses):
+    """Return the epoch seconds of the last status line of a client, printed as it ends, or None."""
+    if not statuses:
+        return None
+    try:
+        return datetime.strptime(statuses[max(statuses)][0], STAMP_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def run_span(summaries, statuses):
+    """Return the wall-clock seconds from the earliest client start to the latest client end.
+
+    Without the time stamps of every client the starts are taken as
+    aligned and the span is the longest run time.
+    """
+    runtimes = [summary.get(('OVERALL', 'RunTime(ms)'), 0) / 1000 for summary in summaries]
+    ends = [client_end(status) for status in statuses]
+    if None in ends:
+        return max(runtimes, default=0)
+    return max(ends) - min(end - runtime for end, runtime in zip(ends, runtimes))
+
+
+def merge_status_section(name, values):
+    """Merge the '[READ: Count=.., Avg=..]' part of the status lines of several clients."""
+    counts = [value.get('Count', 0) for value in values]
+    merged = []
+    for key in dict.fromkeys(key for value in values for key in value):
+        present = [value[key] for value in values if key in value]
+        if key == 'Count':
+            merged.append(f'{key}={format_value(sum(present))}')
+        elif key == 'Avg':
+            weighted = sum(value.get(key, 0) * count for value, count in zip(values, counts))
+            merged.append(f'{key}={weighted / sum(counts) if sum(counts) else max(present):.2f}')
+        elif key == 'Min':
+            merged.append(f'{key}={format_value(min(present))}')
+        else:
+            merged.append(f'{key}={format_value(max(present))}')
+    return f'[{name}: {", ".join(merged)}]'
+
+
+def merge_status(statuses):
+    """Merge the parsed status lines of the clients into one status line per elapsed second."""
+    lines = []
+    # Cumulative operations of each client, kept once it has finished
+    operations = [0] * len(statuses)
+    for second in sorted(set().union(*statuses)):
+        stamps, current, sections = [], 0.0, {}
+        for i, status in enumerate(statuses):
+            if second not in status:
+                continue
+            stamp, operations[i], client_current, client_sections = status[second]
+            stamps.append(stamp)
+            current += client_current
+            for name, values in client_sections.items():
+                sections.setdefault(name, []).append(values)
+        stamp = max(stamps)
+        parts = ' '.join(merge_status_section(name, values) for name, values in sections.items())
+        lines.append(f'{stamp + " " if stamp else ""}{second} sec: {sum(operations)} operations; '
+                     f'{current:.2f} current ops/sec; {parts}'.rstrip())
+    return lines
+
+
+def client_histograms(prefixes):
+    """Merge the '<prefix><OPERATION>.hdr' logs of every client into one histogram per operation."""
+    from hdr import read_log
+
+    histograms = {}
+    for prefix in prefixes:
+        for path in sorted(glob.glob(glob.escape(prefix) + '*.hdr')):
+            operation = os.path.basename(path)[len(os.path.basename(prefix)):-len('.hdr')]
+            # A prefix common to the clients leaves their number: '1-INSERT'
+            operation = re.sub(r'^\d+-', '', operation)
+            histogram = read_log(path)
+            if histogram is None:
+                continue
+            if operation in histograms:
+                histograms[operation].add(histogram)
+            else:
+                histograms[operation] = histogram
+    return histograms
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def merge_summaries(summaries, histograms=None, span=None):
+    """Merge the parsed summaries of the clients into the '[SECTION], Metric, value' lines of one run.
+
+    'span' is the wall-clock seconds of the run (run_span()), by default the
+    longest run time of the clients.
+    """
+    histograms = histograms or {}
+    runtimes = [summary.get(('OVERALL', 'RunTime(ms)'), 0) / 1000 for summary in summaries]
+    span = span or max(runtimes, default=0)
+    operations = sum(summary.get(('OVERALL', 'Throughput(ops/sec)'), 0) * runtime
+                     for summary, runtime in zip(summaries, runtimes))
+    keys = list(dict.fromkeys(key for summary in summaries for key in summary))
+    lines = []
+    for section, metric in keys:
+        present = [summary for summary in summaries if (section, metric) in summary]
+        values = [summary[(section, metric)] for summary in present]
+        percentile = PERCENTILE_RE.match(metric)
+        histogram = histograms.get(section)
+        if (section, metric) == ('OVERALL', 'RunTime(ms)'):
+            value = round(span * 1000)
+        elif (section, metric) == ('OVERALL', 'Throughput(ops/sec)'):
+            value = operations / span if span else sum(values)
+        elif metric in SUMMED_METRICS or metric.startswith('Return='):
+            value = sum(values)
+        elif metric == 'AverageLatency(us)':
+            weights = [summary.get((section, 'Operations'), 0) for summary in present]
+            value = (sum(v * w for v, w in zip(values, weights)) / sum(weights) if sum(weights)
+                     else sum(values) / len(values))
+        elif metric == 'MinLatency(us)':
+            value = min(values)
+        elif percentile and histogram is not None and histogram.total:
+            value = int(histogram.value_at_percentile(float(percentile.group(1))))
+        else:
+            value = max(values)
+        lines.append(f'[{section}], {metric}, {format_value(value)}')
+    return lines
+
+
+def merge_outputs(paths, hdr_prefixes=()):
+    """Merge the output files of the clients (and their HdrHistogram logs) into the lines of one run."""
+    summaries, statuses = [], []
+    for path in paths:
+        with open(path, 'r') as file:
+            lines = file.readlines()
+        summaries.append(parse_summary(lines))
+        statuses.append(parse_status(lines))
+    return merge_status(statuses) + merge_summaries(summaries, client_histograms(hdr_prefixes),
+                                                    run_span(summaries, statuses))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge the outputs of several YCSB clients into one summary.')
+    parser.add_argument('outputs', nargs='+', help='output files of the clients')
+    parser.add_argument('--hdr', nargs='+', default=[], metavar='PREFIX',
+                        help="'hdrhistogram.output.path' of the clients (or a common prefix of them)")
+    args = parser.parse_args(argv)
+    print('\n'.join(merge_outputs(args.outputs, args.hdr)))
+
+
+if __name__ == '__main__':
+    main()
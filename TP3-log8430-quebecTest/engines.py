@@ -0,0 +1,133 @@
+"""Registry of the engines the orchestrator can benchmark, and how each one is deployed.
+
+Every entry names a YCSB binding of YCSB/bin/bindings.properties and the
+deployment starting its servers on one Linux box:
+
+- 'compose': the Docker Compose clusters of this repository (redis/, mongoDB/),
+  driven by the topology classes of orchestrator.py;
+- 'container': one container of 'image' per node, node i published on
+  'port' + i of the host's loopback interface;
+- 'process': one local process running 'command' per node, on 'port' + i,
+  in its own data folder;
+- 'embedded': no server, the binding stores the records in 'data_dir' itself.
+
+'properties' are the '-p' options passed to the binding (and to loadgen.py
+when 'loadgen' names its driver); '{host}', '{port}', '{hosts}' (the
+comma-separated 'host:port' of every node) and '{data_dir}' are filled in.
+'nodes' are the node counts the entry supports, all benchmarked unless
+--nodes picks some, and 'max_clients' caps the client processes of a
+phase (an embedded store is locked by its single client).
+
+'label' is the database name of the results files ('<phase><label><nodes>.csv'),
+so it must end with a letter for the node count to parse back.  The section
+headers also carry 'engine=<name> deployment=<kind>', the Engine and
+Deployment columns of the results frame (ycsb_parser.py).
+
+Usage: python3 engines.py
+"""
+import argparse
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BINDINGS_FILE = os.path.join(BASE_DIR, 'YCSB', 'bin', 'bindings.properties')
+
+DEPLOYMENTS = ('compose', 'container', 'process', 'embedded')
+
+# A label ending with a digit would swallow the node count of '<phase><label><nodes>.csv'
+LABEL_RE = re.compile(r'^[A-Za-z][A-Za-z0-9]*[A-Za-z]$')
+
+ENGINES = {
+    'redis': {
+        'label': 'Redis',
+        'binding': 'redis',
+        'deployment': 'compose',
+        'nodes': (3, 5),
+    },
+    'redis-cluster': {
+        'label': 'RedisCluster',
+        'binding': 'redis',
+        'deployment': 'compose',
+        'nodes': (3, 5),
+    },
+    'mongo': {
+        'label': 'Mongo',
+        'binding': 'mongodb-async',
+        'deployment': 'compose',
+        'nodes': (3, 5),
+    },
+    'memcached': {
+        'label': 'Memcached',
+        'binding': 'memcached',
+        'deployment': 'container',
+        'image': 'memcached:1.6',
+        'command': ['memcached', '-m', '4096'],
+        'port': 11211,
+        # The client hashes the keys over the servers, like a Redis Cluster without replicas
+        'properties': {'memcached.hosts': '{hosts}'},
+        'nodes': (1, 3, 5),
+    },
+    'redis-local': {
+        'label': 'RedisLocal',
+        'binding': 'redis',
+        'deployment': 'process',
+        'command': ['redis-server', '--port', '{port}', '--save', '', '--appendonly', 'no'],
+        'port': 6390,
+        'properties': {'redis.host': '{host}', 'redis.port': '{port}'},
+        'loadgen': 'redis',
+        'nodes': (1,),
+    },
+    'rocksdb': {
+        'label': 'RocksDB',
+        'binding': 'rocksdb',
+        'deployment': 'embedded',
+        'properties': {'rocksdb.dir': '{data_dir}'},
+        'nodes': (1,),
+        'max_clients': 1,
+    },
+}
+
+
+def bundled_bindings(path=BINDINGS_FILE):
+    """Names of the bindings of the vendored YCSB ('redis', 'mongodb-async', ...)."""
+    if not os.path.isfile(path):
+        return set()
+    with open(path, 'r') as file:
+        return {line.split(':', 1)[0].strip() for line in file if ':' in line and not line.startswith('#')}
+
+
+def validate(engines=ENGINES, bindings=None):
+    """Raise ValueError on an entry the orchestrator or the parsers could not handle."""
+    bindings = bundled_bindings() if bindings is None else bindings
+    labels = {}
+    for name, engine in engines.items():
+        label = engine['label']
+        if not LABEL_RE.match(label):
+            raise ValueError(f'{name}: label {label!r} must be alphanumeric and end with a letter')
+        if label in labels:
+            raise ValueError(f'{name}: label {label!r} already used by {labels[label]}')
+        labels[label] = name
+        if engine['deployment'] not in DEPLOYMENTS:
+            raise ValueError(f'{name}: unknown deployment {engine["deployment"]!r}, expected one of {DEPLOYMENTS}')
+        if bindings and engine['binding'] not in bindings:
+            raise ValueError(f'{name}: binding {engine["binding"]!r} is not in {BINDINGS_FILE}')
+        if engine['deployment'] in ('container', 'process') and 'port' not in engine:
+            raise ValueError(f'{name}: a {engine["deployment"]} deployment needs a port')
+        if engine['deployment'] == 'container' and 'image' not in engine:
+            raise ValueError(f'{name}: a container deployment needs an image')
+        if engine['deployment'] == 'process' and 'command' not in engine:
+            raise ValueError(f'{name}: a process deployment needs a command')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the engine registry and list its engines.')
+    parser.parse_args(argv)
+    validate()
+    for name, engine in ENGINES.items():
+        nodes = ', '.join(str(count) for count in engine['nodes'])
+        print(f'{name:<14} {engine["label"]:<13} {engine["deployment"]:<10} {engine["binding"]:<14} nodes {nodes}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""Fault injection during the run phase and the cost of the recovery.
+
+'orchestrator.py --failover stop|kill|pause' runs every run phase for a
+fixed time and, 'after' seconds into it, stops, kills or pauses the
+container of the MongoDB primary (or of the Redis master), then restarts
+or unpauses it 'duration' seconds later.  The fault events are written with
+their wall-clock times to '<results_dir>/faults/<run name>.json' (the
+names of the HdrHistogram logs, see hdr.py), next to the results files
+whose YCSB status lines give the throughput, operation counts and
+latencies of every second of the run.
+
+Aligning both on the wall clock gives, for each try:
+
+* 'WriteRecovery(s)': time from the fault to the start of the first status
+  interval with successful writes (one status interval of resolution; NaN
+  when the writes never came back during the run);
+* 'FailedOps': operations that failed ('<OP>-FAILED' sections and
+  non-OK 'Return=' codes of the summary);
+* the throughput and write latency before the fault, until the recovery
+  and after it, and the peak latency of the whole disturbance.
+
+Usage: python3 failover.py results/failover/ --phase run
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from timeseries import TRY_KEYS, parse_status_line
+from ycsb_parser import (DATABASE_DRIVERS, SETTINGS_SEGMENT_RE, file_metadata, parse_filename, parse_header,
+                         segment_settings)
+
+# Docker commands injecting a fault and restoring the container
+FAULT_ACTIONS = {
+    'stop': ('stop', 'start'),
+    'kill': ('kill', 'start'),
+    'pause': ('pause', 'unpause'),
+}
+
+FAULT_AFTER = 10.0
+FAULT_DURATION = 20.0
+RUN_TIME = 60
+
+FAULTS_DIR = 'faults'
+
+# Wall-clock stamp of the YCSB and loadgen.py status lines: '2024-11-02 10:00:01:123'
+STAMP_FORMAT = '%Y-%m-%d %H:%M:%S:%f'
+STAMP_RE = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d:\d{3}) ')
+
+# '<phase><Database><Nodes>-<workload>[-<setting>=<value>...]-try<N>.json'
+EVENTS_FILENAME_RE = re.compile(r'^(load|run)(\w+?)(\d+)-(?:workload)?(\w+?)' + SETTINGS_SEGMENT_RE
+                                + r'-try(\d+)\.json$', re.IGNORECASE)
+
+WRITE_SECTIONS = ('UPDATE', 'INSERT', 'READ-MODIFY-WRITE')
+
+# Seconds after the recovery excluded from the 'after' window
+SETTLE_TIME = 5
+
+
+def format_stamp(moment):
+    return moment.strftime(STAMP_FORMAT)[:-3]
+
+
+def parse_stamp(text):
+    return datetime.strptime(text, STAMP_FORMAT)
+
+
+class FaultInjector:
+    """Injects one fault into a container while a phase runs.
+
+    'container' is a callable returning the container to disturb, resolved
+    when the fault is injected (the MongoDB primary can change between
+    tries); 'runner' runs the docker commands (see orchestrator.Runner).
+    """
+
+    def __init__(self, runner, container, action='stop', after=FAULT_AFTER, duration=FAULT_DURATION,
+                 run_time=RUN_TIME):
+        if action not in FAULT_ACTIONS:
+            raise ValueError(f'Unknown fault {action!r}, expected one of {sorted(FAULT_ACTIONS)}')
+        self.runner = runner
+        self.container = container
+        self.action = action
+        self.after = after
+        self.duration = duration
+        self.run_time = run_time
+
+    def describe(self):
+        return f'{self.action} the fault target {self.after:g} s into the run, restore it {self.duration:g} s later'
+
+    def _docker(self, command, container, events):
+        try:
+            self.runner(['docker', command, container], capture=True)
+            events.append({'event': command, 'container': container, 'time': format_stamp(datetime.now())})
+        except Exception as error:  # the run goes on, the failure is recorded
+            events.append({'event': command, 'container': container, 'time': format_stamp(datetime.now()),
+                           'error': str(error)})
+
+    @contextmanager
+    def injecting(self, path):
+        """Inject the fault while the body runs; the events are written to 'path' on exit."""
+        events = []
+        cancelled = threading.Event()
+
+        def inject():
+            if cancelled.wait(self.after):
+                return
+            container = self.container()
+            inject_command, restore_command = FAULT_ACTIONS[self.action]
+            self._docker(inject_command, container, events)
+            cancelled.wait(self.duration)
+            self._docker(restore_command, container, events)
+
+        thread = threading.Thread(target=inject, name='fault-injector', daemon=True)
+        started = datetime.now()
+        thread.start()
+        try:
+            yield self
+        finally:
+            # A phase that ends early still gets its container back
+            cancelled.set()
+            thread.join()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as file:
+                json.dump({'action': self.action, 'after': self.after, 'duration': self.duration,
+                           'started': format_stamp(started), 'events': events}, file, indent=1)
+
+
+def parse_events_filename(filename):
+    """Return (phase, database, nodes, driver, workload, try, settings) for a fault events filename, or None."""
+    match = EVENTS_FILENAME_RE.match(filename)
+    if not match:
+        return None
+    phase, label, nodes, workload, segment, try_number = match.groups()
+    db_name, driver = DATABASE_DRIVERS.get(label, (label, ''))
+    return phase.lower(), db_name, int(nodes), driver, workload.upper(), int(try_number), segment_settings(segment)
+
+
+def load_events(results_dir):
+    """One row per try with a fault: its action, container and FaultAt / RestoredAt wall-clock times."""
+    import pandas as pd
+
+    faults_dir = os.path.join(results_dir, FAULTS_DIR)
+    rows = []
+    for filename in sorted(os.listdir(faults_dir)) if os.path.isdir(faults_dir) else []:
+        parsed = parse_events_filename(filename)
+        if not parsed:
+            continue
+        with open(os.path.join(faults_dir, filename)) as file:
+            record = json.load(file)
+        phase, db_name, nodes, driver, workload, try_number, settings = parsed
+        row = {'Database': db_name, 'Nodes': nodes, 'Driver': driver, 'Phase': phase, 'Workload': workload,
+               'Try': try_number, 'Settings': settings, 'Action': record['action'], 'Container': None,
+               'FaultAt': pd.NaT, 'RestoredAt': pd.NaT}
+        inject_command, restore_command = FAULT_ACTIONS[record['action']]
+        for event in record['events']:
+            if event.get('error'):
+                continue
+            if event['event'] == inject_command:
+                row['FaultAt'], row['Container'] = parse_stamp(event['time']), event['container']
+            elif event['event'] == restore_command:
+                row['RestoredAt'] = parse_stamp(event['time'])
+        rows.append(row)
+    return pd.DataFrame(rows, columns=TRY_KEYS + ['Action', 'Container', 'FaultAt', 'RestoredAt'])
+
+
+def iter_status_intervals(lines):
+    """Yield (phase, workload, try, settings, wall-clock end, {section: {metric: value}}) per stamped status line."""
+    header = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith('#'):
+            header = None
+            continue
+        parsed = parse_header(line)
+        if parsed:
+            header = parsed
+            continue
+        match = STAMP_RE.match(line)
+        status = parse_status_line(line) if header and match else None
+        if not status:
+            continue
+        sections = {}
+        for section, metric, value in status[1]:
+            sections.setdefault(section, {})[metric] = value
+        yield header + (parse_stamp(match.group(1)), sections)
+
+
+def interval_rows(path):
+    """One row per status interval of a results file with its throughput, writes, failures and latencies."""
+    rows = []
+    with open(path, 'r') as file:
+        for phase, workload, try_number, settings, end, sections in iter_status_intervals(file):
+            writes = [sections[name] for name in WRITE_SECTIONS if name in sections]
+            write_count = sum(section.get('Operations', 0) for section in writes)
+            latency_sum = sum(section.get('Operations', 0) * section.get('AverageLatency(us)', 0) for section in writes)
+            maxima = [section['MaxLatency(us)'] for name, section in sections.items()
+                      if 'MaxLatency(us)' in section and name != 'OVERALL']
+            rows.append({
+                'Phase': phase, 'Workload': workload, 'Try': try_number, 'Settings': settings, 'End': end,
+                'Throughput': sections['OVERALL'].get('Throughput(ops/sec)'),
+                'Writes': write_count,
+                'Failed': sum(section.get('Operations', 0) for name, section in sections.items()
+                              if name.endswith('-FAILED')),
+                'ReadLatency': sections.get('READ', {}).get('AverageLatency(us)'),
+                'WriteLatency': latency_sum / write_count if write_count else None,
+                'MaxLatency': max(maxima) if maxima else None,
+            })
+    return rows
+
+
+def failover_series(results_dir, phase='run'):
+    """Per-interval series of the tries with a fault.
+
+    'Offset(s)' is the start of each interval relative to the fault and
+    'Time(s)' the same rounded to the second, which aligns the tries in the
+    figures.
+    """
+    import pandas as pd
+
+    events = load_events(results_dir).dropna(subset=['FaultAt'])
+    frames = []
+    for filename in sorted(os.listdir(results_dir)):
+        parsed = parse_filename(filename)
+        if not parsed or parsed[0] != phase:
+            continue
+        df = pd.DataFrame(interval_rows(os.path.join(results_dir, filename)))
+        if df.empty:
+            continue
+        for position, (name, value) in enumerate(file_metadata(filename).items()):
+            df.insert(position, name, value)
+        frames.append(df)
+    if not frames or events.empty:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True).merge(events, on=TRY_KEYS)
+    # YCSB reports the end of each interval; its start is the end of the previous one
+    df = df.sort_values(TRY_KEYS + ['End'])
+    df['Start'] = df.groupby(TRY_KEYS)['End'].shift()
+    df = df.dropna(subset=['Start'])
+    df['Offset(s)'] = (df['Start'] - df['FaultAt']).dt.total_seconds()
+    df['Time(s)'] = df['Offset(s)'].round()
+    df['Restored(s)'] = (df['RestoredAt'] - df['FaultAt']).dt.total_seconds()
+    return df.reset_index(drop=True)
+
+
+def recovery_frame(series):
+    """One row per try: write recovery time, failed operations and the throughput and latency around the fault."""
+    import numpy as np
+    import pandas as pd
+
+    rows = []
+    for key, df in series.groupby(TRY_KEYS + ['Action'], sort=True):
+        before = df[df['End'] <= df['FaultAt']]
+        faulted = df[df['Offset(s)'] >= 0]
+        recovered = faulted[faulted['Writes'] > 0]
+        recovery = recovered['Offset(s)'].iloc[0] if len(recovered) else np.nan
+        during = faulted[faulted['Offset(s)'] < recovery] if len(recovered) else faulted
+        after = faulted[faulted['Offset(s)'] >= recovery + SETTLE_TIME] if len(recovered) else faulted.iloc[:0]
+        peak = faulted[faulted['Offset(s)'] < recovery + SETTLE_TIME] if len(recovered) else faulted
+        rows.append(dict(zip(TRY_KEYS + ['Action'], key), **{
+            'WriteRecovery(s)': recovery,
+            'Restored(s)': df['Restored(s)'].iloc[0],
+            'FailedOps': int(df['Failed'].sum()),
+            'ThroughputBefore': before['Throughput'].mean(),
+            'ThroughputDuring': during['Throughput'].mean(),
+            'ThroughputAfter': after['Throughput'].mean(),
+            'WriteLatencyBefore': before['WriteLatency'].median(),
+            'WriteLatencyAfter': after['WriteLatency'].median(),
+            'PeakLatency': peak[['WriteLatency', 'MaxLatency']].max().max(),
+        }))
+    return pd.DataFrame(rows)
+
+
+def summary_failures(df):
+    """Failed operations of each try of a wide results frame, from the -FAILED sections and Return codes."""
+    failed = [column for column in df.columns
+              if (column.endswith('-FAILED.Operations')
+                  or ('.Return=' in column and not column.endswith('.Return=OK')))
+              and not column.startswith('CLEANUP')]
+    return df[TRY_KEYS].assign(SummaryFailedOps=df[failed].fillna(0).sum(axis=1) if failed else 0)
+
+
+def load_recovery(results_dir, phase='run'):
+    """recovery_frame() of a directory, joined with the failure counts of the YCSB summaries."""
+    from results_cache import load_results
+
+    series = failover_series(results_dir, phase)
+    if series.empty:
+        return series
+    recovery = recovery_frame(series)
+    results = load_results(results_dir, phase)
+    if results.empty:
+        return recovery
+    return recovery.merge(summary_failures(results), on=TRY_KEYS, how='left')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the recovery of the writes after an injected fault.')
+    parser.add_argument('results_dir', nargs='?', default='results/failover/',
+                        help='directory containing the results files and the faults/ events')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    parser.add_argument('--tries', action='store_true', help='print every try instead of the medians per cell')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    recovery = load_recovery(args.results_dir, args.phase)
+    if recovery.empty:
+        print(f'No fault events in {os.path.join(args.results_dir, FAULTS_DIR)}')
+        return
+    if not args.tries:
+        keys = ['Database', 'Nodes', 'Driver', 'Workload', 'Settings', 'Action']
+        groups = recovery.drop(columns=['Phase', 'Try']).groupby(keys, sort=True)
+        medians = groups.median()
+        medians.insert(0, 'Tries', groups.size())
+        recovery = medians.reset_index()
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(recovery.to_string(index=False, float_format='%.1f'))
+
+
+if __name__ == '__main__':
+    main()
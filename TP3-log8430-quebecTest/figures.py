@@ -0,0 +1,521 @@
+"""Headless figure generation for the benchmark results.
+
+Usage:
+    python3 figures.py list
+    python3 figures.py run --kind bar box --metrics Throughput AvgReadLatency
+    python3 figures.py load --format png svg pdf --jobs 4
+    python3 figures.py all
+
+Heavy libraries (pandas, matplotlib, seaborn) are only imported when figures
+are rendered, so '--help' and 'list' return immediately.  Figures are
+independent and rendered concurrently in worker processes with the
+non-interactive Agg backend, each one written in every requested format.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from validity import POLICIES
+
+# Sub-folder of the figures directory for each kind of figure
+KIND_DIRS = {
+    'bar': 'histogram',
+    'box': 'boxplot',
+    'timeseries': 'timeseries',
+    'spectrum': 'spectrum',
+    'capacity': 'capacity',
+    'scaling': 'scaling',
+}
+
+# Every figure that can be generated.  'metric' is a column of the dataset
+# named by 'data' (see load_dataset()), by default the wide results frame
+# (see ycsb_parser.METRIC_ALIASES).
+FIGURES = [
+    {'name': 'throughput_run_comparison_single', 'phase': 'run', 'kind': 'bar', 'metric': 'Throughput',
+     'title': 'Throughput Comparison for the Run Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)'},
+    {'name': 'read_latency_run_comparison_single', 'phase': 'run', 'kind': 'bar', 'metric': 'AvgReadLatency',
+     'title': 'Average Read Latency for the Run Phase (µs)', 'ylabel': 'Average Read Latency (µs)'},
+    {'name': 'update_latency_run_comparison_single', 'phase': 'run', 'kind': 'bar', 'metric': 'AvgUpdateLatency',
+     'title': 'Average Update Latency for the Run Phase (µs)', 'ylabel': 'Average Update Latency (µs)'},
+    {'name': 'throughput_boxplot', 'phase': 'run', 'kind': 'box', 'metric': 'Throughput',
+     'title': 'Throughput Distribution for the Run Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)'},
+    {'name': 'avg_read_latency_boxplot', 'phase': 'run', 'kind': 'box', 'metric': 'AvgReadLatency',
+     'title': 'Average Read Latency Distribution for the Run Phase (µs)', 'ylabel': 'Average Read Latency (µs)'},
+    {'name': 'avg_update_latency_boxplot', 'phase': 'run', 'kind': 'box', 'metric': 'AvgUpdateLatency',
+     'title': 'Average Update Latency Distribution for the Run Phase (µs)', 'ylabel': 'Average Update Latency (µs)'},
+    {'name': 'insert_latency_run_comparison', 'phase': 'run', 'kind': 'bar', 'metric': 'AvgInsertLatency',
+     'title': 'Average Insert Latency for the Run Phase (µs)', 'ylabel': 'Average Insert Latency (µs)'},
+    {'name': 'scan_latency_run_comparison', 'phase': 'run', 'kind': 'bar', 'metric': 'AvgScanLatency',
+     'title': 'Average Scan Latency for the Run Phase (µs)', 'ylabel': 'Average Scan Latency (µs)'},
+    {'name': 'read_modify_write_latency_run_comparison', 'phase': 'run', 'kind': 'bar',
+     'metric': 'AvgReadModifyWriteLatency', 'title': 'Average Read-Modify-Write Latency for the Run Phase (µs)',
+     'ylabel': 'Average Read-Modify-Write Latency (µs)'},
+    {'name': 'avg_insert_latency_boxplot', 'phase': 'run', 'kind': 'box', 'metric': 'AvgInsertLatency',
+     'title': 'Average Insert Latency Distribution for the Run Phase (µs)', 'ylabel': 'Average Insert Latency (µs)'},
+    {'name': 'avg_scan_latency_boxplot', 'phase': 'run', 'kind': 'box', 'metric': 'AvgScanLatency',
+     'title': 'Average Scan Latency Distribution for the Run Phase (µs)', 'ylabel': 'Average Scan Latency (µs)'},
+    {'name': 'avg_read_modify_write_latency_boxplot', 'phase': 'run', 'kind': 'box',
+     'metric': 'AvgReadModifyWriteLatency',
+     'title': 'Average Read-Modify-Write Latency Distribution for the Run Phase (µs)',
+     'ylabel': 'Average Read-Modify-Write Latency (µs)'},
+    {'name': 'load_throughput_comparison', 'phase': 'load', 'kind': 'bar', 'metric': 'Throughput',
+     'title': 'Throughput Comparison for the Load Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)'},
+    {'name': 'load_latency_comparison', 'phase': 'load', 'kind': 'bar', 'metric': 'AvgInsertLatency',
+     'title': 'Average Insert Latency for the Load Phase (µs)', 'ylabel': 'Average Latency (µs)'},
+    {'name': 'load_throughput_boxplot', 'phase': 'load', 'kind': 'box', 'metric': 'Throughput',
+     'title': 'Throughput Distribution for the Load Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)'},
+    {'name': 'load_latency_boxplot', 'phase': 'load', 'kind': 'box', 'metric': 'AvgInsertLatency',
+     'title': 'Average Insert Latency Distribution for the Load Phase (µs)', 'ylabel': 'Average Latency (µs)'},
+    {'name': 'steady_throughput_run_comparison', 'phase': 'run', 'kind': 'bar', 'metric': 'SteadyThroughput',
+     'data': 'steady', 'title': 'Steady-State Throughput for the Run Phase (ops/sec)',
+     'ylabel': 'Steady-State Throughput (ops/sec)'},
+    {'name': 'throughput_over_time_run', 'phase': 'run', 'kind': 'timeseries', 'metric': 'Throughput',
+     'data': 'series', 'title': 'Throughput over Time for the Run Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)',
+     'xlabel': 'Time (s)', 'legend': None},
+    {'name': 'throughput_over_time_load', 'phase': 'load', 'kind': 'timeseries', 'metric': 'Throughput',
+     'data': 'series', 'title': 'Throughput over Time for the Load Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)',
+     'xlabel': 'Time (s)', 'legend': None},
+    {'name': 'read_latency_spectrum_run', 'phase': 'run', 'kind': 'spectrum', 'metric': 'Latency',
+     'data': 'spectrum', 'where': {'Operation': 'READ'}, 'title': 'Read Latency by Percentile for the Run Phase (µs)',
+     'ylabel': 'Read Latency (µs)', 'xlabel': 'Percentile', 'legend': None},
+    {'name': 'update_latency_spectrum_run', 'phase': 'run', 'kind': 'spectrum', 'metric': 'Latency',
+     'data': 'spectrum', 'where': {'Operation': 'UPDATE'}, 'title': 'Update Latency by Percentile for the Run Phase (µs)',
+     'ylabel': 'Update Latency (µs)', 'xlabel': 'Percentile', 'legend': None},
+    {'name': 'scan_latency_spectrum_run', 'phase': 'run', 'kind': 'spectrum', 'metric': 'Latency',
+     'data': 'spectrum', 'where': {'Operation': 'SCAN'}, 'title': 'Scan Latency by Percentile for the Run Phase (µs)',
+     'ylabel': 'Scan Latency (µs)', 'xlabel': 'Percentile', 'legend': None},
+    {'name': 'read_modify_write_latency_spectrum_run', 'phase': 'run', 'kind': 'spectrum', 'metric': 'Latency',
+     'data': 'spectrum', 'where': {'Operation': 'READ-MODIFY-WRITE'},
+     'title': 'Read-Modify-Write Latency by Percentile for the Run Phase (µs)',
+     'ylabel': 'Read-Modify-Write Latency (µs)', 'xlabel': 'Percentile', 'legend': None},
+    {'name': 'insert_latency_spectrum_load', 'phase': 'load', 'kind': 'spectrum', 'metric': 'Latency',
+     'data': 'spectrum', 'where': {'Operation': 'INSERT'}, 'title': 'Insert Latency by Percentile for the Load Phase (µs)',
+     'ylabel': 'Insert Latency (µs)', 'xlabel': 'Percentile', 'legend': None},
+    {'name': 'ops_per_core_run', 'phase': 'run', 'kind': 'bar', 'metric': 'OpsPerCore', 'data': 'resources',
+     'title': 'Throughput per Server CPU Core for the Run Phase (ops/sec/core)', 'ylabel': 'Throughput per Core'},
+    {'name': 'bytes_per_op_run', 'phase': 'run', 'kind': 'bar', 'metric': 'BytesPerOp', 'data': 'resources',
+     'title': 'Server Network Bytes per Operation for the Run Phase', 'ylabel': 'Bytes per Operation'},
+    {'name': 'server_cpu_run', 'phase': 'run', 'kind': 'box', 'metric': 'ServerCPU', 'data': 'resources',
+     'title': 'Server CPU Usage for the Run Phase (cores)', 'ylabel': 'CPU (cores)'},
+    {'name': 'client_cpu_run', 'phase': 'run', 'kind': 'box', 'metric': 'ClientCPU', 'data': 'resources',
+     'title': 'Client CPU Usage for the Run Phase (cores)', 'ylabel': 'CPU (cores)'},
+    {'name': 'read_p99_omission_run', 'phase': 'run', 'kind': 'bar', 'metric': 'P99Inflation', 'data': 'omission',
+     'where': {'Operation': 'READ'}, 'title': 'Read p99 Latency Corrected for Coordinated Omission / Uncorrected',
+     'ylabel': 'Corrected / Uncorrected p99'},
+    {'name': 'update_p99_omission_run', 'phase': 'run', 'kind': 'bar', 'metric': 'P99Inflation', 'data': 'omission',
+     'where': {'Operation': 'UPDATE'}, 'title': 'Update p99 Latency Corrected for Coordinated Omission / Uncorrected',
+     'ylabel': 'Corrected / Uncorrected p99'},
+    {'name': 'failover_throughput_run', 'phase': 'run', 'kind': 'timeseries', 'metric': 'Throughput',
+     'data': 'failover', 'title': 'Throughput around the Injected Fault (ops/sec)', 'ylabel': 'Throughput (ops/sec)',
+     'xlabel': 'Time since the fault (s)', 'legend': None},
+    {'name': 'failover_write_latency_run', 'phase': 'run', 'kind': 'timeseries', 'metric': 'WriteLatency',
+     'data': 'failover', 'title': 'Write Latency around the Injected Fault (µs)', 'ylabel': 'Average Write Latency (µs)',
+     'xlabel': 'Time since the fault (s)', 'legend': None},
+    {'name': 'failover_recovery_run', 'phase': 'run', 'kind': 'bar', 'metric': 'WriteRecovery(s)', 'data': 'recovery',
+     'title': 'Time until the Writes Succeed again after the Fault (s)', 'ylabel': 'Write Recovery (s)'},
+    {'name': 'throughput_latency_run', 'phase': 'run', 'kind': 'capacity', 'metric': 'P99Latency',
+     'data': 'capacity', 'title': 'Throughput vs p99 Latency for the Run Phase (client sweep)',
+     'ylabel': 'p99 Latency (µs)', 'xlabel': 'Throughput (ops/sec)', 'legend': None},
+    {'name': 'memory_by_record_count_load', 'phase': 'load', 'kind': 'scaling', 'metric': 'ServerMemory',
+     'title': 'Server Memory after the Load by Record Count (bytes)', 'ylabel': 'Resident Memory (bytes)',
+     'xlabel': 'Records', 'legend': None},
+    {'name': 'disk_by_record_count_load', 'phase': 'load', 'kind': 'scaling', 'metric': 'DiskSize',
+     'title': 'On-Disk Size after the Load by Record Count (bytes)', 'ylabel': 'Data Directory Size (bytes)',
+     'xlabel': 'Records', 'legend': None},
+    {'name': 'load_throughput_by_record_count', 'phase': 'load', 'kind': 'scaling', 'metric': 'Throughput',
+     'title': 'Load Throughput by Record Count (ops/sec)', 'ylabel': 'Throughput (ops/sec)',
+     'xlabel': 'Records', 'legend': None},
+    {'name': 'throughput_by_record_count_run', 'phase': 'run', 'kind': 'scaling', 'metric': 'Throughput',
+     'title': 'Throughput by Record Count for the Run Phase (ops/sec)', 'ylabel': 'Throughput (ops/sec)',
+     'xlabel': 'Records', 'legend': None},
+    {'name': 'read_p99_by_record_count_run', 'phase': 'run', 'kind': 'scaling', 'metric': 'Read99thLatency',
+     'title': 'Read p99 Latency by Record Count for the Run Phase (µs)', 'ylabel': 'p99 Latency (µs)',
+     'xlabel': 'Records', 'legend': None},
+]
+
+FORMATS = ('png', 'svg', 'pdf')
+
+# Sweep columns labelled after the configuration when they differ between
+# tries, with the value of the tries that did not set them
+SWEEP_LABELS = {
+    'Threads': (1, '{:g} threads'),
+    'Target': (0, 'target {:g}'),
+    'RecordCount': (0, '{:g} records'),
+    'Clients': (1, '{:g} clients'),
+}
+
+# Sweep columns drawn on the x-axis of a kind of figure, so not labelled
+AXIS_COLUMNS = {
+    'capacity': ('Threads', 'Target'),
+    'scaling': ('RecordCount',),
+}
+
+
+def select_figures(phases, kinds=None, metrics=None):
+    """Return the figure specs matching the given phases, kinds and metrics."""
+    return [
+        spec for spec in FIGURES
+        if spec['phase'] in phases
+        and (not kinds or spec['kind'] in kinds)
+        and (not metrics or spec['metric'] in metrics)
+    ]
+
+
+def load_dataset(data, results_dir, phase, use_cache=True, invalid='keep', warehouse=None):
+    """Return the frame a figure is drawn from.
+
+    'results' is the wide results frame (one row per try), 'series' the
+    per-interval throughput of each try, 'steady' the results frame joined
+    with the steady-state metrics of timeseries.py and 'spectrum' the
+    latency by percentile of the merged HdrHistogram logs in '<results_dir>/hdr',
+    'capacity' the throughput / p99 latency points of a client sweep,
+    'resources' the results frame joined with the resource usage of sampler.py,
+    'omission' the corrected and uncorrected latencies of omission.py, and
+    'failover' / 'recovery' the series around an injected fault and the
+    recovery of each try (failover.py).
+    The tries flagged by validity.py are handled with the 'invalid' policy.
+    With 'warehouse', the results frame is queried from that warehouse.py
+    database instead of being parsed from 'results_dir'.
+    """
+    import pandas as pd
+    from results_cache import load_results
+    from validity import apply_policy
+
+    def results():
+        if warehouse:
+            from warehouse import Warehouse
+
+            with Warehouse(warehouse) as store:
+                return apply_policy(store.query(phase=phase, latest=True), invalid)
+        return apply_policy(load_results(results_dir, phase, use_cache=use_cache), invalid)
+
+    if data == 'results':
+        return results()
+    if data == 'capacity':
+        import capacity
+
+        return capacity.capacity_frame(results())
+    if data in ('failover', 'recovery'):
+        import failover
+
+        if data == 'failover':
+            return failover.failover_series(results_dir, phase)
+        return failover.load_recovery(results_dir, phase)
+    if data == 'omission':
+        import omission
+
+        return omission.omission_frame(results())
+    if data == 'resources':
+        import sampler
+
+        return sampler.join_resources(results(),
+                                      sampler.load_resources(results_dir, phase))
+    if data == 'spectrum':
+        import hdr
+
+        hdr_dir = os.path.join(results_dir, 'hdr')
+        return hdr.percentile_spectrum(hdr_dir, phase) if os.path.isdir(hdr_dir) else pd.DataFrame()
+
+    import timeseries
+
+    series = timeseries.load_series(results_dir, phase)
+    if data == 'series':
+        return timeseries.throughput_series(series)
+    steady = timeseries.steady_state_frame(series)
+    df = results()
+    if steady.empty:
+        return df
+    return df.merge(steady, on=timeseries.TRY_KEYS, how='left')
+
+
+def prepare_frame(df, axes=()):
+    """Add the x-axis and hue columns used by every figure.
+
+    'axes' are the sweep columns a figure draws on its x-axis (AXIS_COLUMNS),
+    left out of the labels.
+    """
+    import pandas as pd
+    from workload import workload_labels
+    from ycsb_parser import OPTION_COLUMNS, config_dimensions, settings_columns
+
+    # The frames of the series and hdr files only carry the settings key of the tries
+    if 'Settings' in df.columns:
+        expanded = pd.DataFrame(list(df['Settings'].fillna('').map(settings_columns)), index=df.index)
+        for column in expanded.columns.difference(df.columns):
+            df[column] = expanded[column]
+    # Combine 'Database' and 'Nodes' into a single column for the x-axis
+    df['Database_Nodes'] = df['Database'] + df['Nodes'].astype(int).astype(str)
+    # followed by the driver and client options that differ between tries ('Mongo3 mongodb w=majority')
+    option_names = {column: name for name, column in OPTION_COLUMNS.items()}
+    for column in config_dimensions(df):
+        values = df[column].fillna('').astype(str)
+        if values.nunique() > 1:
+            prefix = f'{option_names[column]}=' if column in option_names else ''
+            df['Database_Nodes'] += values.map(lambda value: f' {prefix}{value}' if value else '')
+    # and the sweep points of the run when they differ ('Redis5 16 threads target 2000 4 clients')
+    for column, (default, label) in SWEEP_LABELS.items():
+        if column in df.columns and column not in axes:
+            values = df[column].fillna(default)
+            if values.nunique() > 1:
+                df['Database_Nodes'] += values.map(lambda value: ' ' + label.format(value))
+    # Label the workloads with the operation mix of their YCSB/workloads file
+    df['Workload_Label'] = df['Workload'].map(workload_labels(df['Workload'].unique()))
+    return df.sort_values(['Database_Nodes', 'Workload'])
+
+
+def render_bar(spec, df):
+    import seaborn as sns
+
+    order = list(dict.fromkeys(df['Database_Nodes']))
+    hue_order = list(dict.fromkeys(df['Workload_Label']))
+    # Bars are the (possibly weighted) means of the intervals computed by stats.py
+    ax = sns.barplot(
+        data=spec['intervals'],
+        x='Database_Nodes',
+        y='Mean',
+        hue='Workload_Label',
+        order=order,
+        hue_order=hue_order,
+        palette='pastel',
+        errorbar=None  # Error bars come from the precomputed intervals
+    )
+    for container in ax.containers:
+        ax.bar_label(container, fmt='%.1f', padding=0, label_type='center', color='white')
+
+    # 95% bootstrap confidence intervals
+    intervals = spec['intervals'].set_index(['Database_Nodes', 'Workload_Label'])
+    for label, container in zip(hue_order, ax.containers):
+        for bar in container:
+            center = bar.get_x() + bar.get_width() / 2
+            key = (order[int(round(center))], label)
+            if key not in intervals.index or not bar.get_height():
+                continue
+            low, high = intervals.loc[key, ['CILow', 'CIHigh']]
+            ax.errorbar(center, bar.get_height(), yerr=[[bar.get_height() - low], [high - bar.get_height()]],
+                        color='#424242', linewidth=1.5, capsize=0.1 * 72 * bar.get_width())
+
+
+def render_box(spec, df):
+    import seaborn as sns
+
+    sns.boxplot(
+        data=df,
+        x='Database_Nodes',
+        y=spec['metric'],
+        hue='Workload_Label',
+        palette='pastel'
+    )
+
+
+def render_timeseries(spec, df):
+    import seaborn as sns
+
+    sns.lineplot(
+        data=df,
+        x='Time(s)',
+        y=spec['metric'],
+        hue='Database_Nodes',
+        style='Workload_Label',
+        errorbar=('ci', 95)
+    )
+
+
+def render_spectrum(spec, df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    ax = sns.lineplot(
+        data=df,
+        x='Nines',
+        y=spec['metric'],
+        hue='Database_Nodes',
+        style='Workload_Label'
+    )
+    # Percentiles on a 'number of nines' axis: 0%, 90%, 99%, 99.9%, ...
+    ticks = range(int(df['Nines'].max()) + 1)
+    ax.set_xticks(list(ticks))
+    ax.set_xticklabels(['0%'] + [f'{100 - 10 ** (2 - nines):g}%' for nines in ticks[1:]])
+    plt.yscale('log')
+
+
+def render_capacity(spec, df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    ax = sns.lineplot(
+        data=df.sort_values(['Database_Nodes', 'Workload', 'Point']),
+        x='Throughput',
+        y=spec['metric'],
+        hue='Database_Nodes',
+        style='Workload_Label',
+        markers=True,
+        sort=False,
+        estimator=None
+    )
+    # Circle the saturation knee of each curve (see capacity.py)
+    knees = df[df['Knee']]
+    ax.scatter(knees['Throughput'], knees[spec['metric']], s=200, facecolors='none', edgecolors='black',
+               linewidths=1.5, zorder=3, label='Saturation knee')
+    plt.yscale('log')
+
+
+def render_scaling(spec, df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.lineplot(
+        data=df,
+        x='RecordCount',
+        y=spec['metric'],
+        hue='Database_Nodes',
+        style='Workload_Label',
+        markers=True,
+        errorbar=('ci', 95)
+    )
+    # Record counts grow tenfold from one point to the next
+    plt.xscale('log')
+    plt.yscale('log')
+
+
+RENDERERS = {
+    'bar': render_bar,
+    'box': render_box,
+    'timeseries': render_timeseries,
+    'spectrum': render_spectrum,
+    'capacity': render_capacity,
+    'scaling': render_scaling,
+}
+
+
+def render_figure(spec, df, figures_dir, formats):
+    """Draw one figure and save it in every format; returns the written paths."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set the style for seaborn
+    sns.set(style="whitegrid")
+
+    output_dir = os.path.join(figures_dir, KIND_DIRS[spec['kind']])
+    os.makedirs(output_dir, exist_ok=True)
+
+    fig = plt.figure(figsize=(12, 6))
+    RENDERERS[spec['kind']](spec, df)
+    plt.title(spec['title'])
+    plt.ylabel(spec['ylabel'])
+    plt.xlabel(spec.get('xlabel', 'Database and Nodes'))
+    plt.legend(title=spec.get('legend', 'Workload'))
+    fig.tight_layout()
+
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{spec['name']}.{fmt}")
+        fig.savefig(path)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def figure_task(spec, df, cache_dir=None, invalid='keep'):
+    """Return the (spec, data) to render a figure from a prepared dataset, or None when there is no data."""
+    import stats
+
+    if spec['metric'] not in df.columns:
+        print(f"Skipping {spec['name']}: no '{spec['metric']}' data")
+        return None
+    if spec['kind'] == 'scaling' and 'RecordCount' not in df.columns:
+        print(f"Skipping {spec['name']}: no record count sweep")
+        return None
+    df = df.dropna(subset=[spec['metric']])
+    for column, value in spec.get('where', {}).items():
+        df = df[df[column] == value]
+    if df.empty:
+        print(f"Skipping {spec['name']}: no data")
+        return None
+    if spec['kind'] == 'bar':
+        # Error bars are bootstrapped once for all groups and cached
+        weights = 'Weight' if invalid == 'downweight' and 'Weight' in df.columns else None
+        spec = dict(spec, intervals=stats.cached_intervals(df, spec['metric'], cache_dir, weights=weights))
+    return spec, df
+
+
+def generate(specs, results_dir, figures_dir, formats=('png',), jobs=None, use_cache=True, invalid='keep',
+             warehouse=None):
+    """Render the given figures, in parallel worker processes when jobs != 1.
+
+    'invalid' is the validity.py policy for flagged tries: 'keep', 'exclude'
+    or 'downweight' (weighted bar heights and error bars).
+    """
+    from results_cache import CACHE_DIR
+
+    # Parse (or load from the cache) each dataset only once
+    datasets = {}
+    frames = {}
+    tasks = []
+    cache_dir = os.path.join(results_dir, CACHE_DIR) if use_cache else None
+    for spec in specs:
+        key = (spec.get('data', 'results'), spec['phase'])
+        if key not in datasets:
+            datasets[key] = load_dataset(key[0], results_dir, key[1], use_cache=use_cache, invalid=invalid,
+                                         warehouse=warehouse)
+        # and label it once per set of x-axis columns
+        axes = AXIS_COLUMNS.get(spec['kind'], ())
+        if key + (axes,) not in frames:
+            df = datasets[key]
+            frames[key + (axes,)] = prepare_frame(df.copy(), axes) if not df.empty else df
+        task = figure_task(spec, frames[key + (axes,)], cache_dir, invalid)
+        if task:
+            tasks.append(task + (figures_dir, formats))
+
+    if jobs == 1 or len(tasks) < 2:
+        results = [render_figure(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(render_figure, *zip(*tasks)))
+    return [path for paths in results for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the benchmark figures.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='list the figures that can be generated')
+    for command in ('load', 'run', 'all'):
+        sub = subparsers.add_parser(command, help=f'generate the figures of the {command} phase'
+                                    if command != 'all' else 'generate every figure')
+        sub.add_argument('--kind', nargs='+', choices=sorted(RENDERERS), help='figure kinds (default: all)')
+        sub.add_argument('--metrics', nargs='+', help='metrics to plot (default: all)')
+        sub.add_argument('--format', nargs='+', choices=FORMATS, default=['png'], dest='formats',
+                         help='output formats written in one pass (default: png)')
+        sub.add_argument('--results-dir', default='results/', help='directory containing the result files')
+        sub.add_argument('--figures-dir', default='figures/', help='directory where figures are written')
+        sub.add_argument('--jobs', type=int, default=None, help='number of rendering processes (default: all cores)')
+        sub.add_argument('--no-cache', action='store_true', help='reparse every result file')
+        sub.add_argument('--invalid', choices=POLICIES, default='keep',
+                         help='tries flagged by validity.py: keep them (default), exclude them, '
+                              'or down-weight them in the bar charts')
+        sub.add_argument('--warehouse', help='read the results from this warehouse.py database')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for spec in FIGURES:
+            print(f"{spec['phase']:5} {spec['kind']:4} {spec['metric']:20} {spec['name']}")
+        return 0
+
+    phases = ('load', 'run') if args.command == 'all' else (args.command,)
+    specs = select_figures(phases, args.kind, args.metrics)
+    if not specs:
+        print('No figure matches the given options', file=sys.stderr)
+        return 1
+
+    paths = generate(specs, args.results_dir, args.figures_dir, args.formats, args.jobs, not args.no_cache,
+                     args.invalid, args.warehouse)
+    for path in paths:
+        print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
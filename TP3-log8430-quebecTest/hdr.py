@@ -0,0 +1,380 @@
+"""HdrHistogram support: decoding YCSB histogram logs and merging them losslessly.
+
+With '-p measurementtype=hdrhistogram -p hdrhistogram.fileoutput=true' YCSB
+(and loadgen.py) writes one HdrHistogram interval log per operation
+('<output.path><OP>.hdr').
+Interval histograms that share the same configuration are merged by adding
+their bucket counts, so the percentiles of the merged histogram are exactly
+those of the union of all recorded latencies (within the histogram
+precision), unlike averages of per-try percentiles.
+
+The benchmark scripts name the logs '<phase><Database><Nodes>-<workload>-try<N>-<OP>.hdr',
+with the settings of the run between the workload and the try
+('runMongo3-A-threads=16-target=0-try2-READ.hdr'); a try split over several
+client processes has one log per client ('...-try<N>-client<I>-<OP>.hdr',
+see clients.py), merged into its try.  The logs are merged per configuration:
+the runs of different thread counts, targets or client options are not pooled.
+
+Usage: python3 hdr.py results/hdr/ --percentiles 50 99 99.9 99.99
+"""
+import argparse
+import base64
+import os
+import re
+import struct
+import zlib
+
+import numpy as np
+
+from ycsb_parser import DATABASE_DRIVERS, SETTINGS_SEGMENT_RE, segment_settings, settings_columns
+
+# Encoding cookies of the V2 format, with the word size bits masked out
+V2_ENCODING_COOKIE = 0x1c849303
+V2_COMPRESSED_ENCODING_COOKIE = 0x1c849304
+
+# Word size bits of the cookies written by the Java implementation
+WORD_SIZE_BITS = 0x10
+
+# Header of an encoded histogram: cookie, payload length, normalizing index
+# offset, significant digits, lowest and highest trackable values, ratio
+ENCODING_HEADER = struct.Struct('>iiiiqqd')
+
+# '<phase><Database><Nodes>-<workload>[-<setting>=<value>...]-try<N>[-client<I>]-<OP>.hdr'
+LOG_FILENAME_RE = re.compile(r'^(load|run)(\w+?)(\d+)-(?:workload)?(\w+?)' + SETTINGS_SEGMENT_RE
+                             + r'-try(\d+)(?:-client\d+)?-(.+)\.hdr$', re.IGNORECASE)
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9, 99.99)
+
+
+class Histogram:
+    """A counts-only HdrHistogram using the same bucket layout as the Java one."""
+
+    def __init__(self, lowest=1, highest=3600 * 1000 * 1000, digits=3):
+        self.lowest = lowest
+        self.highest = highest
+        self.digits = digits
+
+        largest_single_unit = 2 * 10 ** digits
+        sub_bucket_count_magnitude = int(np.ceil(np.log2(largest_single_unit)))
+        self.sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self.unit_magnitude = int(np.floor(np.log2(lowest)))
+        self.sub_bucket_count = 1 << (self.sub_bucket_half_count_magnitude + 1)
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+
+        # Number of power-of-two buckets needed to cover 'highest'
+        smallest_untrackable = self.sub_bucket_count << self.unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = np.zeros((bucket_count + 1) * self.sub_bucket_half_count, dtype=np.int64)
+
+    @property
+    def config(self):
+        return self.lowest, self.highest, self.digits
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def index_of(self, values):
+        """Return the counts index of each value (vectorised)."""
+        values = np.asarray(values, dtype=np.int64)
+        # frexp() exponents are the bit lengths of the (exactly representable) values
+        pow2_ceiling = np.frexp((values | self.sub_bucket_mask).astype(np.float64))[1]
+        bucket_index = pow2_ceiling - self.unit_magnitude - (self.sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = values >> (bucket_index + self.unit_magnitude)
+        return ((bucket_index + 1) << self.sub_bucket_half_count_magnitude) + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def value_of(self, indexes):
+        """Return the lowest value of each counts index (vectorised)."""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        bucket_index = (indexes >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (indexes & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        first_bucket = bucket_index < 0
+        sub_bucket_index = np.where(first_bucket, sub_bucket_index - self.sub_bucket_half_count, sub_bucket_index)
+        bucket_index = np.where(first_bucket, 0, bucket_index)
+        return sub_bucket_index << (bucket_index + self.unit_magnitude)
+
+    def highest_equivalent(self, indexes):
+        """Return the highest value counted in each counts index (vectorised)."""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return self.value_of(indexes + 1) - 1
+
+    def record(self, values):
+        """Record one value or an array of values, clipped to the trackable range."""
+        values = np.clip(np.atleast_1d(np.asarray(values, dtype=np.int64)), 0, self.highest)
+        self.counts += np.bincount(self.index_of(values), minlength=len(self.counts))[:len(self.counts)]
+
+    def resize(self, highest):
+        """Widen the trackable range up to 'highest'; the existing buckets keep their indexes."""
+        if highest <= self.highest:
+            return
+        wider = type(self)(self.lowest, highest, self.digits)
+        wider.counts[:len(self.counts)] = self.counts
+        self.highest, self.counts = highest, wider.counts
+
+    def add(self, other):
+        """Add the counts of another histogram, widening this one to its range first.
+
+        YCSB's auto-resizing recorders write intervals with different highest
+        trackable values but the same bucket layout; a histogram of another
+        precision is re-recorded at the lowest value of each of its buckets,
+        as the Java add() does.
+        """
+        self.resize(other.highest)
+        if (other.lowest, other.digits) == (self.lowest, self.digits):
+            self.counts[:len(other.counts)] += other.counts
+            return
+        nonzero = np.flatnonzero(other.counts)
+        values = np.clip(other.value_of(nonzero), 0, self.highest)
+        self.counts += np.bincount(self.index_of(values), weights=other.counts[nonzero],
+                                   minlength=len(self.counts)).astype(np.int64)[:len(self.counts)]
+
+    def value_at_percentile(self, percentile):
+        return self.values_at_percentiles([percentile])[0]
+
+    def values_at_percentiles(self, percentiles):
+        """Return the value at each percentile, as HdrHistogram reports it."""
+        total = self.total
+        if not total:
+            return np.zeros(len(percentiles), dtype=np.int64)
+        percentiles = np.minimum(np.asarray(percentiles, dtype=float), 100)
+        targets = np.maximum(1, np.floor(percentiles / 100 * total + 0.5)).astype(np.int64)
+        indexes = np.searchsorted(np.cumsum(self.counts), targets)
+        return self.highest_equivalent(indexes)
+
+    def min(self):
+        nonzero = np.flatnonzero(self.counts)
+        return int(self.value_of(nonzero[0])) if len(nonzero) else 0
+
+    def max(self):
+        nonzero = np.flatnonzero(self.counts)
+        return int(self.highest_equivalent(nonzero[-1])) if len(nonzero) else 0
+
+    def mean(self):
+        total = self.total
+        if not total:
+            return 0.0
+        indexes = np.arange(len(self.counts))
+        middles = (self.value_of(indexes) + self.highest_equivalent(indexes)) / 2
+        return float((middles * self.counts).sum() / total)
+
+    @classmethod
+    def decode(cls, data):
+        """Decode a (compressed) V2 encoded histogram."""
+        cookie, length = struct.unpack_from('>ii', data)
+        if cookie & ~0xf0 == V2_COMPRESSED_ENCODING_COOKIE:
+            data = zlib.decompress(data[8:8 + length])
+            cookie = struct.unpack_from('>i', data)[0]
+        if cookie & ~0xf0 != V2_ENCODING_COOKIE:
+            raise ValueError(f'Unsupported histogram encoding cookie {cookie:#x}')
+
+        _, payload_length, offset, digits, lowest, highest, _ = ENCODING_HEADER.unpack_from(data)
+        if offset:
+            raise ValueError('Normalizing index offsets are not supported')
+        histogram = cls(lowest, highest, digits)
+        payload = data[ENCODING_HEADER.size:ENCODING_HEADER.size + payload_length]
+        counts = decode_counts(payload)
+        if len(counts) > len(histogram.counts):
+            # Counts past the declared range: widen it rather than drop them
+            histogram.resize(int(histogram.highest_equivalent(len(counts) - 1)))
+        histogram.counts[:len(counts)] = counts
+        return histogram
+
+    def encode(self):
+        """Encode the histogram in the compressed V2 format read by decode() and the Java tools."""
+        payload = encode_counts(self.counts)
+        data = ENCODING_HEADER.pack(V2_ENCODING_COOKIE | WORD_SIZE_BITS, len(payload), 0, self.digits, self.lowest,
+                                    self.highest, 1.0) + payload
+        compressed = zlib.compress(data)
+        return struct.pack('>ii', V2_COMPRESSED_ENCODING_COOKIE | WORD_SIZE_BITS, len(compressed)) + compressed
+
+
+def decode_counts(payload):
+    """Decode ZigZag LEB128 counts; negative words are runs of empty buckets."""
+    counts = []
+    position = 0
+    while position < len(payload):
+        value = 0
+        for shift in range(0, 63, 7):
+            byte = payload[position]
+            position += 1
+            if shift == 56:
+                # The ninth byte carries 8 full bits
+                value |= byte << 56
+                break
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                break
+        value = (value >> 1) ^ -(value & 1)
+        if value < 0:
+            counts.extend([0] * -value)
+        else:
+            counts.append(value)
+    return np.array(counts, dtype=np.int64)
+
+
+def encode_word(value):
+    """ZigZag LEB128 encoding of one word, the ninth byte carrying 8 full bits."""
+    value = ((value << 1) ^ (value >> 63)) & 0xffffffffffffffff
+    encoded = bytearray()
+    for _ in range(8):
+        if value < 0x80:
+            encoded.append(value)
+            return bytes(encoded)
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def encode_counts(counts):
+    """Encode counts as decode_counts() reads them, up to the last non-empty bucket."""
+    nonzero = np.flatnonzero(counts)
+    if not len(nonzero):
+        return b''
+    encoded = bytearray()
+    zeros = 0
+    for count in counts[:nonzero[-1] + 1].tolist():
+        if not count:
+            zeros += 1
+            continue
+        if zeros:
+            encoded += encode_word(-zeros)
+            zeros = 0
+        encoded += encode_word(count)
+    return bytes(encoded)
+
+
+def write_log(path, histogram, start_time, length):
+    """Write a histogram as a one-interval HdrHistogram log, as YCSB writes them."""
+    with open(path, 'w') as file:
+        file.write('#[Histogram log format version 1.3]\n')
+        file.write(f'#[StartTime: {start_time:.3f} (seconds since epoch)]\n')
+        file.write('"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"\n')
+        file.write(f'0.000,{length:.3f},{histogram.max():.3f},'
+                   f'{base64.b64encode(histogram.encode()).decode("ascii")}\n')
+
+
+def read_log(path):
+    """Return the sum of every interval histogram of an HdrHistogram log file."""
+    merged = None
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#') or line.startswith('"'):
+                continue
+            fields = line.split(',')
+            if fields[0].startswith('Tag='):
+                fields = fields[1:]
+            histogram = Histogram.decode(base64.b64decode(fields[3]))
+            if merged is None:
+                merged = histogram
+            else:
+                merged.add(histogram)
+    return merged
+
+
+def parse_log_filename(filename):
+    """Return (phase, database, nodes, driver, workload, settings, try, operation) for a log filename, or None."""
+    match = LOG_FILENAME_RE.match(filename)
+    if not match:
+        return None
+    phase, label, nodes, workload, segment, try_number, operation = match.groups()
+    db_name, driver = DATABASE_DRIVERS.get(label, (label, ''))
+    return (phase.lower(), db_name, int(nodes), driver, workload.upper(), segment_settings(segment), int(try_number),
+            operation)
+
+
+def merge_logs(hdr_dir, group_by=('Phase', 'Database', 'Nodes', 'Driver', 'Workload', 'Settings', 'Operation')):
+    """Merge every log of a directory into one histogram per group.
+
+    Returns a dict mapping each group key tuple to (histogram, number of tries).
+    """
+    fields = ('Phase', 'Database', 'Nodes', 'Driver', 'Workload', 'Settings', 'Try', 'Operation')
+    merged = {}
+    # The logs of the clients of a try count as one try
+    tries = {}
+    for filename in sorted(os.listdir(hdr_dir)):
+        parsed = parse_log_filename(filename)
+        if not parsed:
+            continue
+        histogram = read_log(os.path.join(hdr_dir, filename))
+        if histogram is None:
+            continue
+        row = dict(zip(fields, parsed))
+        key = tuple(row[field] for field in group_by)
+        tries.setdefault(key, set()).add(parsed[:7])
+        if key in merged:
+            merged[key][0].add(histogram)
+            merged[key] = (merged[key][0], len(tries[key]))
+        else:
+            merged[key] = (histogram, 1)
+    return merged
+
+
+def aggregate_percentiles(hdr_dir, percentiles=DEFAULT_PERCENTILES):
+    """Return one row per Phase x Database x Nodes x Driver x Workload x Settings x Operation with merged percentiles.
+
+    The settings of the runs are also expanded into their Threads, Target, WriteConcern, ... columns.
+    """
+    import pandas as pd
+
+    rows = []
+    for key, (histogram, tries) in merge_logs(hdr_dir).items():
+        phase, db_name, nodes, driver, workload, settings, operation = key
+        row = {'Phase': phase, 'Database': db_name, 'Nodes': nodes, 'Driver': driver, 'Workload': workload,
+               'Settings': settings, **settings_columns(settings), 'Operation': operation, 'Tries': tries,
+               'Operations': histogram.total, 'MinLatency(us)': histogram.min(), 'MaxLatency(us)': histogram.max(),
+               'AverageLatency(us)': histogram.mean()}
+        for percentile, value in zip(percentiles, histogram.values_at_percentiles(percentiles)):
+            row[f'p{percentile:g}(us)'] = int(value)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def percentile_spectrum(hdr_dir, phase=None, max_nines=5, points_per_nine=20):
+    """Return the latency at a log-spaced grid of percentiles for each merged group.
+
+    The 'Nines' column is -log10(1 - percentile / 100), the usual x axis of
+    percentile spectrum plots (1 = 90%, 2 = 99%, 3 = 99.9%, ...).
+    """
+    import pandas as pd
+
+    nines = np.linspace(0, max_nines, max_nines * points_per_nine + 1)
+    percentiles = 100 * (1 - 10.0 ** -nines)
+    frames = []
+    for key, (histogram, _) in merge_logs(hdr_dir).items():
+        group_phase, db_name, nodes, driver, workload, settings, operation = key
+        if phase and group_phase != phase:
+            continue
+        frames.append(pd.DataFrame({
+            'Phase': group_phase, 'Database': db_name, 'Nodes': nodes, 'Driver': driver, 'Workload': workload,
+            'Settings': settings, **settings_columns(settings), 'Operation': operation,
+            'Percentile': percentiles, 'Nines': nines, 'Latency': histogram.values_at_percentiles(percentiles),
+        }))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge the HdrHistogram logs of every try losslessly.')
+    parser.add_argument('hdr_dir', nargs='?', default='results/hdr/', help='directory containing the .hdr logs')
+    parser.add_argument('--percentiles', nargs='+', type=float, default=list(DEFAULT_PERCENTILES))
+    parser.add_argument('--output', help='also write the table to this CSV file')
+    args = parser.parse_args(argv)
+
+    df = aggregate_percentiles(args.hdr_dir, args.percentiles)
+    if df.empty:
+        print(f'No HdrHistogram logs found in {args.hdr_dir}')
+        return
+    if args.output:
+        df.to_csv(args.output, index=False)
+    print(df.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Parallel ingestion of result directories.
+
+Walks any number of result directories recursively and parses every results
+file on a process pool.  Workers send back compact arrays (dictionary-encoded
+sections and metrics plus a float64 value array) instead of lists of rows,
+and the parent merges them into one long DataFrame with a 'Source' column
+recording the machine/folder each file came from.
+
+Usage: python3 ingest.py results/ results-pc-david/ --workers 8 --output all.parquet
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ycsb_parser import COLUMNS, file_metadata, iter_records, parse_filename
+
+
+def find_results_files(directories):
+    """Return (source, path) for every results file below the given directories.
+
+    The source is the name of the top directory, followed by the sub-folder
+    path for nested files (e.g. 'archive/pc-david').
+    """
+    found = []
+    for directory in directories:
+        root_name = os.path.basename(os.path.normpath(directory))
+        for dirpath, dirnames, filenames in os.walk(directory):
+            # Skip hidden folders such as the results cache
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            relative = os.path.relpath(dirpath, directory)
+            source = root_name if relative == '.' else os.path.join(root_name, relative)
+            for filename in sorted(filenames):
+                if parse_filename(filename):
+                    found.append((source, os.path.join(dirpath, filename)))
+    return found
+
+
+def parse_file_compact(path):
+    """Parse a results file into dictionary-encoded numpy arrays.
+
+    Returns a dict with the distinct (phase, workload, try, settings) headers and
+    (section, metric) keys, the int32 codes pointing into them and the
+    float64 values, which pickles far smaller than a list of rows.
+    """
+    import numpy as np
+
+    headers, header_codes = {}, []
+    keys, key_codes = {}, []
+    values = []
+    with open(path, 'r') as file:
+        for phase, workload, try_number, settings, section, metric, value in iter_records(file):
+            header_codes.append(headers.setdefault((phase, workload, try_number, settings), len(headers)))
+            key_codes.append(keys.setdefault((section, metric), len(keys)))
+            values.append(value)
+
+    return {
+        'headers': list(headers),
+        'header_codes': np.array(header_codes, dtype=np.int32),
+        'keys': list(keys),
+        'key_codes': np.array(key_codes, dtype=np.int32),
+        'values': np.array(values, dtype=np.float64),
+    }
+
+
+def compact_to_frame(compact, **metadata):
+    """Decode the arrays of parse_file_compact() into a long DataFrame."""
+    import pandas as pd
+
+    headers = compact['headers']
+    keys = compact['keys']
+    header_codes = compact['header_codes']
+    key_codes = compact['key_codes']
+
+    columns = {}
+    for position, name in enumerate(COLUMNS[:4]):
+        column = pd.Series([header[position] for header in headers], dtype=object)
+        columns[name] = column.take(header_codes).to_numpy()
+    for position, name in enumerate(COLUMNS[4:6]):
+        column = pd.Series([key[position] for key in keys], dtype=object)
+        columns[name] = column.take(key_codes).to_numpy()
+    columns['Value'] = compact['values']
+
+    df = pd.DataFrame(columns, columns=list(COLUMNS))
+    if not df.empty:
+        df['Try'] = df['Try'].astype(int)
+    for position, (name, value) in enumerate(metadata.items()):
+        df.insert(position, name, value)
+    return df
+
+
+def parse_files(paths, workers=None):
+    """Parse files with parse_file_compact(), in parallel when there are several.
+
+    Results are returned in the order of the given paths.
+    """
+    if workers == 1 or len(paths) < 2:
+        return [parse_file_compact(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_file_compact, paths, chunksize=chunksize))
+
+
+def ingest_directories(directories, workers=None):
+    """Return one long results frame for every results file below the directories.
+
+    Besides the parsed columns, each row carries its 'Source' folder, its
+    'File' name and the 'Database', 'Nodes' and 'Driver' encoded in that name.
+    """
+    import pandas as pd
+
+    found = find_results_files(directories)
+    compacts = parse_files([path for _, path in found], workers=workers)
+
+    frames = []
+    for (source, path), compact in zip(found, compacts):
+        filename = os.path.basename(path)
+        frames.append(compact_to_frame(compact, Source=source, File=filename, **file_metadata(filename)))
+
+    if not frames:
+        return pd.DataFrame(columns=['Source', 'File', 'Database', 'Nodes', 'Driver'] + list(COLUMNS))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse result directories in parallel.')
+    parser.add_argument('directories', nargs='+', help='result directories to walk recursively')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: all cores)')
+    parser.add_argument('--output', help='write the merged long frame to this Parquet or CSV file')
+    args = parser.parse_args(argv)
+
+    df = ingest_directories(args.directories, workers=args.workers)
+    if args.output and args.output.endswith('.parquet'):
+        df.to_parquet(args.output, index=False)
+    elif args.output:
+        df.to_csv(args.output, index=False)
+    else:
+        print(df.groupby(['Source', 'Database', 'Nodes', 'Driver', 'Phase'])['Try'].nunique())
+
+
+if __name__ == '__main__':
+    main()
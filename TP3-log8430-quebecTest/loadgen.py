@@ -0,0 +1,648 @@
+"""Native asyncio load generator driven by the YCSB workload files.
+
+Runs the CoreWorkload of a 'YCSB/workloads/workload*' file against Redis or
+MongoDB through pooled asyncio clients, without starting a JVM, and prints
+the same '[SECTION], Metric, value' summary as YCSB so the output can be
+appended to the results files read by ycsb_parser.py.  The command line
+mirrors the YCSB one:
+
+    python3 loadgen.py load -db redis -P YCSB/workloads/workloada -p redis.host=127.0.0.1
+    python3 loadgen.py run -db mongodb -P YCSB/workloads/workloadb -threads 16 -s \\
+        -p mongodb.url="mongodb://192.168.5.2:27017/ycsb?replicaSet=myReplicaSet"
+
+With '-p trace=<file>' the operations are replayed from a trace written by
+traces.py instead of being sampled, so every database receives the same
+request stream.
+
+With '-target', '-p measurement.interval=intended' or 'both' measures the
+latencies, as YCSB does, from the time each operation was scheduled to
+start by the throttle ('[Intended-READ]' sections): a slow response that
+delays the next requests then counts against them instead of being hidden
+by the closed loop (coordinated omission).  The default 'op' only measures
+from the actual start.
+
+With '-p hdrhistogram.fileoutput=true -p hdrhistogram.output.path=<prefix>'
+the latency histogram of every operation is also written to
+'<prefix><OP>.hdr', as YCSB does, so the runs of several client processes
+can be merged losslessly (clients.py).  '-p starttime=<epoch seconds>'
+holds the operations back until that time, to start such processes together.
+
+The 'memory' database is an in-process fake with an optional simulated
+latency ('-p memory.latency_us=2000', slept with the asyncio timers, so up
+to about a millisecond longer), and every database class accepts an
+already-built client (e.g. fakeredis) so the generator can be exercised
+without a server.
+"""
+import argparse
+import asyncio
+import bisect
+import random
+import sys
+import time
+from array import array
+from datetime import datetime
+
+import traces
+import workload as core
+from hdr import Histogram, write_log
+
+# Sorted set used by the YCSB Redis binding to implement scans
+REDIS_INDEX_KEY = '_indices'
+
+# Latencies are buffered and recorded into the histograms in batches
+RECORD_BATCH = 1 << 16
+
+# Values of 'measurement.interval'
+MEASUREMENT_INTERVALS = ('op', 'intended', 'both')
+
+async def sleep_until(deadline_ns):
+    """Sleep until time.perf_counter_ns() reaches 'deadline_ns'.
+
+    The asyncio timers fire up to about a millisecond late; a throttled
+    operation then starts late, which its Intended- latency accounts for.
+    """
+    delay_ns = deadline_ns - time.perf_counter_ns()
+    if delay_ns > 0:
+        await asyncio.sleep(delay_ns / 1e9)
+
+
+class MemoryDB:
+    """In-process fake database, optionally sleeping to simulate a network.
+
+    The asyncio timers fire up to about a millisecond late, so latencies
+    below a millisecond ('memory.latency_us=100') are measured as about one.
+    """
+
+    def __init__(self, properties, threads):
+        self.records = {}
+        self.keys = []
+        self.latency_ns = int(float(properties.get('memory.latency_us', 0)) * 1000)
+
+    async def init(self):
+        pass
+
+    async def _wait(self):
+        if self.latency_ns:
+            await sleep_until(time.perf_counter_ns() + self.latency_ns)
+        else:
+            # Still yield to the event loop like a real client would
+            await asyncio.sleep(0)
+
+    def _get(self, key, fields):
+        record = self.records.get(key)
+        if record is None:
+            return None
+        return dict(record) if fields is None else {f: record.get(f) for f in fields}
+
+    async def read(self, table, key, fields):
+        await self._wait()
+        return self._get(key, fields)
+
+    async def update(self, table, key, values):
+        await self._wait()
+        self.records.setdefault(key, {}).update(values)
+
+    async def insert(self, table, key, values):
+        await self._wait()
+        if key not in self.records:
+            bisect.insort(self.keys, key)
+        self.records[key] = dict(values)
+
+    async def scan(self, table, start_key, count, fields):
+        await self._wait()
+        position = bisect.bisect_left(self.keys, start_key)
+        return [self._get(key, fields) for key in self.keys[position:position + count]]
+
+    async def cleanup(self):
+        pass
+
+
+class RedisDB:
+    """Same data layout as the YCSB Redis binding: one hash per record plus a score index.
+
+    With 'redis.cluster=true' the client connects to a sharded Redis Cluster,
+    and 'redis.readfromreplicas=true' then sends reads to the replicas of
+    each shard.  With 'redis.pipeline=N' the commands of concurrent clients
+    are batched into pipelines of up to N operations, one round trip each.
+    """
+
+    def __init__(self, properties, threads, client=None):
+        self.properties = properties
+        self.threads = threads
+        self.client = client
+        self.pipeline_size = int(properties.get('redis.pipeline', 0))
+        self.pending = []
+        self.flushes = set()
+
+    async def init(self):
+        if self.client is not None:
+            return
+        import redis.asyncio as aioredis
+
+        host = self.properties.get('redis.host', 'localhost')
+        port = int(self.properties.get('redis.port', 6379))
+        password = self.properties.get('redis.password') or None
+        if self.properties.get('redis.cluster', 'false').lower() == 'true':
+            from redis.asyncio.cluster import RedisCluster
+
+            options = {}
+            if self.properties.get('redis.readfromreplicas', 'false').lower() == 'true':
+                try:
+                    from redis.cluster import LoadBalancingStrategy
+                    options['load_balancing_strategy'] = LoadBalancingStrategy.ROUND_ROBIN_REPLICAS
+                except ImportError:
+                    options['read_from_replicas'] = True
+            self.client = RedisCluster(host=host, port=port, password=password,
+                                       max_connections=self.threads, decode_responses=True, **options)
+        else:
+            pool = aioredis.ConnectionPool(host=host, port=port, password=password,
+                                           max_connections=self.threads, decode_responses=True)
+            self.client = aioredis.Redis(connection_pool=pool)
+
+    async def _execute(self, commands):
+        """Run [(command, args, kwargs), ...] and return their results.
+
+        When pipelining, the commands are queued and sent with those of the
+        other clients, either when the batch is full or once every client
+        ready to run in this event loop iteration has queued its own.
+        """
+        if not self.pipeline_size:
+            if len(commands) == 1:
+                name, args, kwargs = commands[0]
+                return [await getattr(self.client, name)(*args, **kwargs)]
+            pipe = self.client.pipeline(transaction=False)
+            for name, args, kwargs in commands:
+                getattr(pipe, name)(*args, **kwargs)
+            return await pipe.execute()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((commands, future))
+        if len(self.pending) >= self.pipeline_size:
+            await self._flush()
+        elif len(self.pending) == 1:
+            loop.call_soon(self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self):
+        task = asyncio.ensure_future(self._flush())
+        self.flushes.add(task)
+        task.add_done_callback(self.flushes.discard)
+
+    async def _flush(self):
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for commands, _ in batch:
+            for name, args, kwargs in commands:
+                getattr(pipe, name)(*args, **kwargs)
+        try:
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as error:  # the whole batch failed
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        # Hand each operation its own results
+        position = 0
+        for commands, future in batch:
+            result = results[position:position + len(commands)]
+            position += len(commands)
+            error = next((r for r in result if isinstance(r, Exception)), None)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def read(self, table, key, fields):
+        if fields is None:
+            return (await self._execute([('hgetall', (key,), {})]))[0]
+        return dict(zip(fields, (await self._execute([('hmget', (key, fields), {})]))[0]))
+
+    async def update(self, table, key, values):
+        await self._execute([('hset', (key,), {'mapping': values})])
+
+    async def insert(self, table, key, values):
+        # Both commands in one round trip
+        await self._execute([('hset', (key,), {'mapping': values}),
+                             ('zadd', (REDIS_INDEX_KEY, {key: core.java_string_hash(key)}), {})])
+
+    async def scan(self, table, start_key, count, fields):
+        keys = (await self._execute([('zrangebyscore', (REDIS_INDEX_KEY, core.java_string_hash(start_key), '+inf'),
+                                      {'start': 0, 'num': count})]))[0]
+        if not keys:
+            return []
+        if fields is None:
+            return await self._execute([('hgetall', (key,), {}) for key in keys])
+        return await self._execute([('hmget', (key, fields), {}) for key in keys])
+
+    async def cleanup(self):
+        await self.client.aclose()
+
+
+class MongoDB:
+    """Same data layout as the YCSB MongoDB bindings: one document per record keyed by _id."""
+
+    def __init__(self, properties, threads, client=None):
+        self.properties = properties
+        self.threads = threads
+        self.client = client
+        self.database = None
+
+    async def init(self):
+        url = self.properties.get('mongodb.url', 'mongodb://localhost:27017/ycsb?w=1')
+        if self.client is None:
+            try:
+                from pymongo import AsyncMongoClient
+            except ImportError:
+                from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+            # One pooled connection per client thread, unless the URL sets the pool size
+            options = {} if 'maxpoolsize=' in url.lower() else {'maxPoolSize': self.threads}
+            self.client = AsyncMongoClient(url, **options)
+        name = url.rsplit('/', 1)[-1].split('?')[0] if url.count('/') > 2 else ''
+        self.database = self.client[name or 'ycsb']
+
+    async def read(self, table, key, fields):
+        projection = None if fields is None else {field: 1 for field in fields}
+        return await self.database[table].find_one({'_id': key}, projection)
+
+    async def update(self, table, key, values):
+        await self.database[table].update_one({'_id': key}, {'$set': values})
+
+    async def insert(self, table, key, values):
+        await self.database[table].insert_one(dict(values, _id=key))
+
+    async def scan(self, table, start_key, count, fields):
+        projection = None if fields is None else {field: 1 for field in fields}
+        cursor = self.database[table].find({'_id': {'$gte': start_key}}, projection).sort('_id', 1).limit(count)
+        return await cursor.to_list(length=count)
+
+    async def cleanup(self):
+        result = self.client.close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+DATABASES = {
+    'memory': MemoryDB,
+    'redis': RedisDB,
+    'mongodb': MongoDB,
+}
+
+
+def ordinal(percentile):
+    """Name a percentile the way YCSB does ('95th', '99.9')."""
+    if percentile != int(percentile):
+        return f'{percentile:g}'
+    percentile = int(percentile)
+    if 10 <= percentile % 100 <= 13:
+        return f'{percentile}th'
+    suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(percentile % 10, 'th')
+    return f'{percentile}{suffix}'
+
+
+class Measurements:
+    """Per-operation latency histograms and return codes, in microseconds."""
+
+    def __init__(self, percentiles=(95, 99), interval='op'):
+        if interval not in MEASUREMENT_INTERVALS:
+            raise ValueError(f'measurement.interval must be one of {MEASUREMENT_INTERVALS}, not {interval!r}')
+        self.percentiles = percentiles
+        self.measurement_interval = interval
+        self.histograms = {}
+        self.buffers = {}
+        self.stats = {}
+        self.returns = {}
+        self.interval = {}
+
+    def measure_times(self, operation, start_ns, intended_ns, end_ns, status='OK'):
+        """Measure an operation from its actual and/or intended start, per 'measurement.interval'."""
+        if self.measurement_interval != 'intended':
+            self.measure(operation, (end_ns - start_ns) // 1000, status)
+        if self.measurement_interval != 'op':
+            self.measure(f'Intended-{operation}', (end_ns - intended_ns) // 1000, status, count_return=False)
+
+    def measure(self, operation, latency_us, status='OK', count_return=True):
+        name = operation if status == 'OK' else f'{operation}-FAILED'
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = array('q')
+            self.histograms[name] = Histogram()
+            self.stats[name] = [0, 0, None, 0]  # count, sum, min, max
+        buffer.append(latency_us)
+        if len(buffer) >= RECORD_BATCH:
+            self._flush(name)
+
+        stats = self.stats[name]
+        stats[0] += 1
+        stats[1] += latency_us
+        stats[2] = latency_us if stats[2] is None else min(stats[2], latency_us)
+        stats[3] = max(stats[3], latency_us)
+
+        if count_return:
+            codes = self.returns.setdefault(operation, {})
+            codes[status] = codes.get(status, 0) + 1
+        interval = self.interval.setdefault(name, [0, 0])
+        interval[0] += 1
+        interval[1] += latency_us
+
+    def _flush(self, name):
+        import numpy as np
+
+        buffer = self.buffers[name]
+        if buffer:
+            self.histograms[name].record(np.frombuffer(buffer, dtype=np.int64))
+            del buffer[:]
+
+    def status_summary(self):
+        """Return the per-operation part of a status line and reset the interval counters."""
+        parts = []
+        for name, (count, total) in sorted(self.interval.items()):
+            if count:
+                parts.append(f'[{name}: Count={count}, Avg={total / count:.2f}]')
+        self.interval = {}
+        return ' '.join(parts)
+
+    def write_logs(self, prefix, start_time, runtime_ms):
+        """Write the histogram of every operation to '<prefix><OP>.hdr'."""
+        for name, histogram in self.histograms.items():
+            self._flush(name)
+            write_log(f'{prefix}{name}.hdr', histogram, start_time, runtime_ms / 1000)
+
+    def export(self, runtime_ms, operations):
+        lines = [
+            f'[OVERALL], RunTime(ms), {runtime_ms}',
+            f'[OVERALL], Throughput(ops/sec), {operations * 1000.0 / runtime_ms if runtime_ms else 0.0}',
+        ]
+        for name in self.histograms:
+            self._flush(name)
+            histogram = self.histograms[name]
+            count, total, minimum, maximum = self.stats[name]
+            lines.append(f'[{name}], Operations, {count}')
+            lines.append(f'[{name}], AverageLatency(us), {total / count if count else 0.0}')
+            lines.append(f'[{name}], MinLatency(us), {minimum or 0}')
+            lines.append(f'[{name}], MaxLatency(us), {maximum}')
+            for percentile, value in zip(self.percentiles, histogram.values_at_percentiles(self.percentiles)):
+                lines.append(f'[{name}], {ordinal(percentile)}PercentileLatency(us), {int(value)}')
+            for status, number in sorted(self.returns.get(name, {}).items()):
+                lines.append(f'[{name}], Return={status}, {number}')
+        return lines
+
+
+class ClientState:
+    """Generators shared by every client coroutine (the event loop is single-threaded)."""
+
+    def __init__(self, workload, phase, rng):
+        self.workload = workload
+        self.phase = phase
+        self.rng = rng
+        self.ordered = workload['insertorder'] == 'ordered'
+        self.fields = [f'field{i}' for i in range(workload['fieldcount'])]
+        self.values = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=workload['fieldlength']))
+                       for _ in range(256)]
+
+        if phase == 'load':
+            self.key_sequence = core.InsertCounter(workload['insertstart'])
+        else:
+            self.insert_sequence = core.InsertCounter(workload['recordcount'])
+            self.key_chooser = core.key_chooser(workload, self.insert_sequence, rng=rng)
+            self.operation_chooser = core.DiscreteGenerator(core.operation_mix(workload), rng=rng)
+            self.scan_length = core.scan_length_chooser(workload, rng=rng)
+
+    def next_keynum(self):
+        if self.workload['requestdistribution'] == 'latest':
+            return self.key_chooser.next_value()
+        # Never pick keys that have not been inserted yet
+        keynum = self.key_chooser.next_value()
+        while keynum > self.insert_sequence.last_value():
+            keynum = self.key_chooser.next_value()
+        return keynum
+
+    def key(self, keynum):
+        return core.build_key_name(keynum, self.ordered)
+
+    def read_fields(self):
+        return None if self.workload['readallfields'] else [self.rng.choice(self.fields)]
+
+    def all_values(self):
+        return {field: self.rng.choice(self.values) for field in self.fields}
+
+    def update_values(self):
+        if self.workload['writeallfields']:
+            return self.all_values()
+        return {self.rng.choice(self.fields): self.rng.choice(self.values)}
+
+
+class TraceState:
+    """Replays the operations of a trace file (see traces.py) in order, shared by every client."""
+
+    def __init__(self, path):
+        self.trace, metadata = traces.open_trace(path)
+        self.workload = metadata['workload']
+        self.phase = metadata['phase']
+        self.values = metadata['values']
+        self.fields = [f'field{i}' for i in range(self.workload['fieldcount'])]
+        self.position = 0
+        self.records = []
+        self.record_index = 0
+
+    def next_record(self):
+        # Records are copied out of the memory map in chunks of plain tuples
+        if self.record_index == len(self.records):
+            self.records = self.trace[self.position:self.position + RECORD_BATCH].tolist()
+            self.position += len(self.records)
+            self.record_index = 0
+        record = self.records[self.record_index]
+        self.record_index += 1
+        return record
+
+    def all_values(self, value):
+        # Every field gets a different value of the pool
+        pool = len(self.values)
+        return {field: self.values[(value + i) % pool] for i, field in enumerate(self.fields)}
+
+
+async def timed(measurements, operation, call, intended_ns=None):
+    """Await a database call, recording its latency and return code.
+
+    'intended_ns' is the time the throttle scheduled the operation for (the
+    actual start when unthrottled).
+    """
+    start = time.perf_counter_ns()
+    status = 'OK'
+    try:
+        result = await call
+    except Exception as error:  # every driver error counts as a failed operation
+        result = None
+        status = type(error).__name__
+    measurements.measure_times(operation, start, intended_ns or start, time.perf_counter_ns(), status)
+    return result, status
+
+
+async def execute(db, table, measurements, operation, key, fields=None, values=None, scan_length=0,
+                  intended_ns=None):
+    """Issue one operation; READ-MODIFY-WRITE is timed as a whole and per step."""
+    if operation == 'READ':
+        await timed(measurements, 'READ', db.read(table, key, fields), intended_ns)
+    elif operation == 'UPDATE':
+        await timed(measurements, 'UPDATE', db.update(table, key, values), intended_ns)
+    elif operation == 'INSERT':
+        await timed(measurements, 'INSERT', db.insert(table, key, values), intended_ns)
+    elif operation == 'SCAN':
+        await timed(measurements, 'SCAN', db.scan(table, key, scan_length, fields), intended_ns)
+    else:
+        # Both steps share the intended start of the whole operation, as in YCSB
+        start = time.perf_counter_ns()
+        _, status = await timed(measurements, 'READ', db.read(table, key, fields), intended_ns)
+        if status == 'OK':
+            _, status = await timed(measurements, 'UPDATE', db.update(table, key, values), intended_ns)
+        measurements.measure_times('READ-MODIFY-WRITE', start, intended_ns or start, time.perf_counter_ns(), status)
+
+
+async def do_insert(db, state, measurements, keynum, intended_ns=None):
+    await execute(db, state.workload['table'], measurements, 'INSERT', state.key(keynum), values=state.all_values(),
+                  intended_ns=intended_ns)
+
+
+async def do_transaction(db, state, measurements, intended_ns=None):
+    operation = state.operation_chooser.next_value()
+    if operation == 'INSERT':
+        await do_insert(db, state, measurements, state.insert_sequence.next_value(), intended_ns)
+        return
+    key = state.key(state.next_keynum())
+    values = state.update_values() if operation in ('UPDATE', 'READ-MODIFY-WRITE') else None
+    scan_length = state.scan_length.next_value() if operation == 'SCAN' else 0
+    await execute(db, state.workload['table'], measurements, operation, key, state.read_fields(), values, scan_length,
+                  intended_ns)
+
+
+async def do_replay(db, state, measurements, intended_ns=None):
+    operation, field, value, scan_length, key = state.next_record()
+    operation = traces.OPERATION_NAMES[operation]
+    if field < 0:
+        fields = None
+        values = state.all_values(value)
+    else:
+        fields = [state.fields[field]]
+        values = {state.fields[field]: state.values[value]}
+    await execute(db, state.workload['table'], measurements, operation, f'user{key}', fields, values, scan_length,
+                  intended_ns)
+
+
+async def client(db, state, measurements, operations, target_per_client, progress, deadline=None):
+    """One YCSB 'thread': runs its share of the operations, throttled to its target rate, until the deadline."""
+    period_ns = 1e9 / target_per_client if target_per_client else 0
+    start = time.perf_counter_ns()
+    for done in range(operations):
+        if deadline and time.perf_counter() >= deadline:
+            break
+        intended_ns = None
+        if period_ns:
+            # The schedule does not slip when an operation is late: the next ones are due at once
+            intended_ns = int(start + done * period_ns)
+            await sleep_until(intended_ns)
+        if isinstance(state, TraceState):
+            await do_replay(db, state, measurements, intended_ns)
+        elif state.phase == 'load':
+            await do_insert(db, state, measurements, state.key_sequence.next_value(), intended_ns)
+        else:
+            await do_transaction(db, state, measurements, intended_ns)
+        progress[0] += 1
+
+
+def print_status(measurements, progress, started, current):
+    """Print a YCSB-style status line to stderr (parsed by timeseries.py and clients.py)."""
+    stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S:%f')[:-3]
+    print(f'{stamp} {int(time.perf_counter() - started)} sec: {progress[0]} operations; {current:.2f} current ops/sec; '
+          f'{measurements.status_summary()}', file=sys.stderr, flush=True)
+
+
+async def report_status(measurements, progress, interval, started):
+    """Print a status line every 'interval' seconds."""
+    last_ops, last_time = 0, time.perf_counter()
+    while True:
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        current = (progress[0] - last_ops) / (now - last_time)
+        last_ops, last_time = progress[0], now
+        print_status(measurements, progress, started, current)
+
+
+async def run_benchmark(phase, db, workload, threads=1, target=0, status_interval=None, seed=None):
+    """Run one load or run phase and return the summary lines."""
+    if workload.get('trace'):
+        state = TraceState(workload['trace'])
+        if state.phase != phase:
+            raise ValueError(f'{workload["trace"]} is a {state.phase} trace, not a {phase} one')
+        total = len(state.trace)
+    else:
+        state = ClientState(workload, phase, random.Random(seed))
+        total = workload['insertcount'] if phase == 'load' else workload['operationcount']
+    percentiles = [float(p) for p in str(workload.get('hdrhistogram.percentiles', '95,99')).split(',')]
+    measurements = Measurements(percentiles, workload.get('measurement.interval', 'op'))
+
+    shares = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+    target_per_client = target / threads if target else 0
+
+    await db.init()
+    if workload.get('starttime'):
+        # Start together with the other client processes of the phase
+        await asyncio.sleep(max(0.0, float(workload['starttime']) - time.time()))
+    progress = [0]
+    start_time = time.time()
+    started = time.perf_counter()
+    # 'maxexecutiontime' bounds the phase in seconds, as in YCSB
+    deadline = started + float(workload['maxexecutiontime']) if workload.get('maxexecutiontime') else None
+    reporter = None
+    if status_interval:
+        reporter = asyncio.ensure_future(report_status(measurements, progress, status_interval, started))
+    await asyncio.gather(*(client(db, state, measurements, share, target_per_client, progress, deadline)
+                           for share in shares))
+    runtime_ms = int((time.perf_counter() - started) * 1000)
+    if reporter:
+        reporter.cancel()
+        # As in YCSB, a last status line marks the end of the run
+        print_status(measurements, progress, started, progress[0] / (runtime_ms / 1000 or 1))
+
+    # The cleanup is not scheduled by the throttle, so it has no intended latency
+    cleanup_start = time.perf_counter_ns()
+    status = 'OK'
+    try:
+        await db.cleanup()
+    except Exception as error:  # as in timed()
+        status = type(error).__name__
+    measurements.measure('CLEANUP', (time.perf_counter_ns() - cleanup_start) // 1000, status)
+    if str(workload.get('hdrhistogram.fileoutput', 'false')).lower() == 'true':
+        measurements.write_logs(workload.get('hdrhistogram.output.path', ''), start_time, runtime_ms)
+    return measurements.export(runtime_ms, progress[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='asyncio YCSB-compatible load generator.')
+    parser.add_argument('phase', choices=('load', 'run'))
+    parser.add_argument('-db', choices=sorted(DATABASES), required=True)
+    parser.add_argument('-P', dest='workload_file', help='YCSB workload property file')
+    parser.add_argument('-p', dest='properties', action='append', default=[], metavar='KEY=VALUE',
+                        help='override a workload or binding property')
+    parser.add_argument('-threads', type=int, default=1, help='number of concurrent clients')
+    parser.add_argument('-target', type=float, default=0, help='target ops/sec (default: unthrottled)')
+    parser.add_argument('-s', action='store_true', help='print status lines to stderr')
+    args = parser.parse_args(argv)
+
+    overrides = dict(prop.split('=', 1) for prop in args.properties)
+    workload = core.load_workload(args.workload_file, overrides)
+    seed = int(overrides['seed']) if 'seed' in overrides else None
+    status_interval = float(overrides.get('status.interval', 10)) if args.s else None
+    db = DATABASES[args.db](overrides, args.threads)
+
+    try:
+        from uvloop import run
+    except ImportError:
+        run = asyncio.run
+    lines = run(run_benchmark(args.phase, db, workload, args.threads, args.target, status_interval, seed))
+    print('\n'.join(lines))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Latencies corrected for coordinated omission, next to the uncorrected ones.
+
+A closed-loop client waits for each response before sending its next
+request, so a stall delays the requests that should have been sent during
+it and their latency is never measured: the reported latencies are
+optimistic.  Throttled runs ('-target', see orchestrator.py) measure every
+operation twice with 'measurement.interval=both': from its actual start
+('[READ]') and from the start the throttle intended for it
+('[Intended-READ]'), which charges the queueing behind a stall to the
+delayed requests.  The ratio corrected / uncorrected ('Inflation') shows
+how much of the tail the closed loop hid.
+
+Usage: python3 omission.py results/ --phase run
+"""
+import argparse
+
+from ycsb_parser import INTENDED_PREFIX, config_dimensions
+
+# Identity columns of a try kept in the omission frame
+TRY_COLUMNS = ['Phase', 'Database', 'Nodes', 'Workload', 'Try', 'Threads', 'Target', 'Weight']
+
+# Operations measured by YCSB and loadgen.py
+OPERATIONS = ('READ', 'UPDATE', 'INSERT', 'SCAN', 'READ-MODIFY-WRITE')
+
+# Statistic prefixes of the omission frame and their YCSB metric
+STATISTICS = {
+    'Average': 'AverageLatency(us)',
+    'P95': '95thPercentileLatency(us)',
+    'P99': '99thPercentileLatency(us)',
+    'Max': 'MaxLatency(us)',
+}
+
+
+def omission_frame(df):
+    """Return one row per try and operation with the uncorrected and corrected latencies.
+
+    For each statistic of STATISTICS the frame has '<Statistic>' (measured
+    from the actual start), 'Corrected<Statistic>' (from the intended start)
+    and '<Statistic>Inflation' (their ratio).  Tries without Intended-
+    sections are left out.
+    """
+    import pandas as pd
+
+    keys = [column for column in TRY_COLUMNS if column in df.columns] + config_dimensions(df)
+    frames = []
+    for operation in OPERATIONS:
+        columns = {}
+        for statistic, metric in STATISTICS.items():
+            uncorrected, corrected = f'{operation}.{metric}', f'{INTENDED_PREFIX}{operation}.{metric}'
+            if uncorrected in df.columns and corrected in df.columns:
+                columns[statistic] = df[uncorrected]
+                columns[f'Corrected{statistic}'] = df[corrected]
+                columns[f'{statistic}Inflation'] = df[corrected] / df[uncorrected].where(df[uncorrected] > 0)
+        if not columns:
+            continue
+        frame = pd.concat([df[keys], pd.DataFrame(columns)], axis=1)
+        frame.insert(len(keys), 'Operation', operation)
+        frames.append(frame.dropna(subset=[name for name in columns if name.startswith('Corrected')], how='all'))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def omission_report(df):
+    """Median uncorrected and corrected latencies of each cell and operation."""
+    frame = omission_frame(df)
+    if frame.empty:
+        return frame
+    keys = [column for column in ('Phase', 'Database', 'Nodes', 'Workload', 'Target') if column in frame.columns]
+    keys += config_dimensions(frame) + ['Operation']
+    values = [column for column in frame.columns if column.startswith(tuple(STATISTICS))
+              or column.startswith('Corrected')]
+    report = frame.groupby(keys, sort=True)[values].median()
+    report.insert(0, 'Tries', frame.groupby(keys, sort=True).size())
+    return report.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare latencies with and without the coordinated omission '
+                                                 'correction.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory containing the result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    parser.add_argument('--statistics', nargs='+', choices=sorted(STATISTICS), default=['Average', 'P99'])
+    parser.add_argument('--output', help='also write the per-try frame to this CSV file')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from results_cache import load_results
+
+    df = load_results(args.results_dir, args.phase)
+    report = omission_report(df)
+    if report.empty:
+        print(f'No Intended- latencies in {args.results_dir} (run with --targets and measurement.interval=both)')
+        return
+    if args.output:
+        omission_frame(df).to_csv(args.output, index=False)
+    columns = [column for column in report.columns if not column.startswith(tuple(STATISTICS))
+               and not column.startswith('Corrected')]
+    for statistic in args.statistics:
+        columns += [statistic, f'Corrected{statistic}', f'{statistic}Inflation']
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(report[columns].to_string(index=False, float_format='%.1f'))
+
+
+if __name__ == '__main__':
+    main()
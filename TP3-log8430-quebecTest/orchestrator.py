@@ -0,0 +1,1136 @@
+"""Benchmark orchestrator: runs a matrix of databases, node counts, workloads and thread counts.
+
+The databases are the engines of engines.py.  For every database x node
+count cell the topology is brought up (with Docker Compose for Redis and
+MongoDB), the cluster is polled until it is actually ready (a PRIMARY and
+SECONDARY members in 'rs.status()', every replica 'online' in 'INFO
+replication') instead of sleeping for a fixed time, then the load and run
+phases of every workload are executed for each try.  Results are written
+straight to 'results/<phase><Database><Nodes>.csv' (e.g. runMongo3.csv) and
+the HdrHistogram logs to 'results/hdr/' (or, with --raw-latency, the
+per-operation latency logs to 'results/raw/'), the names read by
+ycsb_parser.py, hdr.py and rawlatency.py.  The CPU, memory, network and disk usage of the containers and
+of the client are sampled during every phase into 'results/resources/'
+(see sampler.py).  The section headers carry the try number and the
+settings of the try, and the per-run files are named after them
+('runMongo3-A-threads=16-target=0-try2-READ.hdr').
+
+Usage:
+    python3 orchestrator.py --databases redis mongo --nodes 3 5 --workloads a b c --tries 10
+    python3 orchestrator.py --databases mongo --nodes 3 --threads 1 8 32 --client loadgen --dry-run
+    python3 orchestrator.py --databases redis memcached rocksdb --nodes 1 3 --workloads a c --tries 3
+    python3 orchestrator.py --sweep --workloads a --tries 3 --targets 0 5000 10000
+    python3 orchestrator.py --dataset --databases redis mongo --nodes 3 --workloads a c --tries 3
+    python3 orchestrator.py --databases redis-cluster mongo --nodes 3 5 --workloads a --clients 1 4
+    python3 orchestrator.py --databases redis-cluster --nodes 3 5 --replicas 1 --modes plain replica-reads pipeline
+    python3 orchestrator.py --databases mongo --nodes 3 --modes mongodb mongodb-async \
+        --write-concerns 1 majority --journal true --read-preferences primary nearest --pool-sizes 10 100
+
+With --clients, the run phase is driven by several client processes started
+together, sharing the operations and the target; clients.py merges their
+outputs (throughput over the wall-clock span of all the clients, latency
+percentiles of the merged HdrHistogram logs) into one section tagged
+'clients=<N>'.  Workloads inserting during their run phase are refused, as
+every client would number its inserts from the record count.
+
+A sweep varies the client thread count and target throughput; its results
+go to 'results/sweep/' and capacity.py finds the saturation knee of the
+throughput / p99 latency curve of each topology.
+
+A dataset sweep (--dataset, or --record-counts) loads 10^4 to 10^8 records
+into 'results/dataset/': each record count is loaded once, by several client
+processes inserting disjoint key ranges in batches (their outputs are kept
+in 'results/clients/' and merged by clients.py), and the loaded records are
+reused by the tries and workloads that do not insert.
+The memory and on-disk size of the servers are appended to every section
+('[FOOTPRINT]' metrics), to show where each database leaves memory.
+
+With --failover, every run phase lasts --fault-run-time seconds and the
+MongoDB primary (or the Redis master) is stopped, killed or paused partway
+through it; the results go to 'results/failover/', the fault events to its
+'faults/' folder, and failover.py measures the recovery.
+
+'redis' is one master with replicas that only follow it, so all the
+requests hit a single node; 'redis-cluster' shards the keys over 'nodes'
+masters and its results are labelled RedisCluster, RedisClusterReplicaReads
+or RedisClusterPipelined depending on the client mode.
+
+Every other engine of engines.py runs its YCSB binding against one
+container or local process per node (Memcached, a local redis-server), or
+against a store embedded in the client (RocksDB); node counts an engine
+does not support are skipped.  The section headers carry 'engine=<name>
+deployment=<kind>', the Engine and Deployment columns of ycsb_parser.py.
+
+'mongo' runs through the YCSB 'mongodb-async' (default) or 'mongodb' binding,
+labelled AsyncMongo and SyncMongo, or through loadgen.py (PyMongo).  Each
+combination of write concern, journal, read preference and connection pool
+size is passed in the connection URL and recorded in the section headers,
+where ycsb_parser.py turns it into the WriteConcern, Journal, ReadPreference
+and MaxPoolSize columns.
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from clients import merge_outputs, partition_ranges
+from engines import ENGINES, validate
+from failover import FAULT_ACTIONS, FAULT_AFTER, FAULT_DURATION, FAULTS_DIR, RUN_TIME, FaultInjector
+from sampler import INTERVAL, ResourceSampler, parse_size
+from workload import load_workload
+from ycsb_parser import settings_key, settings_segment
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Extra YCSB options, as in the benchmark scripts: status lines every second
+# (timeseries.py) and one HdrHistogram log per try and operation (hdr.py)
+YCSB_OPTIONS = ['-s', '-p', 'status.interval=1', '-p', 'measurementtype=hdrhistogram',
+                '-p', 'hdrhistogram.fileoutput=true', '-p', 'hdrhistogram.percentiles=50,95,99,99.9,99.99']
+
+# With --raw-latency: one line per operation in 'results/raw/' (rawlatency.py),
+# the summaries still going to the results files
+RAW_OPTIONS = ['-s', '-p', 'status.interval=1', '-p', 'measurementtype=raw', '-p', 'measurement.raw.no_summary=false']
+
+# Readiness polling period and default timeout, in seconds
+POLL_INTERVAL = 0.5
+READY_TIMEOUT = 180
+
+SEPARATOR = '#' * 82
+
+# Client thread counts of a concurrency sweep (--sweep)
+SWEEP_THREADS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+# Operation count of the time-bounded run phases of a failover benchmark
+FAILOVER_OPERATIONS = 10 ** 9
+
+# Record counts of a dataset sweep (--dataset), with its default number of
+# load client processes and inserts per batch
+DATASET_RECORD_COUNTS = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8]
+DATASET_LOAD_CLIENTS = 4
+DATASET_BATCH = 100
+
+# Seconds between building the commands of several client processes and their common start time
+CLIENT_START_DELAY = 2.0
+
+# Launcher holding a YCSB client back until the common start time ('<epoch seconds> <command...>'), then
+# replacing itself with the client, so the JVMs of a phase start together
+START_AT = ('import os, sys, time; time.sleep(max(0.0, float(sys.argv[1]) - time.time())); '
+            'os.execvp(sys.argv[2], sys.argv[2:])')
+
+# Data directories of the database containers, measured by the footprints
+REDIS_DATA_DIR = '/bitnami/redis/data'
+MONGO_DATA_DIR = '/data/db'
+
+# Data folders of the local processes and embedded stores of engines.py, on disk rather than in a tmpfs /tmp
+ENGINE_DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+
+def compose_command():
+    """Return the Docker Compose command ('docker-compose' or 'docker compose')."""
+    if shutil.which('docker-compose'):
+        return ['docker-compose']
+    return ['docker', 'compose']
+
+
+def parse_info(output):
+    """Parse the 'key:value' lines of a Redis INFO reply."""
+    info = {}
+    for line in output.splitlines():
+        key, _, value = line.strip().partition(':')
+        info[key] = value
+    return info
+
+
+def port_open(host, port):
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def directory_size(path):
+    """Bytes of the files under a folder."""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def wait_until(check, timeout, description):
+    """Call check() every POLL_INTERVAL seconds until it returns True; return the time it took."""
+    started = time.monotonic()
+    while True:
+        try:
+            if check():
+                return time.monotonic() - started
+        except (subprocess.CalledProcessError, ValueError):
+            # The containers are still starting
+            pass
+        if time.monotonic() - started > timeout:
+            raise TimeoutError(f'{description} not ready after {timeout} s')
+        time.sleep(POLL_INTERVAL)
+
+
+class Topology:
+    """A Docker Compose cluster of one database with a given number of nodes.
+
+    'label' is the database name of the results files ('<phase><label><nodes>.csv')
+    and 'mode' selects a client configuration of the topology (see 'modes').
+    'options' holds the client options of the current option set.  'engine'
+    and 'deployment' are its entry of engines.py, recorded in the section
+    headers; 'max_clients' caps the client processes of a phase.
+    """
+
+    name = None
+    engine = None
+    deployment = 'compose'
+    directory = None
+    modes = ('plain',)
+    max_clients = None
+
+    def __init__(self, nodes, runner, mode='plain'):
+        self.nodes = nodes
+        self.runner = runner
+        self.mode = mode
+        self.options = {}
+
+    @property
+    def label(self):
+        return self.name
+
+    @property
+    def client(self):
+        """Client forced by the mode, or None to use the requested one."""
+        return None
+
+    def default_mode(self, client):
+        """Mode used when none of the requested modes applies to the topology."""
+        return self.modes[0]
+
+    def option_sets(self):
+        """Client option sets to benchmark, each a dict assigned to 'options'."""
+        return [{}]
+
+    def settings(self):
+        """Topology and client settings recorded in the section headers."""
+        return {}
+
+    @property
+    def compose_file(self):
+        return os.path.join(BASE_DIR, self.directory, 'docker-compose.yml')
+
+    def compose(self, *args, capture=False):
+        return self.runner(compose_command() + ['-f', self.compose_file] + list(args), capture=capture)
+
+    def up(self):
+        self.compose('up', '-d')
+
+    def down(self):
+        self.compose('down', '-v')
+
+    def container_ids(self):
+        return self.compose('ps', '-q', capture=True).split()
+
+    def fault_container(self):
+        """Container whose loss the failover benchmark measures (the node taking the writes)."""
+        raise NotImplementedError
+
+    def wait_ready(self, timeout):
+        raise NotImplementedError
+
+    def reset(self):
+        """Remove the records of the previous try before loading."""
+
+    def batch_options(self, batch):
+        """Client options inserting 'batch' records per request, empty when the client cannot batch."""
+        return []
+
+    def footprint(self):
+        """Memory and on-disk size of the servers holding the records: {'ServerMemory(bytes)': ..., ...}."""
+        return {}
+
+    def disk_usage(self, container, path):
+        return int(self.runner(['docker', 'exec', container, 'du', '-sb', path], capture=True).split()[0])
+
+    def ycsb_command(self, phase, workload_file):
+        raise NotImplementedError
+
+    def loadgen_command(self, phase, workload_file):
+        raise NotImplementedError
+
+
+class RedisTopology(Topology):
+    """One master and nodes - 1 replicas (redis/docker-compose.yml).
+
+    Every request goes to the master, the replicas only follow it; see
+    RedisClusterTopology for a sharded cluster.
+    """
+
+    name = 'Redis'
+    engine = 'redis'
+    directory = 'redis'
+    host = '127.0.0.1'
+    port = 6379
+
+    def up(self):
+        self.compose('up', '-d', '--scale', 'redis-master=1', '--scale', f'redis-replica={self.nodes - 1}')
+
+    def replication_info(self):
+        return parse_info(self.compose('exec', '-T', 'redis-master', 'redis-cli', 'INFO', 'replication',
+                                       capture=True))
+
+    def replicas_online(self):
+        info = self.replication_info()
+        online = sum(1 for key, value in info.items() if key.startswith('slave') and 'state=online' in value)
+        return info.get('role') == 'master' and online >= self.nodes - 1
+
+    def wait_ready(self, timeout):
+        return wait_until(self.replicas_online, timeout, f'Redis with {self.nodes - 1} replicas')
+
+    def reset(self):
+        self.compose('exec', '-T', 'redis-master', 'redis-cli', 'FLUSHALL')
+
+    def fault_container(self):
+        # Nothing promotes a replica: the writes only come back with the master
+        return self.compose('ps', '-q', 'redis-master', capture=True).split()[0]
+
+    def footprint(self):
+        # The master holds every record, the replicas a copy of them
+        info = parse_info(self.compose('exec', '-T', 'redis-master', 'redis-cli', 'INFO', 'memory', capture=True))
+        return {'ServerMemory(bytes)': int(info['used_memory_rss']),
+                'DataSize(bytes)': int(info['used_memory_dataset']),
+                'DiskSize(bytes)': self.disk_usage(self.fault_container(), REDIS_DATA_DIR)}
+
+    def ycsb_command(self, phase, workload_file):
+        return ['./bin/ycsb', phase, 'redis', '-P', workload_file,
+                '-p', f'redis.host={self.host}', '-p', f'redis.port={self.port}']
+
+    def loadgen_command(self, phase, workload_file):
+        return [sys.executable, os.path.join(BASE_DIR, 'loadgen.py'), phase, '-db', 'redis', '-P', workload_file,
+                '-p', f'redis.host={self.host}', '-p', f'redis.port={self.port}']
+
+
+class RedisClusterTopology(Topology):
+    """A sharded Redis Cluster of 'nodes' masters, each with 'replicas' replicas.
+
+    The Compose file is generated for the requested shape by up(), in a
+    temporary directory of its own removed by down().  Besides plain
+    YCSB runs, the 'replica-reads' mode serves reads from the replicas and
+    the 'pipeline' mode batches the commands of concurrent clients; both
+    use loadgen.py, as the YCSB Redis binding supports neither.
+    """
+
+    name = 'RedisCluster'
+    engine = 'redis-cluster'
+    directory = 'redis'
+    modes = ('plain', 'replica-reads', 'pipeline')
+    mode_labels = {'plain': '', 'replica-reads': 'ReplicaReads', 'pipeline': 'Pipelined'}
+    subnet = '192.168.6'
+    port = 6379
+
+    def __init__(self, nodes, runner, mode='plain', replicas=0, pipeline=16):
+        super().__init__(nodes, runner, mode)
+        self.replicas = replicas
+        self.pipeline = pipeline
+        self.compose_dir = None
+
+    @property
+    def label(self):
+        return self.name + self.mode_labels[self.mode]
+
+    @property
+    def client(self):
+        return 'loadgen' if self.mode != 'plain' else None
+
+    @property
+    def hosts(self):
+        return [f'{self.subnet}.{i + 2}' for i in range(self.nodes * (1 + self.replicas))]
+
+    @property
+    def compose_file(self):
+        return os.path.join(self.compose_dir, 'docker-compose.yml')
+
+    def up(self):
+        self.compose_dir = tempfile.mkdtemp(prefix=f'redis-cluster-{self.nodes}x{self.replicas}-')
+        with open(self.compose_file, 'w') as file:
+            file.write(self.compose_config())
+        super().up()
+
+    def down(self):
+        try:
+            super().down()
+        finally:
+            shutil.rmtree(self.compose_dir, ignore_errors=True)
+            self.compose_dir = None
+
+    def compose_config(self):
+        """Docker Compose file of the cluster (bitnami/redis-cluster on a fixed subnet)."""
+        hosts = self.hosts
+        lines = [
+            "version: '3.8'",
+            '',
+            'networks:',
+            '  redisCluster:',
+            '    driver: bridge',
+            '    ipam:',
+            '      config:',
+            f'        - subnet: {self.subnet}.0/24',
+            f'          gateway: {self.subnet}.1',
+            '',
+            'services:',
+        ]
+        for i, host in enumerate(hosts):
+            lines += [
+                f'  redis-node-{i}:',
+                f'    container_name: redis-node-{i}',
+                "    image: 'bitnami/redis-cluster:latest'",
+                '    environment:',
+                '      - ALLOW_EMPTY_PASSWORD=yes',
+                f"      - REDIS_NODES={' '.join(hosts)}",
+                f'      - REDIS_CLUSTER_ANNOUNCE_IP={host}',
+            ]
+            # The last node creates the cluster once the others are up
+            if i == len(hosts) - 1:
+                lines += [
+                    '      - REDIS_CLUSTER_CREATOR=yes',
+                    f'      - REDIS_CLUSTER_REPLICAS={self.replicas}',
+                    '    depends_on:',
+                ] + [f'      - redis-node-{j}' for j in range(i)]
+            lines += [
+                '    networks:',
+                '      redisCluster:',
+                f'        ipv4_address: {host}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def redis_cli(self, *args):
+        return self.runner(['docker', 'exec', 'redis-node-0', 'redis-cli'] + list(args), capture=True)
+
+    def cluster_ready(self):
+        info = dict(line.strip().partition(':')[::2] for line in self.redis_cli('CLUSTER', 'INFO').splitlines())
+        return (info.get('cluster_state') == 'ok' and int(info.get('cluster_size', 0)) == self.nodes
+                and int(info.get('cluster_known_nodes', 0)) == len(self.hosts))
+
+    def wait_ready(self, timeout):
+        return wait_until(self.cluster_ready, timeout,
+                          f'Redis Cluster of {self.nodes} masters and {self.replicas} replicas each')
+
+    def reset(self):
+        self.redis_cli('--cluster', 'call', f'{self.hosts[0]}:{self.port}', 'FLUSHALL', '--cluster-only-masters')
+
+    def fault_container(self):
+        # A master of the cluster, whose replica is promoted when there is one
+        return 'redis-node-1' if self.nodes > 1 else 'redis-node-0'
+
+    def footprint(self):
+        # Summed over the masters, which hold one shard of the records each
+        totals = {'ServerMemory(bytes)': 0, 'DataSize(bytes)': 0, 'DiskSize(bytes)': 0}
+        for i in range(len(self.hosts)):
+            container = f'redis-node-{i}'
+            info = parse_info(self.runner(['docker', 'exec', container, 'redis-cli', 'INFO'], capture=True))
+            if info.get('role') != 'master':
+                continue
+            totals['ServerMemory(bytes)'] += int(info['used_memory_rss'])
+            totals['DataSize(bytes)'] += int(info['used_memory_dataset'])
+            totals['DiskSize(bytes)'] += self.disk_usage(container, REDIS_DATA_DIR)
+        return totals
+
+    def settings(self):
+        settings = {'replicas': self.replicas}
+        if self.mode == 'pipeline':
+            settings['pipeline'] = self.pipeline
+        return settings
+
+    def ycsb_command(self, phase, workload_file):
+        return ['./bin/ycsb', phase, 'redis', '-P', workload_file, '-p', f'redis.host={self.hosts[0]}',
+                '-p', f'redis.port={self.port}', '-p', 'redis.cluster=true']
+
+    def loadgen_command(self, phase, workload_file):
+        command = [sys.executable, os.path.join(BASE_DIR, 'loadgen.py'), phase, '-db', 'redis', '-P', workload_file,
+                   '-p', f'redis.host={self.hosts[0]}', '-p', f'redis.port={self.port}', '-p', 'redis.cluster=true']
+        if self.mode == 'replica-reads':
+            command += ['-p', 'redis.readfromreplicas=true']
+        elif self.mode == 'pipeline':
+            command += ['-p', f'redis.pipeline={self.pipeline}']
+        return command
+
+
+class MongoTopology(Topology):
+    """A replica set of 3 (mongoDB/docker-compose.yml) or 5 (docker-compose2.yml) members.
+
+    The modes are the client drivers: the YCSB 'mongodb-async' and 'mongodb'
+    bindings, and 'pymongo' for loadgen.py.  The option sets are the product
+    of the requested write concerns, journal settings, read preferences and
+    pool sizes; an empty list leaves the driver default.
+    """
+
+    name = 'Mongo'
+    engine = 'mongo'
+    directory = 'mongoDB'
+    modes = ('mongodb-async', 'mongodb', 'pymongo')
+    mode_labels = {'mongodb-async': 'AsyncMongo', 'mongodb': 'SyncMongo', 'pymongo': 'PyMongo'}
+    replica_set = 'myReplicaSet'
+    compose_files = {3: 'docker-compose.yml', 5: 'docker-compose2.yml'}
+
+    def __init__(self, nodes, runner, mode='mongodb-async', write_concerns=(), journal=(), read_preferences=(),
+                 pool_sizes=()):
+        super().__init__(nodes, runner, mode)
+        # URL option name -> benchmarked values
+        self.option_values = {'w': write_concerns, 'journal': journal, 'readPreference': read_preferences,
+                              'maxPoolSize': pool_sizes}
+
+    @property
+    def label(self):
+        return self.mode_labels[self.mode]
+
+    @property
+    def client(self):
+        return 'loadgen' if self.mode == 'pymongo' else 'ycsb'
+
+    def default_mode(self, client):
+        return 'pymongo' if client == 'loadgen' else 'mongodb-async'
+
+    def option_sets(self):
+        names = [name for name, values in self.option_values.items() if values]
+        return [dict(zip(names, values)) for values in itertools.product(*(self.option_values[n] for n in names))]
+
+    def settings(self):
+        return dict(self.options)
+
+    @property
+    def compose_file(self):
+        return os.path.join(BASE_DIR, self.directory, self.compose_files[self.nodes])
+
+    @property
+    def url(self):
+        options = ''.join(f'&{name}={value}' for name, value in self.options.items())
+        return f'mongodb://192.168.5.2:27017/ycsb?replicaSet={self.replica_set}{options}'
+
+    def mongosh(self, script, container='primary'):
+        return self.runner(['docker', 'exec', container, 'mongosh', '--quiet', '--eval', script], capture=True)
+
+    def member_states(self):
+        output = self.mongosh('JSON.stringify(rs.status().members.map(m => m.stateStr))')
+        return json.loads(output.strip().splitlines()[-1])
+
+    def initiate(self):
+        members = [{'_id': i, 'host': f'192.168.5.{i + 2}:27017', 'priority': 2 if i == 0 else 1}
+                   for i in range(self.nodes)]
+        config = json.dumps({'_id': self.replica_set, 'members': members})
+        # Already initiated replica sets report an error that is not fatal here
+        self.mongosh(f'try {{ rs.initiate({config}) }} catch (e) {{ print(e.codeName) }}')
+        return True
+
+    def replica_set_ready(self):
+        states = self.member_states()
+        return (len(states) == self.nodes and states.count('PRIMARY') == 1
+                and states.count('SECONDARY') == self.nodes - 1)
+
+    def wait_ready(self, timeout):
+        started = time.monotonic()
+        wait_until(lambda: self.mongosh('db.adminCommand({ping: 1}).ok').strip().endswith('1'), timeout, 'mongod')
+        self.initiate()
+        remaining = timeout - (time.monotonic() - started)
+        wait_until(self.replica_set_ready, remaining, f'Replica set of {self.nodes} members')
+        return time.monotonic() - started
+
+    def reset(self):
+        self.mongosh('db.getSiblingDB("ycsb").usertable.drop()')
+
+    def fault_container(self):
+        # The current primary: 192.168.5.2 is 'primary', 192.168.5.<i + 2> is 'secondary<i>'
+        output = self.mongosh('rs.status().members.filter(m => m.stateStr == "PRIMARY")[0].name')
+        index = int(output.strip().splitlines()[-1].split(':')[0].rsplit('.', 1)[1]) - 2
+        return 'primary' if index == 0 else f'secondary{index}'
+
+    def batch_options(self, batch):
+        # The YCSB MongoDB bindings insert 'batchsize' documents per request; loadgen.py does not batch
+        return ['-p', f'batchsize={batch}'] if self.client == 'ycsb' else []
+
+    def footprint(self):
+        # The primary holds every record, the secondaries a copy of them
+        container = self.fault_container()
+        output = self.mongosh('JSON.stringify({resident: db.serverStatus().mem.resident, '
+                              'data: db.getSiblingDB("ycsb").stats().dataSize})', container)
+        stats = json.loads(output.strip().splitlines()[-1])
+        return {'ServerMemory(bytes)': int(stats['resident']) * 2 ** 20, 'DataSize(bytes)': int(stats['data']),
+                'DiskSize(bytes)': self.disk_usage(container, MONGO_DATA_DIR)}
+
+    def ycsb_command(self, phase, workload_file):
+        return ['./bin/ycsb', phase, self.mode, '-P', workload_file, '-p', f'mongodb.url={self.url}']
+
+    def loadgen_command(self, phase, workload_file):
+        return [sys.executable, os.path.join(BASE_DIR, 'loadgen.py'), phase, '-db', 'mongodb', '-P', workload_file,
+                '-p', f'mongodb.url={self.url}']
+
+
+class EngineTopology(Topology):
+    """Any other engine of engines.py: one container or local process per node, or an embedded store.
+
+    Node i listens on 'port' + i of the host.  The records are reset by
+    restarting the servers (the container engines keep them in memory) or
+    by removing the data folder of an embedded store.  Only the containers
+    are sampled and can be failed over.
+    """
+
+    host = '127.0.0.1'
+
+    def __init__(self, engine, nodes, runner):
+        super().__init__(nodes, runner)
+        self.engine = engine
+        self.spec = ENGINES[engine]
+        self.name = self.spec['label']
+        self.deployment = self.spec['deployment']
+        self.max_clients = self.spec.get('max_clients')
+        self.data_dir = os.path.join(ENGINE_DATA_DIR, f'{self.name}{nodes}')
+        self.processes = []
+
+    @property
+    def client(self):
+        # loadgen.py only drives the engines it has a driver for
+        return None if self.spec.get('loadgen') else 'ycsb'
+
+    @property
+    def ports(self):
+        return [self.spec['port'] + i for i in range(self.nodes)] if 'port' in self.spec else []
+
+    @property
+    def containers(self):
+        return [f'ycsb-{self.engine}-{i}' for i in range(self.nodes)]
+
+    def fill(self, template, port=None, data_dir=None):
+        """Substitute the '{host}', '{port}', '{hosts}' and '{data_dir}' of a registry template."""
+        return template.format(host=self.host, port=port or (self.ports[0] if self.ports else ''),
+                               hosts=','.join(f'{self.host}:{node_port}' for node_port in self.ports),
+                               data_dir=data_dir or self.data_dir)
+
+    def properties(self):
+        return [item for name, value in self.spec.get('properties', {}).items()
+                for item in ('-p', f'{name}={self.fill(value)}')]
+
+    def start_processes(self):
+        for i, port in enumerate(self.ports):
+            node_dir = os.path.join(self.data_dir, str(i))
+            if not self.runner.dry_run:
+                os.makedirs(node_dir, exist_ok=True)
+            command = [self.fill(part, port, node_dir) for part in self.spec['command']]
+            self.processes.append(self.runner.start(command, cwd=node_dir))
+
+    def stop_processes(self):
+        for process in self.processes:
+            if process is not None:
+                process.terminate()
+                process.wait()
+        self.processes = []
+
+    def up(self):
+        if self.deployment == 'container':
+            for name, port in zip(self.containers, self.ports):
+                command = [self.fill(part, self.spec['port']) for part in self.spec.get('command', [])]
+                # Published on the loopback interface only, like the local processes
+                self.runner(['docker', 'run', '-d', '--rm', '--name', name,
+                             '-p', f'{self.host}:{port}:{self.spec["port"]}', self.spec['image']] + command,
+                            capture=True)
+        elif self.deployment == 'process':
+            self.start_processes()
+        elif not self.runner.dry_run:
+            os.makedirs(self.data_dir, exist_ok=True)
+
+    def down(self):
+        if self.deployment == 'container':
+            self.runner(['docker', 'rm', '-f'] + self.containers, capture=True)
+        self.stop_processes()
+        if not self.runner.dry_run:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def container_ids(self):
+        return self.containers if self.deployment == 'container' else []
+
+    def fault_container(self):
+        if self.deployment != 'container':
+            raise NotImplementedError(f'{self.engine} does not run in containers')
+        return self.containers[0]
+
+    def wait_ready(self, timeout):
+        if not self.ports:
+            return 0.0
+        return wait_until(lambda: all(port_open(self.host, port) for port in self.ports), timeout,
+                          f'{self.name} on ports {", ".join(map(str, self.ports))}')
+
+    def reset(self):
+        if self.deployment == 'embedded':
+            self.down()
+            self.up()
+            return
+        if self.deployment == 'container':
+            self.runner(['docker', 'restart'] + self.containers, capture=True)
+        else:
+            self.stop_processes()
+            if not self.runner.dry_run:
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+            self.start_processes()
+        if not self.runner.dry_run:
+            self.wait_ready(READY_TIMEOUT)
+
+    def footprint(self):
+        footprint = {}
+        if self.deployment == 'container':
+            output = self.runner(['docker', 'stats', '--no-stream', '--format', '{{.MemUsage}}'] + self.containers,
+                                 capture=True)
+            footprint['ServerMemory(bytes)'] = int(sum(parse_size(line.partition('/')[0])
+                                                       for line in output.splitlines()))
+        elif self.deployment == 'process':
+            footprint['ServerMemory(bytes)'] = sum(self.process_rss(process.pid) for process in self.processes)
+        if self.deployment != 'container':
+            footprint['DiskSize(bytes)'] = directory_size(self.data_dir)
+        return footprint
+
+    @staticmethod
+    def process_rss(pid):
+        with open(f'/proc/{pid}/status', 'r') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def ycsb_command(self, phase, workload_file):
+        return ['./bin/ycsb', phase, self.spec['binding'], '-P', workload_file] + self.properties()
+
+    def loadgen_command(self, phase, workload_file):
+        return [sys.executable, os.path.join(BASE_DIR, 'loadgen.py'), phase, '-db', self.spec['loadgen'],
+                '-P', workload_file] + self.properties()
+
+
+# Engines of engines.py deployed with the Docker Compose clusters of this repository
+COMPOSE_TOPOLOGIES = {
+    'redis': RedisTopology,
+    'redis-cluster': RedisClusterTopology,
+    'mongo': MongoTopology,
+}
+
+
+def make_topology(database, nodes, runner, args):
+    """Topology of a registered engine, with the client options of the command line."""
+    if database == 'redis-cluster':
+        return RedisClusterTopology(nodes, runner, replicas=args.replicas, pipeline=args.pipeline)
+    if database == 'mongo':
+        return MongoTopology(nodes, runner, write_concerns=args.write_concerns, journal=args.journal,
+                             read_preferences=args.read_preferences, pool_sizes=args.pool_sizes)
+    if database in COMPOSE_TOPOLOGIES:
+        return COMPOSE_TOPOLOGIES[database](nodes, runner)
+    return EngineTopology(database, nodes, runner)
+
+
+class Runner:
+    """Runs (or, with dry_run, prints) commands."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+
+    def __call__(self, command, capture=False, stdout=None, cwd=None, sampler=None, samples_path=None):
+        """Run a command; with a sampler, its resources are sampled into 'samples_path' while it runs."""
+        if self.dry_run:
+            print(' '.join(command))
+            return ''
+        if capture:
+            return subprocess.run(command, check=True, capture_output=True, text=True, cwd=cwd).stdout
+        if sampler is None:
+            return subprocess.run(command, stdout=stdout, stderr=subprocess.STDOUT if stdout else None,
+                                  cwd=cwd).returncode
+        process = subprocess.Popen(command, stdout=stdout, stderr=subprocess.STDOUT if stdout else None, cwd=cwd)
+        with sampler.sampling(process.pid, samples_path):
+            return process.wait()
+
+    def start(self, command, cwd=None):
+        """Start a server process in the background; returns it, or None in a dry run."""
+        if self.dry_run:
+            print(' '.join(command) + ' &')
+            return None
+        return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=cwd)
+
+    def run_all(self, commands, stdouts, cwd=None, sampler=None, samples_path=None):
+        """Start the commands together and wait for them; returns the first non-zero exit status."""
+        if self.dry_run:
+            for command in commands:
+                print(' '.join(command) + ' &')
+            print('wait')
+            return 0
+        processes = [subprocess.Popen(command, stdout=stdout, stderr=subprocess.STDOUT, cwd=cwd)
+                     for command, stdout in zip(commands, stdouts)]
+        if sampler is None:
+            codes = [process.wait() for process in processes]
+        else:
+            # The clients are children of this process, sampled together
+            with sampler.sampling(os.getpid(), samples_path):
+                codes = [process.wait() for process in processes]
+        return next((code for code in codes if code), 0)
+
+
+def workload_label(workload):
+    """'workloada' / 'a' / 'path/to/workloadd' -> 'A' / 'A' / 'D'."""
+    return os.path.basename(workload).lower().replace('workload', '').upper()
+
+
+def workload_path(workload):
+    """Workload file of a letter ('d'), a file name of YCSB/workloads ('workloadd') or a path."""
+    if os.path.isfile(workload):
+        return os.path.abspath(workload)
+    return os.path.join(BASE_DIR, 'YCSB', 'workloads', f'workload{workload_label(workload).lower()}')
+
+
+def results_path(results_dir, phase, topology):
+    return os.path.join(results_dir, f'{phase}{topology.label}{topology.nodes}.csv')
+
+
+def run_phase(topology, runner, phase, workload, try_number, threads, target, client, results_dir, extra,
+              sampler=None, raw=False, injector=None, records=None, load_clients=1, batch=1, clients=1,
+              client_keys='shared'):
+    """Run one phase and append its output, under a header ycsb_parser.py understands, to the results file.
+
+    The client settings are appended to the header ('threads=16 target=2000')
+    and become the Threads and Target columns of the results frame.  The
+    target throughput (0 for unthrottled) only applies to the run phase;
+    throttled runs also report the '[Intended-<OP>]' latencies (omission.py).
+
+    'records' overrides the record count of the workload and appends the
+    footprint of the servers after the phase.  A load phase is split over
+    'load_clients' client processes inserting disjoint key ranges and
+    inserts 'batch' records per request where the client supports it.  A
+    run phase is split over 'clients' processes sharing the operations and
+    the target, each with 'threads' threads, drawing keys from the whole
+    record range ('shared') or from one range per client ('partitioned').
+    The outputs of the client processes are merged into one section
+    (clients.py) tagged with their number ('clients=4').
+    """
+    label = workload_label(workload)
+    workload_file = workload_path(workload)
+
+    loadgen = (topology.client or client) == 'loadgen'
+    if loadgen:
+        command = topology.loadgen_command(phase, workload_file) + ['-s', '-p', 'status.interval=1',
+                                                                    '-p', 'hdrhistogram.fileoutput=true']
+    elif raw:
+        command = topology.ycsb_command(phase, workload_file) + RAW_OPTIONS
+    else:
+        command = topology.ycsb_command(phase, workload_file) + YCSB_OPTIONS
+    command += ['-threads', str(threads)]
+    settings = ' '.join([f'engine={topology.engine}', f'deployment={topology.deployment}', f'threads={threads}']
+                        + [f'{name}={value}' for name, value in topology.settings().items()])
+    if records:
+        command += ['-p', f'recordcount={records}']
+        settings += f' recordcount={records}'
+    loaded = load_workload(workload_file, {'recordcount': records} if records else None)
+    clients = load_clients if phase == 'load' else clients
+    if topology.max_clients:
+        clients = min(clients, topology.max_clients)
+    injector = injector if phase == 'run' else None
+    if injector:
+        # A fixed run time leaves room for the fault, the election and the recovery
+        command += ['-p', f'operationcount={FAILOVER_OPERATIONS}', '-p', f'maxexecutiontime={injector.run_time}']
+        settings += f' fault={injector.action}'
+    if phase == 'run':
+        settings += f' target={target}'
+        if target:
+            # Also measure from the intended start times, to report latencies corrected for coordinated omission;
+            # the clients share the target
+            command += ['-target', str(max(1, round(target / clients))), '-p', 'measurement.interval=both']
+    elif batch > 1 and topology.batch_options(batch):
+        command += topology.batch_options(batch)
+        settings += f' batch={batch}'
+    partitioned = clients > 1 and (phase == 'load' or client_keys == 'partitioned')
+    if clients > 1:
+        settings += f' clients={clients}'
+        if phase == 'run' and partitioned:
+            settings += ' keys=partitioned'
+
+    # The per-run files are named after the settings of the try, so the tries of the sweep points never collide
+    run_name = (f'{phase}{topology.label}{topology.nodes}-{label}{settings_segment(settings_key(settings))}'
+                f'-try{try_number}')
+    hdr_path = os.path.join(results_dir, 'hdr', f'{run_name}-')
+    samples_path = os.path.join(results_dir, 'resources', f'{run_name}.csv')
+    raw_path = os.path.join(results_dir, 'raw', f'{run_name}.raw')
+    events_path = os.path.join(results_dir, FAULTS_DIR, f'{run_name}.json')
+
+    # One command per client process, each with its own latency logs, key range and share of the operations
+    if clients > 1:
+        key_ranges = [None] * clients
+        if partitioned:
+            key_ranges = partition_ranges(loaded['insertstart'], loaded['insertcount'], clients)
+        operations = partition_ranges(0, loaded['operationcount'], clients)
+        # loadgen.py holds its operations back until the start time; the YCSB clients are launched by START_AT
+        starttime = time.time() + CLIENT_START_DELAY
+        commands, hdr_paths, outputs = [], [], []
+        for i, key_range in enumerate(key_ranges, 1):
+            client_hdr_path = f'{hdr_path}client{i}-'
+            options = ['-p', f'hdrhistogram.output.path={client_hdr_path}']
+            if key_range:
+                options += ['-p', f'insertstart={key_range[0]}', '-p', f'insertcount={key_range[1]}']
+            if phase == 'run' and not injector:
+                options += ['-p', f'operationcount={operations[i - 1][1]}']
+            if raw:
+                options += ['-p', f'measurement.raw.output_file={raw_path[:-len(".raw")]}-client{i}.raw']
+            if loadgen:
+                commands.append(command + options + ['-p', f'starttime={starttime:.3f}'] + extra)
+            else:
+                commands.append([sys.executable, '-c', START_AT, f'{starttime:.3f}'] + command + options + extra)
+            hdr_paths.append(client_hdr_path)
+            outputs.append(os.path.join(results_dir, 'clients', f'{run_name}-client{i}.txt'))
+    else:
+        options = ['-p', f'hdrhistogram.output.path={hdr_path}']
+        if raw:
+            options += ['-p', f'measurement.raw.output_file={raw_path}']
+        command += options + extra
+
+    header = 'Loading data' if phase == 'load' else 'Running test'
+    header = f'{header} workload {label} try {try_number} {settings}'
+    path = results_path(results_dir, phase, topology)
+    cwd = os.path.join(BASE_DIR, 'YCSB')
+    if runner.dry_run:
+        print(f'# >> {path}: {header}')
+        if injector:
+            print(f'# {injector.describe()}')
+        return runner.run_all(commands, outputs) if clients > 1 else runner(command)
+    with open(path, 'a') as file:
+        file.write(f'\n{SEPARATOR}\n{header}\n')
+        file.flush()
+        if clients > 1:
+            if not injector:
+                code = launch_clients(runner, commands, outputs, cwd, sampler, samples_path)
+            else:
+                with injector.injecting(events_path):
+                    code = launch_clients(runner, commands, outputs, cwd, sampler, samples_path)
+            file.write('\n'.join(merge_outputs(outputs, hdr_paths)) + '\n')
+        elif not injector:
+            code = runner(command, stdout=file, cwd=cwd, sampler=sampler, samples_path=samples_path)
+        else:
+            with injector.injecting(events_path):
+                code = runner(command, stdout=file, cwd=cwd, sampler=sampler, samples_path=samples_path)
+        if records:
+            write_footprint(file, topology)
+    return code
+
+
+def launch_clients(runner, commands, outputs, cwd, sampler=None, samples_path=None):
+    """Run the client processes of a phase together, each writing to its output file."""
+    os.makedirs(os.path.dirname(outputs[0]), exist_ok=True)
+    files = [open(output, 'w') for output in outputs]
+    try:
+        return runner.run_all(commands, files, cwd=cwd, sampler=sampler, samples_path=samples_path)
+    finally:
+        for file in files:
+            file.close()
+
+
+def write_footprint(file, topology):
+    """Append the '[FOOTPRINT], <Metric>(bytes), value' lines of the topology to a results file."""
+    try:
+        footprint = topology.footprint()
+    except (subprocess.CalledProcessError, OSError, ValueError, KeyError, IndexError) as error:
+        print(f'Footprint of {topology.name} unavailable: {error}', file=sys.stderr)
+        return
+    file.write(''.join(f'[FOOTPRINT], {metric}, {value}\n' for metric, value in footprint.items()))
+    file.flush()
+
+
+def resource_sampler(topology, args):
+    """Return a sampler of the topology's containers, or None when sampling is off or unavailable."""
+    if not args.sample_interval:
+        return None
+    try:
+        return ResourceSampler(topology.container_ids(), args.sample_interval)
+    except (subprocess.CalledProcessError, OSError) as error:
+        print(f'Resource sampling disabled: {error}', file=sys.stderr)
+        return None
+
+
+def workload_inserts(workload):
+    """Whether the run phase of a workload inserts records, which leaves the loaded records changed."""
+    return load_workload(workload_path(workload))['insertproportion'] > 0
+
+
+def run_matrix(args):
+    runner = Runner(args.dry_run)
+    results_dir = os.path.abspath(args.results_dir)
+    if not runner.dry_run:
+        os.makedirs(os.path.join(results_dir, 'hdr'), exist_ok=True)
+        if args.raw_latency:
+            os.makedirs(os.path.join(results_dir, 'raw'), exist_ok=True)
+
+    for database in args.databases:
+        supported = ENGINES[database]['nodes']
+        for nodes in args.nodes or supported:
+            if nodes not in supported:
+                print(f'\nSkipping {database} with {nodes} nodes: engines.py deploys it with '
+                      f'{" or ".join(map(str, supported))} nodes only')
+                continue
+            topology = make_topology(database, nodes, runner, args)
+            print(f'\nBenchmarking {topology.name} with {nodes} nodes')
+
+            # Client settings of the sweep, option sets, record counts and client processes, each run
+            # 'tries' times; the headers and file names of a try carry its settings (run_phase())
+            clients = list(dict.fromkeys(min(count, topology.max_clients or count) for count in args.clients))
+            points = list(itertools.product(args.threads, args.targets, topology.option_sets(),
+                                            args.record_counts or [None], clients))
+            if args.record_counts:
+                # Each point is loaded once and its records reused by the following tries
+                schedule = [(index, try_number, workload) for index in range(len(points))
+                            for try_number in range(1, args.tries + 1) for workload in args.workloads]
+            else:
+                schedule = [(index, try_number, workload) for try_number in range(1, args.tries + 1)
+                            for workload in args.workloads for index in range(len(points))]
+
+            # Client modes of the topology that were requested, each with its own results files
+            modes = [mode for mode in args.modes if mode in topology.modes] or [topology.default_mode(args.client)]
+            if not args.append and not args.dry_run:
+                for mode in modes:
+                    topology.mode = mode
+                    for phase in ('load', 'run'):
+                        # Start the results files of the cell from scratch, as the scripts do
+                        with open(results_path(results_dir, phase, topology), 'w') as file:
+                            file.write(f'Initializing results for {phase.title()} {topology.label} Tests - '
+                                       f'{nodes} nodes configuration\n')
+
+            started = time.monotonic()
+            topology.up()
+            try:
+                if not args.dry_run:
+                    topology.wait_ready(args.timeout)
+                    print(f'{topology.name} cluster ready {time.monotonic() - started:.1f} s after start-up')
+                sampler = resource_sampler(topology, args) if not args.dry_run else None
+                injector = None
+                if args.failover:
+                    injector = FaultInjector(runner, topology.fault_container, args.failover, args.fault_after,
+                                             args.fault_duration, args.fault_run_time)
+                for mode in modes:
+                    topology.mode = mode
+                    # Point whose loaded records are still unchanged, if any
+                    loaded = None
+                    for index, try_number, workload in schedule:
+                        threads, target, options, records, clients = points[index]
+                        topology.options = options
+                        phases = ('run',) if loaded == index else ('load', 'run')
+                        if loaded != index:
+                            topology.reset()
+                        for phase in phases:
+                            code = run_phase(topology, runner, phase, workload, try_number, threads, target,
+                                             args.client, results_dir, args.extra, sampler, args.raw_latency,
+                                             injector, records, args.load_clients, args.load_batch, clients,
+                                             args.client_keys)
+                            if code:
+                                print(f'{phase} of workload {workload_label(workload)} try {try_number} '
+                                      f'on {topology.label} exited with status {code}', file=sys.stderr)
+                        loaded = index if args.record_counts and not workload_inserts(workload) else None
+                        # The next try starts from a healthy cluster again
+                        if injector and not args.dry_run:
+                            topology.wait_ready(args.timeout)
+            finally:
+                topology.down()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark matrix against the engines of engines.py.')
+    parser.add_argument('--databases', nargs='+', choices=sorted(ENGINES), default=sorted(COMPOSE_TOPOLOGIES),
+                        help='engines of engines.py (default: %(default)s)')
+    parser.add_argument('--nodes', nargs='+', type=int,
+                        help='node counts, among those each engine supports (default: all of them)')
+    parser.add_argument('--workloads', nargs='+', default=['a', 'b', 'c'],
+                        help='workload letters of YCSB/workloads (a-f) or workload files')
+    parser.add_argument('--tries', type=int, default=10)
+    parser.add_argument('--threads', nargs='+', type=int, help='client thread counts (default: 1)')
+    parser.add_argument('--targets', nargs='+', type=int, default=[0],
+                        help='target ops/sec of the run phase, 0 for unthrottled (default: 0)')
+    parser.add_argument('--sweep', action='store_true',
+                        help=f'sweep the thread counts {SWEEP_THREADS} into results/sweep/ (see capacity.py)')
+    parser.add_argument('--dataset', action='store_true',
+                        help=f'sweep the record counts {DATASET_RECORD_COUNTS} into results/dataset/, loading each '
+                             'once and reusing it across the tries')
+    parser.add_argument('--record-counts', nargs='+', type=int, metavar='N',
+                        help='record counts of the dataset sweep (implies loading once per record count)')
+    parser.add_argument('--load-clients', type=int,
+                        help=f'client processes splitting the load phase (default: 1, {DATASET_LOAD_CLIENTS} with '
+                             '--dataset)')
+    parser.add_argument('--load-batch', type=int,
+                        help=f'records per insert request of the load phase, where the client supports it '
+                             f'(default: 1, {DATASET_BATCH} with --dataset)')
+    parser.add_argument('--client', choices=('ycsb', 'loadgen'), default='ycsb',
+                        help='YCSB (default) or the Python load generator')
+    parser.add_argument('--clients', nargs='+', type=int, default=[1], metavar='N',
+                        help='client processes sharing each run phase, merged into one result (default: 1)')
+    parser.add_argument('--client-keys', choices=('shared', 'partitioned'), default='shared',
+                        help='whether the clients of a run phase draw keys from the whole record range or each '
+                             'from its own range (default: shared)')
+    parser.add_argument('--replicas', type=int, default=0, help='replicas of each Redis Cluster master')
+    parser.add_argument('--modes', nargs='+', choices=RedisClusterTopology.modes + MongoTopology.modes,
+                        default=['plain'],
+                        help='Redis Cluster client modes: plain YCSB, reads from the replicas or pipelined '
+                             'commands (both with loadgen.py); MongoDB drivers: the YCSB mongodb-async '
+                             '(default) or mongodb binding, or pymongo (loadgen.py)')
+    parser.add_argument('--pipeline', type=int, default=16, help='operations per pipeline in the pipeline mode')
+    parser.add_argument('--write-concerns', nargs='+', default=[], metavar='W',
+                        help='MongoDB write concerns to benchmark (e.g. 1 majority)')
+    parser.add_argument('--journal', nargs='+', choices=('true', 'false'), default=[],
+                        help='MongoDB journal acknowledgement settings to benchmark')
+    parser.add_argument('--read-preferences', nargs='+', default=[],
+                        choices=('primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'),
+                        help='MongoDB read preferences to benchmark')
+    parser.add_argument('--pool-sizes', nargs='+', type=int, default=[], metavar='N',
+                        help='MongoDB connection pool sizes (maxPoolSize) to benchmark')
+    parser.add_argument('--results-dir', help='output directory (default: results/, or results/sweep/ with --sweep, '
+                                              'results/dataset/ with --dataset, results/failover/ with --failover)')
+    parser.add_argument('--timeout', type=float, default=READY_TIMEOUT, help='seconds to wait for the cluster')
+    parser.add_argument('--sample-interval', type=float, default=INTERVAL,
+                        help='resource sampling period in seconds, 0 to disable (default: %(default)s)')
+    parser.add_argument('--failover', choices=sorted(FAULT_ACTIONS),
+                        help='stop, kill or pause the primary/master during every run phase (see failover.py)')
+    parser.add_argument('--fault-after', type=float, default=FAULT_AFTER,
+                        help='seconds into the run phase before the fault (default: %(default)s)')
+    parser.add_argument('--fault-duration', type=float, default=FAULT_DURATION,
+                        help='seconds before the container is restarted or unpaused (default: %(default)s)')
+    parser.add_argument('--fault-run-time', type=int, default=RUN_TIME,
+                        help='duration of the run phases of a failover benchmark in seconds (default: %(default)s)')
+    parser.add_argument('--raw-latency', action='store_true',
+                        help='log every operation latency to results/raw/ instead of HdrHistograms (rawlatency.py)')
+    parser.add_argument('--append', action='store_true', help='append to the existing results files')
+    parser.add_argument('--dry-run', action='store_true', help='print the commands instead of running them')
+    parser.add_argument('-p', dest='extra', action='append', default=[], metavar='KEY=VALUE',
+                        help='extra property passed to every phase')
+    args = parser.parse_args(argv)
+    try:
+        validate()
+    except ValueError as error:
+        parser.error(f'engines.py: {error}')
+    if 'replica-reads' in args.modes and not args.replicas:
+        parser.error('--modes replica-reads needs --replicas 1 or more')
+    if args.failover and any(ENGINES[database]['deployment'] in ('process', 'embedded') for database in args.databases):
+        parser.error('--failover needs engines deployed in containers')
+    inserting = [workload for workload in args.workloads if workload_inserts(workload)]
+    if max(args.clients) > 1 and inserting:
+        # YCSB numbers the inserts of a run from the record count in every client
+        parser.error(f'--clients above 1 would insert colliding keys with workloads {", ".join(inserting)}')
+    args.extra = [item for prop in args.extra for item in ('-p', prop)]
+    if args.threads is None:
+        args.threads = SWEEP_THREADS if args.sweep else [1]
+    if args.record_counts is None and args.dataset:
+        args.record_counts = DATASET_RECORD_COUNTS
+    if args.load_clients is None:
+        args.load_clients = DATASET_LOAD_CLIENTS if args.dataset else 1
+    if args.load_batch is None:
+        args.load_batch = DATASET_BATCH if args.dataset else 1
+    if args.results_dir is None:
+        args.results_dir = os.path.join(BASE_DIR, 'results', 'sweep' if args.sweep else
+                                        'dataset' if args.dataset else 'failover' if args.failover else '')
+
+    try:
+        run_matrix(args)
+    except TimeoutError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""Bounded-memory statistics over YCSB raw per-operation latency logs.
+
+With '-p measurementtype=raw -p measurement.raw.output_file=<path>' YCSB
+writes one '<OPERATION>,<timestamp (ms)>,<latency (us)>' line per operation,
+preceded by a '<OPERATION> latency raw data: op, timestamp(ms), latency(us)'
+line for each operation.  At tens of millions of operations per try those
+files are gigabytes, so they are never read whole: the file is memory-mapped
+and parsed in windows of BLOCK_BYTES cut at line boundaries, and every block
+is folded into per-operation accumulators whose size does not depend on the
+number of lines:
+
+* an HdrHistogram (hdr.Histogram, 3 significant digits) or, with
+  method='exact', the exact counts of every distinct latency value, for the
+  percentiles and the CDF;
+* per-second rollups (operations, mean and max latency) indexed by the
+  second of the run.
+
+The benchmark scripts name the logs '<phase><Database><Nodes>-<workload>[-<settings>]-try<N>.raw',
+the settings of the run ('-threads=16-target=0') keeping its configurations apart.
+
+Usage: python3 rawlatency.py results/raw/ --percentiles 50 99 99.9 --method exact --rollups rollups.csv
+"""
+import argparse
+import io
+import mmap
+import os
+import re
+
+import numpy as np
+
+from hdr import DEFAULT_PERCENTILES, Histogram
+from ycsb_parser import DATABASE_DRIVERS, SETTINGS_SEGMENT_RE, segment_settings
+
+# Size of the windows of the memory-mapped file parsed at once
+BLOCK_BYTES = 64 * 1024 * 1024
+
+# '<phase><Database><Nodes>-<workload>[-<setting>=<value>...]-try<N>[-client<I>].raw', the logs of the
+# clients of a try being merged
+RAW_FILENAME_RE = re.compile(r'^(load|run)(\w+?)(\d+)-(?:workload)?(\w+?)' + SETTINGS_SEGMENT_RE
+                             + r'-try(\d+)(?:-client\d+)?\.raw$', re.IGNORECASE)
+
+# '<OPERATION> latency raw data: op, timestamp(ms), latency(us)' lines
+RAW_HEADER_RE = re.compile(rb'^[^\n]*raw data[^\n]*(?:\n|$)', re.MULTILINE)
+
+RAW_COLUMNS = ['Operation', 'Timestamp', 'Latency']
+
+METHODS = ('hdr', 'exact')
+
+
+class ExactCounts:
+    """Exact latency distribution: the count of every distinct value, with the Histogram interface."""
+
+    def __init__(self):
+        self.values = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def record(self, values):
+        """Record an array of values, merging their counts into the distinct values seen so far."""
+        values, counts = np.unique(np.asarray(values, dtype=np.int64), return_counts=True)
+        self.merge(values, counts)
+
+    def add(self, other):
+        self.merge(other.values, other.counts)
+
+    def merge(self, values, counts):
+        merged = np.concatenate([self.values, values])
+        self.values, inverse = np.unique(merged, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(self.values)).astype(np.int64)
+
+    def values_at_percentiles(self, percentiles):
+        """Return the value at each percentile (nearest rank, as Histogram does)."""
+        total = self.total
+        if not total:
+            return np.zeros(len(percentiles), dtype=np.int64)
+        percentiles = np.minimum(np.asarray(percentiles, dtype=float), 100)
+        targets = np.maximum(1, np.floor(percentiles / 100 * total + 0.5)).astype(np.int64)
+        return self.values[np.searchsorted(np.cumsum(self.counts), targets)]
+
+    def min(self):
+        return int(self.values[0]) if len(self.values) else 0
+
+    def max(self):
+        return int(self.values[-1]) if len(self.values) else 0
+
+    def mean(self):
+        total = self.total
+        return float((self.values * self.counts).sum() / total) if total else 0.0
+
+    def distribution(self):
+        return self.values, self.counts
+
+
+def histogram_distribution(histogram):
+    """(highest value of each non-empty bucket, count) of an hdr.Histogram."""
+    nonzero = np.flatnonzero(histogram.counts)
+    return histogram.highest_equivalent(nonzero), histogram.counts[nonzero]
+
+
+class Rollup:
+    """Per-second operation count, latency sum and max latency, grown as new seconds appear."""
+
+    def __init__(self):
+        self.first = None
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0, dtype=np.float64)
+        self.maxima = np.zeros(0, dtype=np.int64)
+
+    def extend(self, low, high):
+        """Grow the arrays to cover the seconds 'low' to 'high'; returns their size."""
+        if self.first is None:
+            self.first = low
+        # The operations of a log are not in time order: extend the arrays on both sides
+        if low < self.first:
+            pad = self.first - low
+            self.counts, self.sums, self.maxima = (np.concatenate([np.zeros(pad, a.dtype), a])
+                                                   for a in (self.counts, self.sums, self.maxima))
+            self.first = low
+        size = max(high - self.first + 1, len(self.counts))
+        if size > len(self.counts):
+            pad = size - len(self.counts)
+            self.counts, self.sums, self.maxima = (np.concatenate([a, np.zeros(pad, a.dtype)])
+                                                   for a in (self.counts, self.sums, self.maxima))
+        return size
+
+    def record(self, seconds, latencies):
+        size = self.extend(int(seconds.min()), int(seconds.max()))
+        offsets = seconds - self.first
+        self.counts += np.bincount(offsets, minlength=size)
+        self.sums += np.bincount(offsets, weights=latencies, minlength=size)
+        np.maximum.at(self.maxima, offsets, latencies)
+
+    def add(self, other, shift=0):
+        """Add the seconds of another rollup, aligned on their epoch seconds moved by 'shift' seconds."""
+        if other.first is None:
+            return
+        first = other.first + shift
+        self.extend(first, first + len(other.counts) - 1)
+        window = slice(first - self.first, first - self.first + len(other.counts))
+        self.counts[window] += other.counts
+        self.sums[window] += other.sums
+        np.maximum(self.maxima[window], other.maxima, out=self.maxima[window])
+
+
+class RawSummary:
+    """Latency accumulators of every operation of one or more raw logs."""
+
+    def __init__(self, method='hdr'):
+        if method not in METHODS:
+            raise ValueError(f'Unknown percentile method {method!r}, expected one of {METHODS}')
+        self.method = method
+        self.distributions = {}
+        self.rollups = {}
+
+    def record(self, operation, timestamps, latencies):
+        if operation not in self.distributions:
+            self.distributions[operation] = Histogram() if self.method == 'hdr' else ExactCounts()
+            self.rollups[operation] = Rollup()
+        self.distributions[operation].record(latencies)
+        self.rollups[operation].record(timestamps // 1000, latencies)
+
+    @property
+    def first(self):
+        """First second of the operations of the summary, or None when it is empty."""
+        return min((rollup.first for rollup in self.rollups.values() if rollup.first is not None), default=None)
+
+    def add(self, other, relative=False):
+        """Merge the distributions and the per-second rollups of another summary.
+
+        The rollups are aligned on their epoch seconds (the client logs of a
+        try), or with 'relative' on the first second of each summary (tries
+        run at different times).
+        """
+        shift = 0
+        if relative and self.first is not None and other.first is not None:
+            shift = self.first - other.first
+        for operation, distribution in other.distributions.items():
+            if operation in self.distributions:
+                self.distributions[operation].add(distribution)
+            else:
+                self.distributions[operation] = distribution
+                self.rollups[operation] = Rollup()
+            self.rollups[operation].add(other.rollups[operation], shift)
+
+
+def iter_blocks(path, block_bytes=BLOCK_BYTES):
+    """Yield (operations, timestamps, latencies) arrays for every window of a raw log.
+
+    The file is memory-mapped, so only the pages of the current window are
+    resident; each window ends at a line boundary.
+    """
+    import pandas as pd
+
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = released = 0
+            while start < len(data):
+                end = min(start + block_bytes, len(data))
+                if end < len(data):
+                    # Cut after the last complete line of the window
+                    newline = data.rfind(b'\n', start, end)
+                    end = newline + 1 if newline >= start else data.find(b'\n', end) + 1 or len(data)
+                block = RAW_HEADER_RE.sub(b'', data[start:end])
+                start = end
+                # Drop the pages already parsed, or they stay in the resident set until the end
+                release = end - end % mmap.PAGESIZE
+                if hasattr(data, 'madvise') and release > released:
+                    data.madvise(mmap.MADV_DONTNEED, released, release - released)
+                    released = release
+                if not block.strip():
+                    continue
+                df = pd.read_csv(io.BytesIO(block), header=None, names=RAW_COLUMNS, usecols=[0, 1, 2],
+                                 skipinitialspace=True, dtype={'Operation': 'category'}, on_bad_lines='skip')
+                timestamps = pd.to_numeric(df['Timestamp'], errors='coerce')
+                latencies = pd.to_numeric(df['Latency'], errors='coerce')
+                valid = timestamps.notna() & latencies.notna()
+                yield (df['Operation'][valid], timestamps[valid].to_numpy(np.int64),
+                       latencies[valid].to_numpy(np.int64))
+
+
+def summarise_log(path, method='hdr', block_bytes=BLOCK_BYTES):
+    """Fold a raw log into a RawSummary, one block at a time."""
+    summary = RawSummary(method)
+    for operations, timestamps, latencies in iter_blocks(path, block_bytes):
+        codes = operations.cat.codes.to_numpy()
+        for code, operation in enumerate(operations.cat.categories):
+            selected = codes == code
+            if selected.any():
+                summary.record(str(operation).strip(), timestamps[selected], latencies[selected])
+    return summary
+
+
+def parse_raw_filename(filename):
+    """Return (phase, database, nodes, driver, workload, settings, try) for a raw log filename, or None."""
+    match = RAW_FILENAME_RE.match(filename)
+    if not match:
+        return None
+    phase, label, nodes, workload, segment, try_number = match.groups()
+    db_name, driver = DATABASE_DRIVERS.get(label, (label, ''))
+    return phase.lower(), db_name, int(nodes), driver, workload.upper(), segment_settings(segment), int(try_number)
+
+
+def summarise_logs(raw_dir, method='hdr', merge_tries=False, block_bytes=BLOCK_BYTES):
+    """Summarise every raw log of a directory.
+
+    Returns a dict mapping (Phase, Database, Nodes, Driver, Workload, Settings, Try)
+    keys, with Try None when merge_tries is set, to RawSummary objects.
+    """
+    summaries = {}
+    for filename in sorted(os.listdir(raw_dir)):
+        parsed = parse_raw_filename(filename)
+        if not parsed:
+            continue
+        summary = summarise_log(os.path.join(raw_dir, filename), method, block_bytes)
+        # The logs of the clients of a try ran side by side
+        if parsed in summaries:
+            summaries[parsed].add(summary)
+        else:
+            summaries[parsed] = summary
+    if not merge_tries:
+        return summaries
+
+    merged = {}
+    for key, summary in summaries.items():
+        key = key[:6] + (None,)
+        # The tries ran one after the other: their rollups start together
+        if key in merged:
+            merged[key].add(summary, relative=True)
+        else:
+            merged[key] = summary
+    return merged
+
+
+KEY_FIELDS = ('Phase', 'Database', 'Nodes', 'Driver', 'Workload', 'Settings', 'Try')
+
+
+def percentile_table(summaries, percentiles=DEFAULT_PERCENTILES):
+    """One row per summary and operation with the operation count, mean, extremes and percentiles."""
+    import pandas as pd
+
+    rows = []
+    for key, summary in summaries.items():
+        for operation, distribution in summary.distributions.items():
+            row = dict(zip(KEY_FIELDS, key), Operation=operation, Operations=distribution.total,
+                       **{'MinLatency(us)': distribution.min(), 'MaxLatency(us)': distribution.max(),
+                          'AverageLatency(us)': distribution.mean()})
+            for percentile, value in zip(percentiles, distribution.values_at_percentiles(percentiles)):
+                row[f'p{percentile:g}(us)'] = int(value)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def cdf_table(summaries):
+    """Latency CDF of every summary and operation: Latency (us) and cumulative Fraction."""
+    import pandas as pd
+
+    frames = []
+    for key, summary in summaries.items():
+        for operation, distribution in summary.distributions.items():
+            if isinstance(distribution, Histogram):
+                values, counts = histogram_distribution(distribution)
+            else:
+                values, counts = distribution.distribution()
+            if not len(values):
+                continue
+            cumulative = np.cumsum(counts)
+            frame = pd.DataFrame({'Latency': values, 'Fraction': cumulative / cumulative[-1]})
+            for position, (name, value) in enumerate(list(zip(KEY_FIELDS, key)) + [('Operation', operation)]):
+                frame.insert(position, name, value)
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def rollup_table(summaries):
+    """Per-second rollups of every summary and operation: Second, Operations, AverageLatency, MaxLatency."""
+    import pandas as pd
+
+    frames = []
+    for key, summary in summaries.items():
+        for operation, rollup in summary.rollups.items():
+            if rollup.first is None:
+                continue
+            with np.errstate(invalid='ignore', divide='ignore'):
+                average = rollup.sums / rollup.counts
+            frame = pd.DataFrame({'Second': np.arange(len(rollup.counts)), 'Operations': rollup.counts,
+                                  'AverageLatency(us)': average, 'MaxLatency(us)': rollup.maxima})
+            for position, (name, value) in enumerate(list(zip(KEY_FIELDS, key)) + [('Operation', operation)]):
+                frame.insert(position, name, value)
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute percentiles, CDFs and per-second rollups of raw logs.')
+    parser.add_argument('raw_dir', nargs='?', default='results/raw/', help='directory containing the .raw logs')
+    parser.add_argument('--percentiles', nargs='+', type=float, default=list(DEFAULT_PERCENTILES))
+    parser.add_argument('--method', choices=METHODS, default='hdr',
+                        help='HdrHistogram (3 significant digits) or exact distinct-value counts')
+    parser.add_argument('--merge-tries', action='store_true',
+                        help='merge the tries of each configuration, their rollups aligned on their first second')
+    parser.add_argument('--block-mb', type=int, default=BLOCK_BYTES // 2 ** 20, help='size of the parsed windows')
+    parser.add_argument('--output', help='also write the percentile table to this CSV file')
+    parser.add_argument('--cdf', help='write the latency CDFs to this CSV file')
+    parser.add_argument('--rollups', help='write the per-second rollups to this CSV file')
+    args = parser.parse_args(argv)
+
+    summaries = summarise_logs(args.raw_dir, args.method, args.merge_tries, args.block_mb * 2 ** 20)
+    df = percentile_table(summaries, args.percentiles)
+    if df.empty:
+        print(f'No raw latency logs found in {args.raw_dir}')
+        return
+    if args.output:
+        df.to_csv(args.output, index=False)
+    if args.cdf:
+        cdf_table(summaries).to_csv(args.cdf, index=False)
+    if args.rollups:
+        rollup_table(summaries).to_csv(args.rollups, index=False)
+    print(df.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
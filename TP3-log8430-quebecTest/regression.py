@@ -0,0 +1,204 @@
+"""Performance regression gate: compare a new results directory with a pinned baseline.
+
+Every Phase x Database x Nodes x Workload group (split further by driver and
+client options when the baseline records them) is compared on throughput and
+95th/99th percentile latencies.  The comparison uses the per-try distributions:
+a metric regresses when its median moves in the bad direction by more than
+the threshold AND a one-sided Mann-Whitney U test on the tries of both sides
+is significant.  Groups with fewer than MIN_TRIES tries on a side are judged
+on the threshold alone.
+
+A JSON report is written and the exit status is 1 when anything regressed,
+so the command can gate a rerun after an image upgrade.  A group or metric
+of the baseline missing from the new results (a rerun that produced
+nothing, a renamed driver) also fails the check unless --allow-missing.
+
+Usage:
+    python3 regression.py pin results/ --output baselines/baseline.parquet
+    python3 regression.py check new-results/ --baseline baselines/baseline.parquet --report report.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from results_cache import load_long_results
+from stats import cliffs_delta, mann_whitney
+from ycsb_parser import config_dimensions, wide_frame
+
+GROUP_KEYS = ['Phase', 'Database', 'Nodes', 'Workload']
+
+# Checked metrics and the direction in which they get better
+METRICS = {
+    'Throughput': 'higher',
+    'Read95thLatency': 'lower',
+    'Read99thLatency': 'lower',
+    'Update95thLatency': 'lower',
+    'Update99thLatency': 'lower',
+    'Insert95thLatency': 'lower',
+    'Insert99thLatency': 'lower',
+    'Scan95thLatency': 'lower',
+    'Scan99thLatency': 'lower',
+    'ReadModifyWrite95thLatency': 'lower',
+    'ReadModifyWrite99thLatency': 'lower',
+}
+
+# Default thresholds, in percent of the baseline median
+THROUGHPUT_DROP = 5.0
+LATENCY_RISE = 10.0
+ALPHA = 0.05
+
+# Fewer tries than this on a side and no significance test is run
+MIN_TRIES = 3
+
+
+def load_long(path, use_cache=True):
+    """Return the long results frame of a results directory, a pinned baseline file or a warehouse database."""
+    import pandas as pd
+
+    if os.path.isdir(path):
+        return load_long_results(path, use_cache=use_cache)
+    if path.endswith(('.db', '.sqlite')):
+        from warehouse import Warehouse
+
+        with Warehouse(path) as warehouse:
+            return warehouse.query(latest=True, wide=False)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def pin_baseline(results_dir, output):
+    """Store the long results frame of a directory as a baseline file."""
+    df = load_long_results(results_dir)
+    if df.empty:
+        raise ValueError(f'No results files found in {results_dir}')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    if output.endswith('.parquet'):
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+    return df
+
+
+def tries_frame(long_df):
+    """Wide frame (one row per try) of both phases."""
+    if long_df.empty:
+        return long_df
+    # Keep only the columns identifying a try, so both sides pivot alike
+    ignored = ('File', 'Source', 'RunId', 'Timestamp', 'Host', 'Topology', 'WorkloadSHA256')
+    return wide_frame(long_df.drop(columns=[c for c in ignored if c in long_df.columns]))
+
+
+def compare(baseline, candidate, throughput_drop=THROUGHPUT_DROP, latency_rise=LATENCY_RISE, alpha=ALPHA):
+    """Return one check per group and metric present in the baseline.
+
+    'Status' is 'regression', 'improvement', 'ok' or 'missing' (the group
+    or metric is absent from the candidate results).
+    """
+    keys = GROUP_KEYS + config_dimensions(baseline)
+    # Candidates without a dimension ran with the default driver and options
+    candidate = candidate.assign(**{column: '' for column in keys if column not in candidate.columns})
+    candidate_groups = {key: group for key, group in candidate.groupby(keys)}
+    checks = []
+    for key, base in baseline.groupby(keys):
+        new = candidate_groups.get(key)
+        for metric, better in METRICS.items():
+            if metric not in base.columns:
+                continue
+            x = base[metric].dropna().to_numpy(dtype=float)
+            if not len(x):
+                continue
+            check = dict(zip(keys, key), Metric=metric, BaselineTries=len(x), BaselineMedian=float(np.median(x)))
+            check['Nodes'] = int(check['Nodes'])
+            y = new[metric].dropna().to_numpy(dtype=float) if new is not None and metric in new.columns else []
+            if not len(y):
+                checks.append(dict(check, Status='missing'))
+                continue
+
+            change = (np.median(y) - np.median(x)) / np.median(x) * 100 if np.median(x) else 0.0
+            threshold = throughput_drop if better == 'higher' else latency_rise
+            worse = -change if better == 'higher' else change
+            check.update(CandidateTries=len(y), CandidateMedian=float(np.median(y)), Change=float(change),
+                         Threshold=threshold, CliffsDelta=cliffs_delta(y, x))
+
+            # One-sided test in the direction of the change
+            significant = True
+            if len(x) >= MIN_TRIES and len(y) >= MIN_TRIES:
+                alternative = 'greater' if change > 0 else 'less'
+                check['p'] = mann_whitney(y, x, alternative)[1]
+                significant = check['p'] < alpha
+            if worse > threshold and significant:
+                check['Status'] = 'regression'
+            elif -worse > threshold and significant:
+                check['Status'] = 'improvement'
+            else:
+                check['Status'] = 'ok'
+            checks.append(check)
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare new benchmark results with a pinned baseline.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pin = subparsers.add_parser('pin', help='store a results directory as the baseline')
+    pin.add_argument('results_dir', nargs='?', default='results/')
+    pin.add_argument('--output', default='baselines/baseline.parquet', help='baseline file (.parquet or .csv)')
+
+    check = subparsers.add_parser('check', help='compare a results directory with the baseline')
+    check.add_argument('results_dir', help='directory containing the new result files')
+    check.add_argument('--baseline', default='baselines/baseline.parquet',
+                       help='pinned baseline file or results directory')
+    check.add_argument('--throughput-drop', type=float, default=THROUGHPUT_DROP,
+                       help='largest accepted throughput drop, in %% (default: %(default)s)')
+    check.add_argument('--latency-rise', type=float, default=LATENCY_RISE,
+                       help='largest accepted p95/p99 latency rise, in %% (default: %(default)s)')
+    check.add_argument('--alpha', type=float, default=ALPHA, help='significance level (default: %(default)s)')
+    check.add_argument('--report', help='write the JSON report to this file (default: stdout)')
+    check.add_argument('--allow-missing', action='store_true',
+                       help='pass when groups or metrics of the baseline are missing from the new results')
+    args = parser.parse_args(argv)
+
+    if args.command == 'pin':
+        df = pin_baseline(args.results_dir, args.output)
+        print(f'Pinned {df["File"].nunique()} results files to {args.output}')
+        return 0
+
+    baseline = tries_frame(load_long(args.baseline))
+    candidate = tries_frame(load_long(args.results_dir))
+    if baseline.empty:
+        print(f'No baseline results in {args.baseline}', file=sys.stderr)
+        return 2
+    checks = compare(baseline, candidate, args.throughput_drop, args.latency_rise, args.alpha)
+    regressions = [c for c in checks if c['Status'] == 'regression']
+    missing = [c for c in checks if c['Status'] == 'missing']
+
+    report = {
+        'baseline': args.baseline,
+        'candidate': args.results_dir,
+        'thresholds': {'throughput_drop': args.throughput_drop, 'latency_rise': args.latency_rise,
+                       'alpha': args.alpha},
+        'regressions': len(regressions),
+        'missing': len(missing),
+        'checks': checks,
+    }
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump(report, file, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+
+    for c in regressions:
+        print(f"REGRESSION {c['Phase']} {c['Database']}{c['Nodes']} workload {c['Workload']} {c['Metric']}: "
+              f"{c['BaselineMedian']:.1f} -> {c['CandidateMedian']:.1f} ({c['Change']:+.1f}%)", file=sys.stderr)
+    for c in missing:
+        print(f"MISSING {c['Phase']} {c['Database']}{c['Nodes']} workload {c['Workload']} {c['Metric']}: "
+              f"no tries in {args.results_dir}", file=sys.stderr)
+    return 1 if regressions or (missing and not args.allow_missing) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
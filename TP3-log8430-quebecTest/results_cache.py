@@ -0,0 +1,165 @@
+"""Persistent cache of the parsed results.
+
+The long results frame of each results file is stored in a Parquet fragment
+'<results_dir>/.cache/fragments/<sha256>.parquet', named after the digest of
+the file, and a manifest records the size, mtime and SHA-256 of each source
+file.  On the next call only new or changed files are reparsed and only
+their fragments written, and the fragments no file refers to any more are
+deleted, so a refresh costs the new data, not the whole history.
+"""
+import hashlib
+import json
+import os
+
+from ingest import compact_to_frame, parse_files
+from ycsb_parser import file_metadata, parse_filename, wide_frame
+
+CACHE_DIR = '.cache'
+FRAGMENTS_DIR = 'fragments'
+MANIFEST_FILE = 'manifest.json'
+
+# Single-file cache of the versions before the fragments
+LEGACY_CACHE_FILE = 'results.parquet'
+
+# Bumped whenever the parsed columns change, so that older caches are rebuilt
+CACHE_VERSION = 4
+VERSION_KEY = '.version'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_key(path, previous=None):
+    """Return the manifest entry {size, mtime, sha256} of a file.
+
+    The content hash is only recomputed when size or mtime differ from the
+    previous entry, so unchanged files cost a single stat() call.
+    """
+    stat = os.stat(path)
+    key = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+    if previous and previous['size'] == key['size'] and previous['mtime'] == key['mtime']:
+        key['sha256'] = previous['sha256']
+    else:
+        key['sha256'] = file_digest(path)
+    return key
+
+
+def fragment_path(cache_dir, digest):
+    return os.path.join(cache_dir, FRAGMENTS_DIR, f'{digest}.parquet')
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get(VERSION_KEY) == CACHE_VERSION else {}
+
+
+def _read_fragment(cache_dir, digest):
+    import pandas as pd
+
+    try:
+        return pd.read_parquet(fragment_path(cache_dir, digest))
+    except (OSError, ValueError, ImportError):
+        # A missing, corrupt or unreadable fragment is simply reparsed
+        return None
+
+
+def _write_atomic(path, write):
+    # Write to a temporary file first so an interrupted run never leaves a
+    # truncated fragment or manifest
+    write(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def _write_fragment(cache_dir, digest, df):
+    os.makedirs(os.path.join(cache_dir, FRAGMENTS_DIR), exist_ok=True)
+    _write_atomic(fragment_path(cache_dir, digest), lambda path: df.to_parquet(path, index=False))
+
+
+def _write_manifest(cache_dir, manifest):
+    def write(path):
+        with open(path, 'w') as file:
+            json.dump(manifest, file, indent=1, sort_keys=True)
+
+    _write_atomic(os.path.join(cache_dir, MANIFEST_FILE), write)
+
+
+def _evict_fragments(cache_dir, manifest):
+    """Delete the fragments no file of the manifest refers to, and the cache of older versions."""
+    digests = {key['sha256'] for name, key in manifest.items() if name != VERSION_KEY}
+    fragments_dir = os.path.join(cache_dir, FRAGMENTS_DIR)
+    for filename in os.listdir(fragments_dir) if os.path.isdir(fragments_dir) else []:
+        if filename[:-len('.parquet')] not in digests:
+            os.remove(os.path.join(fragments_dir, filename))
+    if os.path.exists(os.path.join(cache_dir, LEGACY_CACHE_FILE)):
+        os.remove(os.path.join(cache_dir, LEGACY_CACHE_FILE))
+
+
+def load_long_results(results_dir, use_cache=True, workers=None):
+    """Return the long results frame of every results file in a directory.
+
+    The frame has a 'File' column naming the source file of each row.
+    """
+    import pandas as pd
+
+    filenames = sorted(f for f in os.listdir(results_dir) if parse_filename(f))
+    cache_dir = os.path.join(results_dir, CACHE_DIR)
+    manifest = _read_manifest(cache_dir) if use_cache else {}
+
+    # Compare every source file with its manifest entry, reading the fragments of the unchanged ones
+    new_manifest = {VERSION_KEY: CACHE_VERSION}
+    fragments = {}
+    stale = []
+    for filename in filenames:
+        key = file_key(os.path.join(results_dir, filename), manifest.get(filename))
+        new_manifest[filename] = key
+        if manifest.get(filename, {}).get('sha256') == key['sha256']:
+            fragments[filename] = _read_fragment(cache_dir, key['sha256'])
+        if fragments.get(filename) is None:
+            stale.append(filename)
+
+    # Reparse only new or changed files, on a process pool when there are several
+    compacts = parse_files([os.path.join(results_dir, f) for f in stale], workers=workers)
+    for filename, compact in zip(stale, compacts):
+        fragments[filename] = compact_to_frame(compact)
+        if use_cache:
+            try:
+                _write_fragment(cache_dir, new_manifest[filename]['sha256'], fragments[filename])
+            except ImportError as error:
+                # Parquet support (pyarrow) is optional, parse without a cache
+                print(f'Results cache disabled: {error}')
+                use_cache = False
+    if use_cache and new_manifest != manifest:
+        _write_manifest(cache_dir, new_manifest)
+        _evict_fragments(cache_dir, new_manifest)
+
+    frames = []
+    for filename in filenames:
+        fragment = fragments[filename]
+        for position, (name, value) in enumerate(dict(File=filename, **file_metadata(filename)).items()):
+            fragment.insert(position, name, value)
+        frames.append(fragment)
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    for column in ('File', 'Database', 'Driver', 'Phase', 'Workload', 'Section', 'Metric'):
+        df[column] = df[column].astype(str)
+    return df
+
+
+def load_results(results_dir, phase, use_cache=True, workers=None):
+    """Return the wide results frame (one row per try) for one phase."""
+    df = load_long_results(results_dir, use_cache=use_cache, workers=workers)
+    if df.empty:
+        return df
+    df = df[df['Phase'] == phase].drop(columns='File')
+    return wide_frame(df)
@@ -0,0 +1,357 @@
+"""Server and client resource sampling during the benchmark phases.
+
+While a load or run phase executes, a background thread samples every
+'interval' seconds the cumulative CPU time, resident memory, network and
+disk I/O counters of each database container and of the client process
+tree (YCSB's JVM or loadgen.py).  Container counters are read from the
+container's cgroup and network namespace under /proc and /sys/fs/cgroup
+(cgroup v1 or v2); when these are not readable, e.g. with a remote Docker
+daemon, 'docker stats' is polled instead, which cannot go below about one
+sample per second.
+
+The samples of each try are written to
+'<results_dir>/resources/<phase><Database><Nodes>-<workload>[-<settings>]-try<N>.csv',
+the naming of the HdrHistogram logs, and load_resources() summarises them
+into per-try columns joined to the results frame on timeseries.TRY_KEYS:
+ServerCPU and ClientCPU (cores), ServerRSS(MB), NetworkBytes and DiskBytes
+of the database containers, OpsPerCore and BytesPerOp.
+
+Usage: python3 sampler.py results/ --phase run
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+from ycsb_parser import DATABASE_DRIVERS, SETTINGS_SEGMENT_RE, segment_settings
+
+# Default sampling period, in seconds
+INTERVAL = 0.25
+
+# '<phase><Database><Nodes>-<workload>[-<setting>=<value>...]-try<N>.csv'
+SAMPLES_FILENAME_RE = re.compile(r'^(load|run)(\w+?)(\d+)-(?:workload)?(\w+?)' + SETTINGS_SEGMENT_RE
+                                 + r'-try(\d+)\.csv$', re.IGNORECASE)
+
+# Cumulative counters of one sample, in the column order of the samples files
+COUNTERS = ('CPU(s)', 'RSS(bytes)', 'NetRx(bytes)', 'NetTx(bytes)', 'DiskRead(bytes)', 'DiskWrite(bytes)')
+SAMPLE_COLUMNS = ('Time(ms)', 'Container') + COUNTERS
+
+# Container name of the client process tree in the samples
+CLIENT = 'client'
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# 'docker stats' sizes: '1.5MiB', '12kB', '3.2GB'
+SIZE_RE = re.compile(r'([\d.]+)\s*([kKMGT]?i?B)')
+SIZE_UNITS = {'B': 1, 'kB': 1e3, 'KB': 1e3, 'MB': 1e6, 'GB': 1e9, 'TB': 1e12,
+              'KiB': 1 << 10, 'kiB': 1 << 10, 'MiB': 1 << 20, 'GiB': 1 << 30, 'TiB': 1 << 40}
+
+
+def read_file(path):
+    with open(path, 'r') as file:
+        return file.read()
+
+
+def read_keyed(path):
+    """Return the 'key value' lines of a cgroup stat file as a dict of ints."""
+    values = {}
+    for line in read_file(path).splitlines():
+        key, _, value = line.partition(' ')
+        if value.strip().isdigit():
+            values[key] = int(value)
+    return values
+
+
+def network_counters(pid):
+    """Return (received, transmitted) bytes of the non-loopback interfaces seen by a process."""
+    rx = tx = 0
+    for line in read_file(f'/proc/{pid}/net/dev').splitlines()[2:]:
+        interface, _, fields = line.partition(':')
+        if interface.strip() == 'lo':
+            continue
+        fields = fields.split()
+        rx += int(fields[0])
+        tx += int(fields[8])
+    return rx, tx
+
+
+def process_tree(pid):
+    """Return a process and all its descendants."""
+    pids = [pid]
+    for parent in pids:
+        try:
+            for task in os.listdir(f'/proc/{parent}/task'):
+                pids += [int(child) for child in read_file(f'/proc/{parent}/task/{task}/children').split()]
+        except OSError:
+            # The process exited
+            continue
+    return pids
+
+
+def process_counters(pid):
+    """Return the COUNTERS of a process tree read from /proc."""
+    cpu = rss = read_bytes = write_bytes = 0
+    for member in process_tree(pid):
+        try:
+            # Fields after the parenthesised command name: utime and stime are the 12th and 13th
+            fields = read_file(f'/proc/{member}/stat').rpartition(')')[2].split()
+            cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            rss += int(read_file(f'/proc/{member}/statm').split()[1]) * PAGE_SIZE
+            io = read_keyed(f'/proc/{member}/io') if os.access(f'/proc/{member}/io', os.R_OK) else {}
+            read_bytes += io.get('read_bytes:', 0)
+            write_bytes += io.get('write_bytes:', 0)
+        except (OSError, IndexError, ValueError):
+            continue
+    rx, tx = network_counters(pid)
+    return cpu, rss, rx, tx, read_bytes, write_bytes
+
+
+class CgroupContainer:
+    """Counters of a container read from its cgroup (v1 or v2) and its network namespace."""
+
+    def __init__(self, name, pid):
+        self.name = name
+        self.pid = pid
+        self.paths = {}
+        for line in read_file(f'/proc/{pid}/cgroup').splitlines():
+            _, controllers, path = line.split(':', 2)
+            for controller in controllers.split(',') if controllers else ['unified']:
+                self.paths[controller] = path
+        self.v2 = 'unified' in self.paths and not any(c in self.paths for c in ('cpuacct', 'memory'))
+        # Fail now rather than while sampling when the cgroup is not readable
+        self.counters()
+
+    def cgroup_file(self, controller, name):
+        if self.v2:
+            return os.path.join(CGROUP_ROOT, self.paths['unified'].lstrip('/'), name)
+        return os.path.join(CGROUP_ROOT, controller, self.paths[controller].lstrip('/'), name)
+
+    def counters(self):
+        if self.v2:
+            cpu = read_keyed(self.cgroup_file('cpu', 'cpu.stat'))['usage_usec'] / 1e6
+            memory = read_keyed(self.cgroup_file('memory', 'memory.stat'))
+            rss = memory.get('anon', 0)
+            read_bytes = write_bytes = 0
+            for line in read_file(self.cgroup_file('io', 'io.stat')).splitlines():
+                fields = dict(field.split('=', 1) for field in line.split()[1:] if '=' in field)
+                read_bytes += int(fields.get('rbytes', 0))
+                write_bytes += int(fields.get('wbytes', 0))
+        else:
+            cpu = int(read_file(self.cgroup_file('cpuacct', 'cpuacct.usage'))) / 1e9
+            rss = read_keyed(self.cgroup_file('memory', 'memory.stat')).get('rss', 0)
+            read_bytes = write_bytes = 0
+            for line in read_file(self.cgroup_file('blkio', 'blkio.throttle.io_service_bytes')).splitlines():
+                fields = line.split()
+                if len(fields) == 3 and fields[1] == 'Read':
+                    read_bytes += int(fields[2])
+                elif len(fields) == 3 and fields[1] == 'Write':
+                    write_bytes += int(fields[2])
+        rx, tx = network_counters(self.pid)
+        return cpu, rss, rx, tx, read_bytes, write_bytes
+
+
+def parse_size(text):
+    match = SIZE_RE.search(text)
+    return float(match.group(1)) * SIZE_UNITS.get(match.group(2), 1) if match else 0.0
+
+
+class DockerStats:
+    """Counters of containers polled with 'docker stats', for hosts whose cgroups are not readable.
+
+    'docker stats' reports a CPU percentage, integrated here into CPU seconds.
+    """
+
+    def __init__(self, containers):
+        self.containers = containers
+        self.cpu = {name: 0.0 for name in containers.values()}
+        self.last = None
+
+    def counters(self):
+        output = subprocess.run(['docker', 'stats', '--no-stream', '--format', '{{json .}}']
+                                + list(self.containers), check=True, capture_output=True, text=True).stdout
+        now = time.monotonic()
+        elapsed = now - self.last if self.last is not None else 0.0
+        self.last = now
+
+        samples = {}
+        for line in output.splitlines():
+            stats = json.loads(line)
+            name = stats['Name']
+            if name not in self.cpu:
+                continue
+            self.cpu[name] += float(stats['CPUPerc'].rstrip('%') or 0) / 100 * elapsed
+            rx, _, tx = stats['NetIO'].partition('/')
+            read_bytes, _, write_bytes = stats['BlockIO'].partition('/')
+            samples[name] = (self.cpu[name], parse_size(stats['MemUsage'].partition('/')[0]),
+                             parse_size(rx), parse_size(tx), parse_size(read_bytes), parse_size(write_bytes))
+        return samples
+
+
+def inspect_containers(container_ids):
+    """Return {container id: (name, pid)} of running containers."""
+    if not container_ids:
+        return {}
+    output = subprocess.run(['docker', 'inspect', '--format', '{{.Id}} {{.Name}} {{.State.Pid}}']
+                            + list(container_ids), check=True, capture_output=True, text=True).stdout
+    containers = {}
+    for line in output.splitlines():
+        container_id, name, pid = line.split()
+        containers[container_id] = (name.lstrip('/'), int(pid))
+    return containers
+
+
+class ResourceSampler:
+    """Samples the database containers and a client process tree in a background thread."""
+
+    def __init__(self, container_ids, interval=INTERVAL):
+        self.interval = interval
+        containers = inspect_containers(container_ids)
+        try:
+            self.cgroups = [CgroupContainer(name, pid) for name, pid in containers.values()]
+            self.docker_stats = None
+        except (OSError, KeyError, ValueError):
+            self.cgroups = []
+            self.docker_stats = DockerStats({cid: name for cid, (name, _) in containers.items()})
+        self.samples = []
+
+    def sample(self, started, client_pid):
+        now = int((time.monotonic() - started) * 1000)
+        if self.docker_stats is not None:
+            for name, counters in self.docker_stats.counters().items():
+                self.samples.append((now, name) + counters)
+        for container in self.cgroups:
+            try:
+                self.samples.append((now, container.name) + container.counters())
+            except (OSError, KeyError, ValueError):
+                # The container is restarting
+                pass
+        try:
+            self.samples.append((now, CLIENT) + process_counters(client_pid))
+        except (OSError, ValueError):
+            pass
+
+    @contextmanager
+    def sampling(self, client_pid, path):
+        """Sample while the block runs, then write the samples to 'path'."""
+        self.samples = []
+        stop = threading.Event()
+        started = time.monotonic()
+
+        def loop():
+            while True:
+                try:
+                    self.sample(started, client_pid)
+                except (subprocess.CalledProcessError, OSError, ValueError):
+                    pass
+                if stop.wait(self.interval):
+                    break
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
+            write_samples(path, self.samples)
+
+
+def write_samples(path, samples):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(SAMPLE_COLUMNS)
+        writer.writerows(samples)
+
+
+def parse_samples_filename(filename):
+    """Return (phase, database, nodes, driver, workload, try, settings) for a samples filename, or None."""
+    match = SAMPLES_FILENAME_RE.match(filename)
+    if not match:
+        return None
+    phase, label, nodes, workload, segment, try_number = match.groups()
+    db_name, driver = DATABASE_DRIVERS.get(label, (label, ''))
+    return phase.lower(), db_name, int(nodes), driver, workload.upper(), int(try_number), segment_settings(segment)
+
+
+def summarise_samples(samples):
+    """Return the per-try resource columns of one samples frame."""
+    duration = (samples['Time(ms)'].max() - samples['Time(ms)'].min()) / 1000
+    first = samples.groupby('Container')[list(COUNTERS)].first()
+    last = samples.groupby('Container')[list(COUNTERS)].last()
+    used = last - first
+    server = used.drop(index=CLIENT, errors='ignore')
+    memory = samples[samples['Container'] != CLIENT].groupby('Time(ms)')['RSS(bytes)'].sum()
+    nan = float('nan')
+    summary = {
+        'ServerCPU': server['CPU(s)'].sum() / duration if duration else nan,
+        'ClientCPU': used.loc[CLIENT, 'CPU(s)'] / duration if duration and CLIENT in used.index else nan,
+        'ServerRSS(MB)': memory.max() / 2 ** 20 if len(memory) else nan,
+        'NetworkBytes': server['NetRx(bytes)'].sum() + server['NetTx(bytes)'].sum(),
+        'DiskBytes': server['DiskRead(bytes)'].sum() + server['DiskWrite(bytes)'].sum(),
+    }
+    if server.empty:
+        # Only the client was sampled
+        summary.update(ServerCPU=nan, NetworkBytes=nan, DiskBytes=nan)
+    return summary
+
+
+def load_resources(results_dir, phase=None):
+    """Return one row per try with its resource summary, keyed by timeseries.TRY_KEYS."""
+    import pandas as pd
+
+    fields = ('Phase', 'Database', 'Nodes', 'Driver', 'Workload', 'Try', 'Settings')
+    resources_dir = os.path.join(results_dir, 'resources')
+    rows = []
+    if os.path.isdir(resources_dir):
+        for filename in sorted(os.listdir(resources_dir)):
+            parsed = parse_samples_filename(filename)
+            if not parsed or (phase and parsed[0] != phase):
+                continue
+            samples = pd.read_csv(os.path.join(resources_dir, filename))
+            if samples.empty:
+                continue
+            rows.append(dict(zip(fields, parsed), **summarise_samples(samples)))
+    return pd.DataFrame(rows)
+
+
+def join_resources(df, resources):
+    """Join the resource summary to a wide results frame and add OpsPerCore and BytesPerOp."""
+    from timeseries import TRY_KEYS
+
+    if resources.empty or df.empty:
+        return df
+    df = df.merge(resources, on=TRY_KEYS, how='left')
+    # Operations of the try, from the overall throughput and runtime
+    operations = df['Throughput'] * df['RunTime'] / 1000
+    df['OpsPerCore'] = df['Throughput'] / df['ServerCPU'].where(df['ServerCPU'] > 0)
+    df['BytesPerOp'] = df['NetworkBytes'] / operations.where(operations > 0)
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarise the resource samples of every try.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory containing the result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    args = parser.parse_args(argv)
+
+    from results_cache import load_results
+
+    resources = load_resources(args.results_dir, args.phase)
+    if resources.empty:
+        print(f'No resource samples found in {os.path.join(args.results_dir, "resources")}')
+        return
+    df = join_resources(load_results(args.results_dir, args.phase), resources)
+    columns = ['Throughput', 'ServerCPU', 'ClientCPU', 'ServerRSS(MB)', 'OpsPerCore', 'BytesPerOp']
+    print(df.groupby(['Database', 'Nodes', 'Driver', 'Workload'])[columns].mean().to_string(float_format='%.2f'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""Bootstrap confidence intervals and pairwise significance tests of the results.
+
+Confidence intervals of the mean are computed for every group at once:
+groups of the same size are stacked into a matrix and resampled together,
+each with its own bootstrap indices so their intervals are independent.  With a weight column (see
+validity.py), groups of unequal weights are resampled with probabilities
+proportional to the weights, which bootstraps their weighted mean.  They are cached in
+'<results_dir>/.cache/' keyed by the data they were computed from, and the
+bar figures draw these precomputed error bars instead of bootstrapping
+again in seaborn.
+
+Pairwise comparisons run a two-sided Mann-Whitney U test between every pair
+of Database_Nodes configurations of each workload, with Holm-corrected
+p-values and Cliff's delta as the effect size.
+
+Usage: python3 stats.py results/ --phase run --metrics Throughput AvgReadLatency
+"""
+import argparse
+import hashlib
+import itertools
+import os
+
+import numpy as np
+
+from results_cache import CACHE_DIR
+from validity import POLICIES
+
+GROUP_COLUMNS = ['Database_Nodes', 'Workload_Label']
+
+N_BOOT = 10000
+CONFIDENCE = 0.95
+ALPHA = 0.05
+
+# Number of bootstrap resamples drawn per batch, to bound memory
+BATCH_SIZE = 2000
+
+# Bumped whenever the intervals computed from the same data change, so that older cached ones are recomputed
+INTERVALS_VERSION = 2
+
+# Magnitude thresholds of Cliff's delta (Romano et al., 2006)
+CLIFFS_DELTA_MAGNITUDES = ((0.147, 'negligible'), (0.33, 'small'), (0.474, 'medium'), (np.inf, 'large'))
+
+
+def bootstrap_means(samples, n_boot=N_BOOT, rng=None):
+    """Return the (groups, n_boot) bootstrap means of equally sized samples (groups, n)."""
+    rng = np.random.default_rng(rng)
+    samples = np.asarray(samples, dtype=float)
+    groups, n = samples.shape
+    means = np.empty((groups, n_boot))
+    for start in range(0, n_boot, BATCH_SIZE):
+        size = min(BATCH_SIZE, n_boot - start)
+        # Independent resampling indices for every group
+        indexes = rng.integers(0, n, size=(groups, size, n))
+        means[:, start:start + size] = np.take_along_axis(samples[:, np.newaxis, :], indexes, axis=2).mean(axis=2)
+    return means
+
+
+def weighted_bootstrap_means(values, weights, n_boot=N_BOOT, rng=None):
+    """Return the n_boot bootstrap means of one sample resampled with probabilities proportional to 'weights'."""
+    rng = np.random.default_rng(rng)
+    probabilities = np.asarray(weights, dtype=float) / np.sum(weights)
+    means = np.empty(n_boot)
+    for start in range(0, n_boot, BATCH_SIZE):
+        size = min(BATCH_SIZE, n_boot - start)
+        indexes = rng.choice(len(values), size=(size, len(values)), p=probabilities)
+        means[start:start + size] = values[indexes].mean(axis=1)
+    return means
+
+
+def bootstrap_intervals(df, metric, groups=GROUP_COLUMNS, n_boot=N_BOOT, confidence=CONFIDENCE, seed=0,
+                        weights=None):
+    """Return one row per group with the mean of 'metric' and its percentile bootstrap CI.
+
+    'weights' names a column of per-row weights; the mean is then weighted.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    samples = []
+    rows = []
+    for key, group in df.groupby(groups, sort=True):
+        group = group[group[metric].notna()]
+        values = group[metric].to_numpy(dtype=float)
+        w = group[weights].to_numpy(dtype=float) if weights else None
+        if w is None or not len(values) or np.all(w == w[0]):
+            samples.append((key, values))
+            continue
+        low, high = np.percentile(weighted_bootstrap_means(values, w, n_boot, rng), tails)
+        rows.append(dict(zip(groups, key if isinstance(key, tuple) else (key,)), Metric=metric, N=len(values),
+                         Mean=np.average(values, weights=w), CILow=low, CIHigh=high))
+
+    # Stack the groups of each size and resample them together
+    sizes = sorted({len(values) for _, values in samples if len(values)})
+    for size in sizes:
+        keys = [key for key, values in samples if len(values) == size]
+        matrix = np.vstack([values for _, values in samples if len(values) == size])
+        low, high = np.percentile(bootstrap_means(matrix, n_boot, rng), tails, axis=1)
+        for key, values, lo, hi in zip(keys, matrix, low, high):
+            rows.append(dict(zip(groups, key if isinstance(key, tuple) else (key,)),
+                             Metric=metric, N=size, Mean=values.mean(), CILow=lo, CIHigh=hi))
+    columns = list(groups) + ['Metric', 'N', 'Mean', 'CILow', 'CIHigh']
+    return pd.DataFrame(rows, columns=columns).sort_values(list(groups), kind='stable', ignore_index=True)
+
+
+def cached_intervals(df, metric, cache_dir=None, groups=GROUP_COLUMNS, n_boot=N_BOOT,
+                     confidence=CONFIDENCE, seed=0, weights=None):
+    """bootstrap_intervals() cached in 'cache_dir', keyed by the data and parameters."""
+    import pandas as pd
+
+    if cache_dir is None:
+        return bootstrap_intervals(df, metric, groups, n_boot, confidence, seed, weights)
+
+    data = df[list(groups) + [metric] + ([weights] if weights else [])].sort_values(list(groups), kind='stable')
+    digest = hashlib.sha256(repr((INTERVALS_VERSION, metric, list(groups), n_boot, confidence, seed,
+                                  weights)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    path = os.path.join(cache_dir, f'intervals-{digest.hexdigest()[:16]}.parquet')
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError, ImportError):
+        pass
+
+    intervals = bootstrap_intervals(df, metric, groups, n_boot, confidence, seed, weights)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        intervals.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    except (OSError, ImportError):
+        # Caching is only an optimisation
+        pass
+    return intervals
+
+
+def rankdata(values):
+    """Average ranks (1-based) of a 1-d array, ties sharing their mean rank."""
+    values = np.asarray(values)
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    # Boundaries of the runs of equal values
+    starts = np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+    run = np.cumsum(starts) - 1
+    counts = np.bincount(run)
+    ends = np.cumsum(counts)
+    ranks = np.empty(len(values))
+    ranks[order] = (ends - (counts - 1) / 2)[run]
+    return ranks, counts
+
+
+def mann_whitney(x, y, alternative='two-sided'):
+    """Return (U of x, p-value) of the Mann-Whitney U test.
+
+    'alternative' is 'two-sided', 'greater' (x tends to be larger than y)
+    or 'less'.  Uses scipy when it is installed (exact p-values for small
+    samples without ties), otherwise the normal approximation with tie and
+    continuity corrections.
+    """
+    try:
+        from scipy.stats import mannwhitneyu
+    except ImportError:
+        mannwhitneyu = None
+    if mannwhitneyu is not None:
+        result = mannwhitneyu(x, y, alternative=alternative)
+        return float(result.statistic), float(result.pvalue)
+
+    from math import erfc, sqrt
+
+    n1, n2 = len(x), len(y)
+    ranks, ties = rankdata(np.concatenate([x, y]))
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return float(u), 1.0
+    deviation = u - n1 * n2 / 2
+    if alternative == 'two-sided':
+        z = (abs(deviation) - 0.5) / sqrt(variance)
+        return float(u), min(1.0, erfc(max(z, 0) / sqrt(2)))
+    if alternative == 'less':
+        deviation = -deviation
+    z = (deviation - 0.5) / sqrt(variance)
+    return float(u), erfc(z / sqrt(2)) / 2
+
+
+def cliffs_delta(x, y):
+    """P(x > y) - P(x < y), computed from all pairs at once."""
+    x = np.asarray(x, dtype=float)[:, None]
+    y = np.asarray(y, dtype=float)[None, :]
+    return float(np.sign(x - y).mean())
+
+
+def delta_magnitude(delta):
+    return next(label for threshold, label in CLIFFS_DELTA_MAGNITUDES if abs(delta) < threshold)
+
+
+def holm(p_values):
+    """Holm-Bonferroni adjusted p-values."""
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    order = np.argsort(p_values)
+    adjusted = np.maximum.accumulate((m - np.arange(m)) * p_values[order])
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def pairwise_comparisons(df, metric, by='Workload_Label', between='Database_Nodes', alpha=ALPHA):
+    """Compare every pair of 'between' groups for each 'by' value with Mann-Whitney U tests."""
+    import pandas as pd
+
+    rows = []
+    for workload, group in df.groupby(by, sort=True):
+        samples = {name: values[metric].dropna().to_numpy(dtype=float)
+                   for name, values in group.groupby(between, sort=True)}
+        pairs = [(a, b) for a, b in itertools.combinations(samples, 2) if len(samples[a]) and len(samples[b])]
+        workload_rows = []
+        for a, b in pairs:
+            x, y = samples[a], samples[b]
+            u, p = mann_whitney(x, y)
+            delta = cliffs_delta(x, y)
+            workload_rows.append({
+                by: workload, 'Metric': metric, 'A': a, 'B': b, 'MeanA': x.mean(), 'MeanB': y.mean(),
+                'Difference(%)': (x.mean() - y.mean()) / y.mean() * 100 if y.mean() else np.nan,
+                'U': u, 'p': p, 'CliffsDelta': delta, 'Magnitude': delta_magnitude(delta),
+            })
+        for row, adjusted in zip(workload_rows, holm([row['p'] for row in workload_rows])):
+            row['pHolm'] = adjusted
+            row['Significant'] = bool(adjusted < alpha)
+        rows.extend(workload_rows)
+    return pd.DataFrame(rows)
+
+
+def comparison_table(df, metrics, alpha=ALPHA):
+    """Pairwise comparisons of several metrics in one frame."""
+    import pandas as pd
+
+    frames = [pairwise_comparisons(df, metric, alpha=alpha) for metric in metrics if metric in df.columns]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Confidence intervals and significance tests of the results.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory containing the result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    parser.add_argument('--metrics', nargs='+', default=['Throughput', 'AvgReadLatency', 'AvgUpdateLatency'])
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--output', help='also write the comparison table to this CSV file')
+    parser.add_argument('--invalid', choices=POLICIES, default='keep',
+                        help='tries flagged by validity.py: keep, exclude or down-weight them in the intervals')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from figures import load_dataset, prepare_frame
+
+    df = prepare_frame(load_dataset('results', args.results_dir, args.phase, invalid=args.invalid))
+    cache_dir = os.path.join(args.results_dir, CACHE_DIR)
+    metrics = [metric for metric in args.metrics if metric in df.columns]
+    weights = 'Weight' if args.invalid == 'downweight' else None
+    intervals = pd.concat([cached_intervals(df, metric, cache_dir, weights=weights) for metric in metrics],
+                          ignore_index=True)
+    comparisons = comparison_table(df, metrics, args.alpha)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.max_rows', None):
+        print(intervals.to_string(index=False, float_format='%.2f'))
+        print()
+        print(comparisons.to_string(index=False, float_format='%.4g'))
+    if args.output:
+        comparisons.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
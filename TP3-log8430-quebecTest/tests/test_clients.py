@@ -0,0 +1,19 @@
+from clients import merge_outputs
+
+
+def write_client(path, end, runtime_ms, operations):
+    path.write_text(f'{end} {runtime_ms // 1000} sec: {operations} operations; 100.00 current ops/sec;\n'
+                    f'[OVERALL], RunTime(ms), {runtime_ms}\n'
+                    f'[OVERALL], Throughput(ops/sec), {operations * 1000 / runtime_ms}\n'
+                    f'[READ], Operations, {operations}\n')
+
+
+def test_merged_throughput_spans_the_client_runs(tmp_path):
+    # The second client starts 2 s after the first one and both run for 10 s
+    write_client(tmp_path / 'client1.txt', '2024-01-01 10:00:10:000', 10000, 1000)
+    write_client(tmp_path / 'client2.txt', '2024-01-01 10:00:12:000', 10000, 1000)
+    lines = merge_outputs([str(tmp_path / 'client1.txt'), str(tmp_path / 'client2.txt')])
+    assert '[OVERALL], RunTime(ms), 12000' in lines
+    throughput = next(line for line in lines if 'Throughput' in line)
+    assert abs(float(throughput.split(', ')[2]) - 2000 / 12) < 1e-6
+    assert '[READ], Operations, 2000' in lines
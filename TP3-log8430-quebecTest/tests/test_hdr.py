@@ -0,0 +1,77 @@
+import base64
+import os
+
+import numpy as np
+
+from hdr import Histogram, aggregate_percentiles, merge_logs, parse_log_filename, read_log
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def test_read_log_merges_resized_intervals():
+    # Two intervals encoded by the reference HdrHistogram implementation, with the highest trackable
+    # values 1048576 and 16777216 of an auto-resizing recorder; expected values from that implementation
+    histogram = read_log(os.path.join(FIXTURES, 'ycsb-resized-READ.hdr'))
+    assert histogram.config == (1, 16777216, 3)
+    assert histogram.total == 10000
+    assert histogram.min() == 5
+    assert histogram.max() == 129279
+    assert histogram.values_at_percentiles([50, 90, 99, 99.9, 100]).tolist() == [761, 6915, 22447, 56095, 129279]
+
+
+def test_encode_round_trip():
+    with open(os.path.join(FIXTURES, 'ycsb-resized-READ.hdr')) as file:
+        encoded = [line.strip().split(',')[3] for line in file if line[0].isdigit()]
+    for text in encoded:
+        histogram = Histogram.decode(base64.b64decode(text))
+        decoded = Histogram.decode(histogram.encode())
+        assert decoded.config == histogram.config
+        assert np.array_equal(decoded.counts, histogram.counts)
+
+
+def test_add_widens_the_range():
+    narrow, wide = Histogram(1, 1048576, 3), Histogram(1, 16777216, 3)
+    narrow.record([10, 1000])
+    wide.record([10, 10000000])
+    narrow.add(wide)
+    assert narrow.highest == 16777216
+    assert narrow.total == 4
+    assert narrow.max() == wide.max()
+
+
+def test_decode_keeps_counts_past_the_declared_range():
+    histogram = Histogram(1, 16777216, 3)
+    histogram.record(10000000)
+    # Same counts declared with a smaller highest trackable value
+    narrow = Histogram(1, 1048576, 3)
+    narrow.counts = histogram.counts
+    decoded = Histogram.decode(narrow.encode())
+    assert decoded.total == 1
+    assert decoded.max() == histogram.max()
+
+
+def test_parse_log_filename_keeps_the_settings_of_the_try():
+    assert parse_log_filename('runMongo3-A-threads=16-w=majority-target=2000-try2-client3-READ.hdr') == \
+        ('run', 'Mongo', 3, '', 'A', 'threads=16 w=majority target=2000', 2, 'READ')
+    assert parse_log_filename('loadRedis5-workloadb-try1-INSERT.hdr') == ('load', 'Redis', 5, '', 'B', '', 1, 'INSERT')
+
+
+def test_merge_logs_keeps_the_sweep_points_apart(tmp_path):
+    with open(os.path.join(FIXTURES, 'ycsb-resized-READ.hdr')) as file:
+        log = file.read()
+    for threads in (1, 8):
+        for try_number in (1, 2):
+            (tmp_path / f'runMongo3-A-threads={threads}-target=0-try{try_number}-READ.hdr').write_text(log)
+    merged = merge_logs(str(tmp_path))
+    assert sorted(key[5] for key in merged) == ['threads=1 target=0', 'threads=8 target=0']
+    assert all(histogram.total == 20000 and tries == 2 for histogram, tries in merged.values())
+
+
+def test_aggregate_percentiles_keeps_the_mongo_options_apart(tmp_path):
+    with open(os.path.join(FIXTURES, 'ycsb-resized-READ.hdr')) as file:
+        log = file.read()
+    for concern in ('1', 'majority'):
+        (tmp_path / f'runMongo3-A-threads=16-w={concern}-journal=true-maxPoolSize=100-try1-READ.hdr').write_text(log)
+    df = aggregate_percentiles(str(tmp_path))
+    assert sorted(df['WriteConcern']) == ['1', 'majority']
+    assert set(df['Journal']) == {'true'} and set(df['MaxPoolSize']) == {'100'} and set(df['Threads']) == {16}
@@ -0,0 +1,29 @@
+import numpy as np
+
+from rawlatency import RawSummary
+
+
+def test_add_merges_the_rollups_on_their_seconds():
+    first, second = RawSummary('exact'), RawSummary('exact')
+    first.record('READ', np.array([10_000, 11_500, 11_900]), np.array([100, 300, 500]))
+    second.record('READ', np.array([11_000, 13_000]), np.array([700, 200]))
+    first.add(second)
+    rollup = first.rollups['READ']
+    assert rollup.first == 10
+    assert rollup.counts.tolist() == [1, 3, 0, 1]
+    assert rollup.sums.tolist() == [100, 1500, 0, 200]
+    assert rollup.maxima.tolist() == [100, 700, 0, 200]
+    assert first.distributions['READ'].total == 5
+
+
+def test_add_relative_aligns_the_tries_on_their_first_second():
+    first, second = RawSummary('exact'), RawSummary('exact')
+    first.record('READ', np.array([10_000, 11_000]), np.array([100, 300]))
+    # A try run ten minutes later
+    second.record('READ', np.array([610_000, 611_000]), np.array([200, 400]))
+    second.record('UPDATE', np.array([611_500]), np.array([50]))
+    first.add(second, relative=True)
+    assert first.rollups['READ'].first == 10
+    assert first.rollups['READ'].counts.tolist() == [2, 2]
+    assert first.rollups['READ'].maxima.tolist() == [200, 400]
+    assert (first.rollups['UPDATE'].first, first.rollups['UPDATE'].counts.tolist()) == (11, [1])
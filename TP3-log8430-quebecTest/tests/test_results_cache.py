@@ -0,0 +1,24 @@
+import os
+import shutil
+
+from results_cache import CACHE_DIR, FRAGMENTS_DIR, load_long_results
+
+RESULTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+
+
+def test_refresh_writes_the_fragments_of_the_changed_files_only(tmp_path):
+    for filename in ('runRedis3.csv', 'runMongo3.csv'):
+        shutil.copy(os.path.join(RESULTS, filename), tmp_path / filename)
+    load_long_results(str(tmp_path))
+    fragments_dir = tmp_path / CACHE_DIR / FRAGMENTS_DIR
+    before = {path.name: path.stat().st_mtime_ns for path in fragments_dir.iterdir()}
+
+    with open(tmp_path / 'runRedis3.csv', 'a') as file:
+        file.write('\n')
+    df = load_long_results(str(tmp_path))
+    after = {path.name: path.stat().st_mtime_ns for path in fragments_dir.iterdir()}
+    # The Mongo fragment is untouched, the old Redis one replaced by a new one
+    assert len(before) == len(after) == 2
+    assert len(set(before) & set(after)) == 1
+    assert all(before[name] == after[name] for name in set(before) & set(after))
+    assert df.equals(load_long_results(str(tmp_path), use_cache=False))
@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats import bootstrap_intervals, bootstrap_means, cliffs_delta, delta_magnitude, holm, mann_whitney
+
+
+def test_bootstrap_interval_on_a_fixed_seed():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'Database_Nodes': 'Redis3', 'Workload_Label': 'A', 'Throughput': rng.normal(100, 10, 30)})
+    intervals = bootstrap_intervals(df, 'Throughput', seed=0)
+    again = bootstrap_intervals(df, 'Throughput', seed=0)
+    assert intervals.equals(again)
+    row = intervals.iloc[0]
+    assert row['N'] == 30 and row['CILow'] < row['Mean'] < row['CIHigh']
+    # Close to the normal-theory interval mean +- 1.96 s / sqrt(n)
+    half_width = 1.96 * df['Throughput'].std() / np.sqrt(30)
+    assert (row['CIHigh'] - row['CILow']) / 2 == pytest.approx(half_width, rel=0.1)
+
+
+def test_bootstrap_means_resample_every_group_independently():
+    samples = np.tile(np.arange(20.0), (2, 1))
+    means = bootstrap_means(samples, n_boot=4000, rng=0)
+    assert abs(np.corrcoef(means)[0, 1]) < 0.1
+
+
+def test_mann_whitney_normal_approximation_matches_scipy(monkeypatch):
+    from scipy.stats import mannwhitneyu
+
+    x = [1.0, 2.5, 3.0, 3.0, 4.2, 5.1, 6.0, 7.7]
+    y = [2.0, 3.0, 3.5, 5.0, 8.1, 9.0, 9.4, 10.2, 11.0]
+    monkeypatch.setitem(sys.modules, 'scipy.stats', None)
+    for alternative in ('two-sided', 'less', 'greater'):
+        expected = mannwhitneyu(x, y, alternative=alternative, method='asymptotic')
+        u, p = mann_whitney(np.array(x), np.array(y), alternative)
+        assert u == expected.statistic
+        assert p == pytest.approx(expected.pvalue)
+
+
+def test_cliffs_delta_and_holm():
+    assert cliffs_delta([3, 4, 5], [1, 2, 3]) == pytest.approx(8 / 9)
+    assert cliffs_delta([1, 2], [1, 2]) == 0
+    assert delta_magnitude(-0.5) == 'large' and delta_magnitude(0.2) == 'small'
+    assert holm([0.01, 0.04, 0.03]).tolist() == pytest.approx([0.03, 0.06, 0.06])
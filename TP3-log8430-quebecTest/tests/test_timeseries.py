@@ -0,0 +1,38 @@
+import numpy as np
+
+from timeseries import MIN_POINTS, warmup_cutoff
+
+
+def naive_mser(batches, d):
+    tail = batches[d:]
+    return np.sum((tail - tail.mean()) ** 2) / len(tail) ** 2
+
+
+def warmup_series(warmup=60, steady=540, seed=0):
+    """Throughput ramping up from 2000 to 10000 ops/s, then flat with noise."""
+    rng = np.random.default_rng(seed)
+    ramp = 10000 - 8000 * np.exp(-np.arange(warmup) / (warmup / 4))
+    return np.concatenate([ramp, np.full(steady, 10000.0)]) + rng.normal(0, 200, warmup + steady)
+
+
+def test_mser5_cutoff_ends_the_warmup():
+    cutoff = warmup_cutoff(warmup_series())
+    assert cutoff % 5 == 0
+    assert 30 <= cutoff <= 80
+
+
+def test_mser5_matches_the_definition():
+    values = warmup_series(seed=1)
+    batches = values.reshape(-1, 5).mean(axis=1)
+    expected = min(range(len(batches) // 2), key=lambda d: naive_mser(batches, d))
+    assert warmup_cutoff(values) == expected * 5
+
+
+def test_too_short_series_have_no_warmup():
+    assert warmup_cutoff([0.0] * (MIN_POINTS - 2) + [100.0]) == 0
+    assert warmup_cutoff([]) == 0
+
+
+def test_short_series_use_single_point_batches():
+    values = np.concatenate([[0.0, 0.0, 0.0], np.full(MIN_POINTS * 2, 100.0)])
+    assert warmup_cutoff(values) == 3
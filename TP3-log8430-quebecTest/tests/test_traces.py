@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import traces
+import workload
+
+
+class FixedDraws:
+    """Random source replaying fixed uniform draws."""
+
+    def __init__(self, draws):
+        self.draws = list(draws)
+
+    def random(self):
+        return self.draws.pop(0)
+
+
+def small_workload(**overrides):
+    properties = {'recordcount': '1000', 'operationcount': '2000'}
+    properties.update(overrides)
+    return workload.load_workload(overrides=properties)
+
+
+def test_vectorised_fnvhash64_matches_scalar():
+    values = np.concatenate([np.arange(1000), [2 ** 40 + 17, workload.SCRAMBLED_ITEM_COUNT, 2 ** 62]])
+    assert traces.fnvhash64(values).tolist() == [workload.fnvhash64(int(v)) for v in values]
+
+
+@pytest.mark.parametrize('items, base', [(100, 0), (1000, 1), (workload.SCRAMBLED_ITEM_COUNT + 1, 0)])
+def test_vectorised_zipfian_matches_scalar(items, base):
+    u = np.random.default_rng(0).random(2000)
+    zetan = workload.SCRAMBLED_ZETAN if items > 1e9 else None
+    generator = workload.ZipfianGenerator(base, base + items - 1, zetan=zetan, rng=FixedDraws(u))
+    expected = [generator.next_value() for _ in u]
+    assert traces.zipfian_values(u, items, base=base, zetan=zetan).tolist() == expected
+
+
+def test_scrambled_zipfian_keys_match_scalar():
+    wl = small_workload(requestdistribution='zipfian')
+    keys = traces.key_sampler(wl, np.random.default_rng(3))(2000)
+    draws = FixedDraws(np.random.default_rng(3).random(2000))
+    generator = workload.key_chooser(wl, workload.InsertCounter(1000), rng=draws)
+    assert keys.tolist() == [generator.next_value() for _ in range(2000)]
+
+
+def test_latest_keys_match_scalar():
+    wl = small_workload(requestdistribution='latest')
+    last = np.full(2000, 999)
+    keys = traces.choose_keys(wl, np.random.default_rng(5), last)
+    draws = FixedDraws(np.random.default_rng(5).random(2000))
+    generator = workload.key_chooser(wl, workload.InsertCounter(1000), rng=draws)
+    assert keys.tolist() == [generator.next_value() for _ in range(2000)]
+
+
+def test_generate_trace_is_deterministic(tmp_path):
+    wl = small_workload(insertproportion='0.1', readproportion='0.8', updateproportion='0.1')
+    first = traces.generate_trace(str(tmp_path / 'a.npy'), wl, seed=1, chunk_size=300)
+    second = traces.generate_trace(str(tmp_path / 'b.npy'), wl, seed=1, chunk_size=300)
+    assert first['sha256'] == second['sha256']
+
+    trace, _ = traces.open_trace(str(tmp_path / 'a.npy'), verify=True)
+    inserts = trace['op'] == traces.OPERATION_CODES['INSERT']
+    # Inserted keys continue the loaded ones, hashed as the Java client does
+    expected = [workload.fnvhash64(1000 + i) for i in range(int(inserts.sum()))]
+    assert trace['key'][inserts].tolist() == expected
+
+
+def test_load_trace_inserts_every_record_in_order(tmp_path):
+    path = str(tmp_path / 'load.npy')
+    traces.generate_trace(path, small_workload(insertorder='ordered'), phase='load', seed=1)
+    trace, metadata = traces.open_trace(path)
+    assert metadata['operations'] == 1000
+    assert trace['key'].tolist() == list(range(1000))
+    assert (trace['field'] == -1).all()
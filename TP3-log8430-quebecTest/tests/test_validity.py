@@ -0,0 +1,11 @@
+import pandas as pd
+
+from validity import flag_tries
+
+
+def test_short_runs_are_relative_to_their_cell():
+    # Redis runs of ~300 ms are normal; only the try stopped early is short
+    df = pd.DataFrame({'Phase': 'run', 'Database': ['Redis'] * 5 + ['Mongo'] * 5, 'Nodes': 3, 'Workload': 'A',
+                       'RunTime': [310, 290, 300, 305, 100, 2000, 2100, 1900, 2050, 1950]})
+    flagged = flag_tries(df)
+    assert flagged['Flags'].tolist() == [''] * 4 + ['short'] + [''] * 5
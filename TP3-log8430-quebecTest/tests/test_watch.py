@@ -0,0 +1,19 @@
+from watch import Watcher
+
+SECTION = ('Running workload {workload} try 1\n'
+           '[OVERALL], RunTime(ms), 1000\n'
+           '[OVERALL], Throughput(ops/sec), 100\n'
+           '##################################################################################\n')
+
+
+def test_restarted_file_drops_its_earlier_tries(tmp_path):
+    path = tmp_path / 'runRedis3.csv'
+    path.write_text('Initializing results\n' + SECTION.format(workload='A') + SECTION.format(workload='B'))
+    watcher = Watcher(str(tmp_path), settle=0)
+    assert watcher.poll() == {'run'}
+    assert sorted(watcher.frame('run')['Workload']) == ['A', 'B']
+
+    # The orchestrator starts the file from scratch
+    path.write_text('Initializing results\n' + SECTION.format(workload='C'))
+    assert watcher.poll() == {'run'}
+    assert list(watcher.frame('run')['Workload']) == ['C']
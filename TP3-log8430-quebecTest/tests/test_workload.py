@@ -0,0 +1,65 @@
+import pytest
+
+import workload
+from workload import ZipfianGenerator, build_key_name, fnvhash64, zeta
+
+
+class FixedDraws:
+    """Random source replaying fixed uniform draws."""
+
+    def __init__(self, draws):
+        self.draws = list(draws)
+
+    def random(self):
+        return self.draws.pop(0)
+
+
+def java_fnvhash64(value):
+    """site.ycsb.Utils.fnvhash64 on a signed 64 bit long."""
+    def to_long(x):
+        x &= (1 << 64) - 1
+        return x - (1 << 64) if x >= 1 << 63 else x
+
+    hashval = to_long(0xCBF29CE484222325)
+    for _ in range(8):
+        octet = value & 0xff
+        value >>= 8
+        hashval = to_long((hashval ^ octet) * 1099511628211)
+    return abs(hashval)
+
+
+def test_fnvhash64_gives_the_keys_of_the_java_client():
+    # First records loaded by YCSB with insertorder=hashed
+    assert build_key_name(0) == 'user6284781860667377211'
+    assert build_key_name(1) == 'user8517097267634966620'
+    assert build_key_name(2) == 'user1820151046732198393'
+    assert build_key_name(7, ordered=True) == 'user7'
+
+
+@pytest.mark.parametrize('value', [0, 1, 255, 256, 1000, 123456789, 2 ** 40 + 17, workload.SCRAMBLED_ITEM_COUNT])
+def test_fnvhash64_matches_java_signed_arithmetic(value):
+    assert fnvhash64(value) == java_fnvhash64(value)
+    assert 0 <= fnvhash64(value) < 1 << 63
+
+
+def test_zeta_is_the_partial_sum():
+    assert zeta(2, 0.99) == pytest.approx(1 + 2 ** -0.99)
+    assert zeta(100, 0.99) == pytest.approx(sum(i ** -0.99 for i in range(1, 101)))
+    # Incremental update used by the latest distribution
+    assert zeta(100, 0.99, 50, zeta(50, 0.99)) == pytest.approx(zeta(100, 0.99))
+
+
+def test_zipfian_next_long_on_fixed_draws():
+    draws = [0.1, 0.3, 0.5, 0.7, 0.9, 0.99]
+    generator = ZipfianGenerator(0, 99, rng=FixedDraws(draws))
+    assert generator.zetan == pytest.approx(5.2945688313771635)
+    assert [generator.next_value() for _ in draws] == [0, 2, 6, 19, 58, 94]
+
+
+def test_zipfian_base_and_growing_item_count():
+    generator = ZipfianGenerator(10, 19, rng=FixedDraws([0.01, 0.999999, 0.999999]))
+    assert generator.next_value() == 10
+    assert generator.next_value() == 19
+    # Growing the item count extends zeta(n) instead of recomputing it
+    assert generator.next_long(1000) <= 10 + 999
+    assert generator.zetan == pytest.approx(zeta(1000, 0.99))
@@ -0,0 +1,214 @@
+"""Per-interval throughput and latency series, with warm-up detection.
+
+Two kinds of periodic output are parsed from the results files:
+
+* the status lines YCSB prints with '-s' every 'status.interval' seconds
+  (captured with '2>&1' by the benchmark scripts), e.g.
+  '2024-11-02 10:00:01:123 1 sec: 5234 operations; 5234 current ops/sec; [READ: Count=2600, Avg=117.6, ...]'
+* the buckets written with '-p measurementtype=timeseries', e.g. '[READ], 100, 117.62'
+
+The warm-up phase of each try is detected with the MSER-5 truncation rule and
+steady-state metrics are computed on the remaining intervals only.
+
+Usage: python3 timeseries.py results/ --phase run
+"""
+import argparse
+import os
+import re
+
+from ycsb_parser import METRIC_RE, file_metadata, parse_filename, parse_header
+
+# '<date> <time> 10 sec: 52340 operations; 5234.5 current ops/sec; est completion in 2 seconds [READ: ...]'
+STATUS_RE = re.compile(r'(\d+) sec: (\d+) operations; (?:([\d.]+) current ops/sec; )?(.*)$')
+
+# Per-operation summaries of a status line: '[READ: Count=10, Avg=5.2]' or '[READ AverageLatency(us)=5.2]'
+STATUS_SECTION_RE = re.compile(r'\[([^:\]\s]+):? ([^\]]*)\]')
+STATUS_VALUE_RE = re.compile(r'([\w.()%-]+)=([-\d.]+)')
+
+# Status line keys renamed to the metric names of the final YCSB summary
+STATUS_METRICS = {
+    'Count': 'Operations',
+    'Avg': 'AverageLatency(us)',
+    'Min': 'MinLatency(us)',
+    'Max': 'MaxLatency(us)',
+    '90': '90thPercentileLatency(us)',
+    '99': '99thPercentileLatency(us)',
+    '99.9': '99.9PercentileLatency(us)',
+    '99.99': '99.99PercentileLatency(us)',
+}
+
+# Columns of the table returned by parse_series_file()
+SERIES_COLUMNS = ('Phase', 'Workload', 'Try', 'Settings', 'Series', 'Time(ms)', 'Section', 'Metric', 'Value')
+
+# Keys identifying one try of a configuration in the series and steady-state frames
+TRY_KEYS = ['Database', 'Nodes', 'Driver', 'Phase', 'Workload', 'Try', 'Settings']
+
+# Fewer points than this and the whole series is considered steady
+MIN_POINTS = 4
+
+
+def parse_status_line(line):
+    """Return (time_ms, [(section, metric, value), ...]) for a status line, or None."""
+    match = STATUS_RE.search(line)
+    if not match:
+        return None
+    time_ms = int(match.group(1)) * 1000
+    records = [('OVERALL', 'Operations', float(match.group(2)))]
+    if match.group(3) is not None:
+        records.append(('OVERALL', 'Throughput(ops/sec)', float(match.group(3))))
+    for section, body in STATUS_SECTION_RE.findall(match.group(4)):
+        for key, value in STATUS_VALUE_RE.findall(body):
+            records.append((section, STATUS_METRICS.get(key, key), float(value)))
+    return time_ms, records
+
+
+def iter_series_records(lines):
+    """Yield one (phase, workload, try, settings, series, time_ms, section, metric, value) tuple per point."""
+    header = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            header = None
+            continue
+
+        parsed = parse_header(line)
+        if parsed:
+            header = parsed
+            continue
+        if not header:
+            continue
+
+        # Time-series bucket: '[READ], <time ms>, <average latency>'
+        match = METRIC_RE.match(line)
+        if match:
+            if match.group(2).strip().isdigit():
+                yield header + ('timeseries', int(match.group(2)), match.group(1), 'AverageLatency(us)',
+                                float(match.group(3)))
+            continue
+
+        status = parse_status_line(line)
+        if status:
+            time_ms, records = status
+            for section, metric, value in records:
+                yield header + ('status', time_ms, section, metric, value)
+
+
+def parse_series_file(path):
+    """Parse the periodic output of a results file into a columnar table."""
+    table = {column: [] for column in SERIES_COLUMNS}
+    columns = [table[column] for column in SERIES_COLUMNS]
+    with open(path, 'r') as file:
+        for record in iter_series_records(file):
+            for column, value in zip(columns, record):
+                column.append(value)
+    return table
+
+
+def load_series(results_dir, phase=None):
+    """Return the long series frame of every results file in a directory."""
+    import pandas as pd
+
+    frames = []
+    for filename in sorted(os.listdir(results_dir)):
+        parsed = parse_filename(filename)
+        if not parsed or (phase and parsed[0] != phase):
+            continue
+        df = pd.DataFrame(parse_series_file(os.path.join(results_dir, filename)), columns=list(SERIES_COLUMNS))
+        for position, (name, value) in enumerate(file_metadata(filename).items()):
+            df.insert(position, name, value)
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=['Database', 'Nodes', 'Driver'] + list(SERIES_COLUMNS))
+    df = pd.concat(frames, ignore_index=True)
+    if phase:
+        df = df[df['Phase'] == phase]
+    return df
+
+
+def throughput_series(series):
+    """Return the per-interval throughput of each try as 'Time(s)' and 'Throughput' columns."""
+    df = series[(series['Series'] == 'status') & (series['Metric'] == 'Throughput(ops/sec)')]
+    df = df[TRY_KEYS + ['Time(ms)', 'Value']].rename(columns={'Value': 'Throughput'})
+    return df.assign(**{'Time(s)': df['Time(ms)'] / 1000})
+
+
+def warmup_cutoff(values, batch_size=5):
+    """Return the index of the first steady-state point of a series (MSER-5).
+
+    The series is averaged in batches of 'batch_size' points and the
+    truncation point d minimising the MSER statistic
+    sum((x[d:] - mean(x[d:]))**2) / (n - d)**2 is searched in the first half.
+    Short series fall back to single-point batches.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    if len(values) < MIN_POINTS:
+        return 0
+    if len(values) < MIN_POINTS * batch_size:
+        batch_size = 1
+    n = len(values) // batch_size
+    batches = values[:n * batch_size].reshape(n, batch_size).mean(axis=1)
+
+    # Suffix sums give the variance of every truncated series in one pass
+    suffix_sum = np.cumsum(batches[::-1])[::-1]
+    suffix_sq = np.cumsum(batches[::-1] ** 2)[::-1]
+    counts = np.arange(n, 0, -1)
+    sse = suffix_sq - suffix_sum ** 2 / counts
+    mser = sse / counts ** 2
+    return int(np.argmin(mser[:max(1, n // 2)])) * batch_size
+
+
+def steady_state_frame(series):
+    """Return one row per try with its warm-up time and steady-state metrics.
+
+    Throughput is taken from the status lines.  Latencies use the
+    time-series buckets when present and the status lines otherwise.  Each
+    signal is truncated at its own MSER-5 warm-up cutoff.
+    """
+    import pandas as pd
+
+    rows = []
+    for key, group in series.groupby(TRY_KEYS, sort=False):
+        row = dict(zip(TRY_KEYS, key))
+
+        throughput = group[(group['Series'] == 'status') & (group['Metric'] == 'Throughput(ops/sec)')]
+        throughput = throughput.sort_values('Time(ms)')
+        if not throughput.empty:
+            cutoff = warmup_cutoff(throughput['Value'])
+            row['WarmupTime(ms)'] = throughput['Time(ms)'].iloc[cutoff] if cutoff else 0
+            row['SteadyThroughput'] = throughput['Value'].iloc[cutoff:].mean()
+
+        latencies = group[(group['Metric'] == 'AverageLatency(us)') & (group['Section'] != 'OVERALL')]
+        if (latencies['Series'] == 'timeseries').any():
+            latencies = latencies[latencies['Series'] == 'timeseries']
+        for section, points in latencies.groupby('Section'):
+            points = points.sort_values('Time(ms)')
+            cutoff = warmup_cutoff(points['Value'])
+            row[f'Steady{section.title()}Latency'] = points['Value'].iloc[cutoff:].mean()
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report warm-up and steady-state metrics of each try.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory containing the result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    args = parser.parse_args(argv)
+
+    from results_cache import load_results
+
+    steady = steady_state_frame(load_series(args.results_dir, args.phase))
+    if steady.empty:
+        print('No status or time-series output found, run YCSB with -s and status.interval')
+        return
+    df = load_results(args.results_dir, args.phase).merge(steady, on=TRY_KEYS, how='left')
+    columns = [c for c in ('Throughput', 'SteadyThroughput', 'WarmupTime(ms)') if c in df.columns]
+    print(df.groupby(['Database', 'Nodes', 'Workload'])[columns].mean())
+
+
+if __name__ == '__main__':
+    main()
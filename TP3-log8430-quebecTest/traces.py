@@ -0,0 +1,252 @@
+"""Precomputed operation traces for deterministic replay against every database.
+
+A trace is the whole operation sequence of a load or run phase (operation,
+record key, field, value and scan length of every request) sampled once
+from a workload file with vectorised NumPy, then written to a '.npy' file
+that loadgen.py memory-maps and replays with '-p trace=<file>'.  Redis and
+MongoDB then receive the exact same byte-identical request stream and no
+key generation happens in the timed loop.
+
+Each record takes 16 bytes.  A JSON sidecar ('<trace>.json') keeps the
+workload settings, the pool of field values and the SHA-256 of the trace.
+
+Usage:
+    python3 traces.py generate -P YCSB/workloads/workloada --phase run -p operationcount=10000000 \\
+        --seed 1 -o traces/workloada-run.npy
+    python3 traces.py info traces/workloada-run.npy
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import workload as core
+
+# Operation codes of the 'op' column, in the order of workload.OPERATIONS
+OPERATION_NAMES = tuple(name for name, _ in core.OPERATIONS)
+OPERATION_CODES = {name: code for code, name in enumerate(OPERATION_NAMES)}
+
+# 'field' is the field index read or written, -1 for all the fields, and
+# 'value' the index in the value pool of the sidecar
+TRACE_DTYPE = np.dtype([('op', 'u1'), ('field', 'i2'), ('value', 'u1'), ('scan', 'u4'), ('key', 'u8')])
+
+VALUE_POOL_SIZE = 256
+VALUE_CHARACTERS = np.array(list('abcdefghijklmnopqrstuvwxyz0123456789'))
+
+# Operations are sampled and written in chunks to bound memory
+CHUNK_SIZE = 1 << 20
+
+
+def metadata_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def fnvhash64(values):
+    """Vectorised workload.fnvhash64() over an array of key numbers."""
+    values = np.asarray(values, dtype=np.uint64).copy()
+    hashval = np.full(values.shape, core.FNV_OFFSET_BASIS_64, dtype=np.uint64)
+    prime = np.uint64(core.FNV_PRIME_64)
+    for _ in range(8):
+        hashval ^= values & np.uint64(0xff)
+        values >>= np.uint64(8)
+        hashval *= prime
+    # Java returns Math.abs() of the signed long
+    return np.where(hashval.view(np.int64) < 0, np.uint64(0) - hashval, hashval)
+
+
+def zipfian_values(u, items, base=0, theta=core.ZIPFIAN_CONSTANT, zetan=None):
+    """Vectorised ZipfianGenerator.next_long() for uniform draws 'u'.
+
+    'items' may be an array, e.g. the growing item count of the latest
+    distribution; zeta(n) is then computed once for its largest value.
+    """
+    items = np.asarray(items, dtype=np.float64)
+    if zetan is None:
+        zetan = core.zeta(int(items.max()), theta)
+    eta = (1 - np.power(2.0 / items, 1 - theta)) / (1 - core.zeta(2, theta) / zetan)
+    values = base + (items * np.power(eta * u - eta + 1, 1.0 / (1.0 - theta))).astype(np.int64)
+    uz = u * zetan
+    values = np.where(uz < 1.0 + 0.5 ** theta, base + 1, values)
+    return np.where(uz < 1.0, base, values)
+
+
+def key_sampler(workload, rng):
+    """Return a function drawing n key numbers from the workload request distribution."""
+    distribution = workload['requestdistribution']
+    start = workload['insertstart']
+    count = workload['insertcount']
+    if distribution == 'uniform':
+        return lambda n: rng.integers(start, start + count, size=n)
+    if distribution == 'zipfian':
+        # Same key space as workload.key_chooser(): room for the keys inserted during the run
+        item_count = count + int(workload['operationcount'] * workload['insertproportion'] * 2.0) + 1
+
+        def scrambled(n):
+            values = zipfian_values(rng.random(n), core.SCRAMBLED_ITEM_COUNT + 1, zetan=core.SCRAMBLED_ZETAN)
+            return start + (fnvhash64(values) % np.uint64(item_count)).astype(np.int64)
+        return scrambled
+    if distribution == 'hotspot':
+        hot = int(count * workload['hotspotdatafraction'])
+        cold = count - hot
+
+        def hotspot(n):
+            in_hot = rng.random(n) < workload['hotspotopnfraction']
+            return start + np.where(in_hot, rng.integers(0, max(hot, 1), size=n),
+                                    hot + rng.integers(0, max(cold, 1), size=n))
+        return hotspot
+    raise ValueError(f'Unknown requestdistribution: {distribution}')
+
+
+def choose_keys(workload, rng, last):
+    """Return one key number per operation, never above the last inserted key 'last'."""
+    if workload['requestdistribution'] == 'latest':
+        # SkewedLatestGenerator: zipfian distance from the latest insert
+        items = np.maximum(last, 1)
+        return last - zipfian_values(rng.random(len(last)), items)
+
+    sample = key_sampler(workload, rng)
+    keys = sample(len(last))
+    rejected = np.flatnonzero(keys > last)
+    while len(rejected):
+        keys[rejected] = sample(len(rejected))
+        rejected = rejected[keys[rejected] > last[rejected]]
+    return keys
+
+
+def scan_lengths(workload, rng, n):
+    maximum = workload['maxscanlength']
+    if workload['scanlengthdistribution'] == 'zipfian':
+        return zipfian_values(rng.random(n), maximum, base=1)
+    return rng.integers(1, maximum + 1, size=n)
+
+
+def value_pool(workload, rng):
+    """Return the field values referenced by the 'value' column."""
+    characters = VALUE_CHARACTERS[rng.integers(0, len(VALUE_CHARACTERS), (VALUE_POOL_SIZE, workload['fieldlength']))]
+    return [''.join(row) for row in characters]
+
+
+def generate_trace(path, workload, phase='run', seed=None, chunk_size=CHUNK_SIZE):
+    """Sample the operations of a phase into a memory-mapped trace file and return its metadata."""
+    rng = np.random.default_rng(seed)
+    operations = workload['insertcount'] if phase == 'load' else workload['operationcount']
+    values = value_pool(workload, rng)
+
+    mix = core.operation_mix(workload)
+    codes = np.array([OPERATION_CODES[name] for name, _ in mix], dtype=np.uint8)
+    probabilities = np.array([proportion for _, proportion in mix])
+    probabilities /= probabilities.sum()
+    fieldcount = workload['fieldcount']
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    trace = np.lib.format.open_memmap(path, mode='w+', dtype=TRACE_DTYPE, shape=(operations,))
+    next_insert = workload['insertstart'] if phase == 'load' else workload['recordcount']
+    for start in range(0, operations, chunk_size):
+        n = min(chunk_size, operations - start)
+        chunk = trace[start:start + n]
+
+        if phase == 'load':
+            ops = np.full(n, OPERATION_CODES['INSERT'], dtype=np.uint8)
+            keys = next_insert + np.arange(n, dtype=np.int64)
+            next_insert += n
+        else:
+            ops = codes[rng.choice(len(codes), size=n, p=probabilities)]
+            inserts = ops == OPERATION_CODES['INSERT']
+            inserted = np.cumsum(inserts)
+            # Last key inserted before each operation
+            last = next_insert - 1 + inserted - inserts
+            keys = choose_keys(workload, rng, last)
+            keys[inserts] = last[inserts] + 1
+            next_insert += int(inserted[-1]) if n else 0
+
+        chunk['op'] = ops
+        chunk['key'] = keys if workload['insertorder'] == 'ordered' else fnvhash64(keys)
+        chunk['value'] = rng.integers(0, VALUE_POOL_SIZE, size=n)
+
+        # Single field reads/writes unless readallfields / writeallfields
+        fields = rng.integers(0, fieldcount, size=n)
+        reads = np.isin(ops, (OPERATION_CODES['READ'], OPERATION_CODES['SCAN']))
+        writes = np.isin(ops, (OPERATION_CODES['UPDATE'], OPERATION_CODES['READ-MODIFY-WRITE']))
+        all_fields = ops == OPERATION_CODES['INSERT']
+        if workload['readallfields']:
+            all_fields |= reads | (ops == OPERATION_CODES['READ-MODIFY-WRITE'])
+        if workload['writeallfields']:
+            all_fields |= writes
+        chunk['field'] = np.where(all_fields, -1, fields)
+
+        scans = ops == OPERATION_CODES['SCAN']
+        chunk['scan'] = 0
+        if scans.any():
+            chunk['scan'][scans] = scan_lengths(workload, rng, int(scans.sum()))
+    trace.flush()
+    del trace
+
+    metadata = {
+        'phase': phase,
+        'seed': seed,
+        'operations': operations,
+        'workload': workload,
+        'values': values,
+        'sha256': file_sha256(path),
+    }
+    with open(metadata_path(path), 'w') as file:
+        json.dump(metadata, file, indent=1)
+    return metadata
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def open_trace(path, verify=False):
+    """Return (memory-mapped trace, metadata) of a trace file."""
+    with open(metadata_path(path), 'r') as file:
+        metadata = json.load(file)
+    if verify and file_sha256(path) != metadata['sha256']:
+        raise ValueError(f'{path} does not match the SHA-256 recorded in {metadata_path(path)}')
+    trace = np.load(path, mmap_mode='r')
+    if trace.dtype != TRACE_DTYPE:
+        raise ValueError(f'{path} is not an operation trace (dtype {trace.dtype})')
+    return trace, metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate and inspect operation traces for loadgen.py.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generate', help='sample the operations of a workload into a trace')
+    generate.add_argument('-P', dest='workload_file', required=True, help='YCSB workload property file')
+    generate.add_argument('-p', dest='properties', action='append', default=[], metavar='KEY=VALUE',
+                          help='override a workload property')
+    generate.add_argument('--phase', choices=('load', 'run'), default='run')
+    generate.add_argument('--seed', type=int, help='random seed (default: random)')
+    generate.add_argument('-o', '--output', required=True, help='trace file to write (.npy)')
+
+    info = subparsers.add_parser('info', help='summarise a trace and check its SHA-256')
+    info.add_argument('trace')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        overrides = dict(prop.split('=', 1) for prop in args.properties)
+        metadata = generate_trace(args.output, core.load_workload(args.workload_file, overrides),
+                                  args.phase, args.seed)
+        print(f'{args.output}: {metadata["operations"]} operations, sha256 {metadata["sha256"]}')
+        return
+
+    trace, metadata = open_trace(args.trace, verify=True)
+    counts = np.bincount(trace['op'], minlength=len(OPERATION_NAMES))
+    print(f'{args.trace}: {metadata["phase"]} phase, {len(trace)} operations, seed {metadata["seed"]}, '
+          f'sha256 {metadata["sha256"]} (verified)')
+    for name, count in zip(OPERATION_NAMES, counts):
+        if count:
+            print(f'  {name}: {count}')
+
+
+if __name__ == '__main__':
+    main()
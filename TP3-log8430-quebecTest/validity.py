@@ -0,0 +1,158 @@
+"""Detection of tries whose measurement is not trustworthy.
+
+Every YCSB section reports the client JVM's garbage collection time, the
+run time and the maximum latency of each operation; the plotting scripts
+used to ignore them.  A try is flagged when:
+
+* 'gc': the client spent more than MAX_GC_PERCENT of the run in GC
+  ([TOTAL_GC_TIME_%]), so the client, not the database, stalled requests;
+* 'short': the run lasted less than MIN_RUNTIME_FRACTION of the median run
+  time of its cell, i.e. it stopped early or ran far fewer operations than
+  the other tries (a cell's typical run time, ~300 ms for Redis, is not
+  itself a fault);
+* 'max-latency': the largest MaxLatency of its operations is an outlier
+  among the tries of its cell, by the modified z-score of its logarithm
+  (Iglewicz and Hoaglin) above MAX_Z_SCORE.
+
+Flagged tries can be kept, excluded from the figures and statistics, or
+down-weighted (weight DOWN_WEIGHT) in the aggregates.
+
+Usage: python3 validity.py results/ --phase run
+"""
+import argparse
+
+import numpy as np
+
+from ycsb_parser import INTENDED_PREFIX, config_dimensions
+
+CELL_KEYS = ['Phase', 'Database', 'Nodes', 'Workload']
+
+GC_COLUMN = 'TOTAL_GC_TIME_%.Time(%)'
+MAX_GC_PERCENT = 5.0
+MIN_RUNTIME_FRACTION = 0.5
+MAX_Z_SCORE = 3.5
+
+# Fewer tries than this in a cell and no outlier is looked for
+MIN_TRIES = 4
+
+# Weight of a flagged try in down-weighted aggregates
+DOWN_WEIGHT = 0.25
+
+POLICIES = ('keep', 'exclude', 'downweight')
+
+
+def max_latency_columns(df):
+    return [column for column in df.columns
+            if column.endswith('.MaxLatency(us)') and not column.startswith(('CLEANUP', 'CONFIG', INTENDED_PREFIX))
+            and '-FAILED' not in column]
+
+
+def robust_z_scores(values):
+    """Modified z-scores 0.6745 (x - median) / MAD; 0 when the MAD is 0."""
+    values = np.asarray(values, dtype=float)
+    deviations = values - np.nanmedian(values)
+    mad = np.nanmedian(np.abs(deviations))
+    if not mad:
+        return np.zeros_like(values)
+    return 0.6745 * deviations / mad
+
+
+def cell_keys(df):
+    """Columns of a wide results frame identifying the cell of a try, its settings included."""
+    return [key for key in CELL_KEYS + ['Settings'] if key in df.columns] + config_dimensions(df)
+
+
+def flag_tries(df, max_gc_percent=MAX_GC_PERCENT, min_runtime_fraction=MIN_RUNTIME_FRACTION,
+               max_z_score=MAX_Z_SCORE):
+    """Add the 'Flags' (';'-separated reasons), 'Valid' and 'Weight' columns to a wide results frame."""
+    df = df.copy()
+    flags = {}
+    keys = cell_keys(df)
+    cells = [df[key].fillna('') for key in keys]
+    if GC_COLUMN in df.columns:
+        flags['gc'] = df[GC_COLUMN] > max_gc_percent
+    if 'RunTime' in df.columns:
+        flags['short'] = df['RunTime'] < min_runtime_fraction * df['RunTime'].groupby(cells).transform('median')
+
+    columns = max_latency_columns(df)
+    if columns:
+        largest = np.log10(df[columns].max(axis=1).clip(lower=1))
+        z = largest.groupby(cells).transform(
+            lambda values: robust_z_scores(values) if values.notna().sum() >= MIN_TRIES else 0.0)
+        flags['max-latency'] = z > max_z_score
+
+    reasons = [np.where(flagged.fillna(False), name, '') for name, flagged in flags.items()]
+    df['Flags'] = [';'.join(reason for reason in row if reason) for row in zip(*reasons)] if reasons else ''
+    df['Valid'] = df['Flags'] == ''
+    df['Weight'] = np.where(df['Valid'], 1.0, DOWN_WEIGHT)
+    return df
+
+
+def apply_policy(df, policy='keep'):
+    """Return the tries of a wide results frame to aggregate under an invalid-try policy.
+
+    'exclude' drops the flagged tries; 'keep' and 'downweight' keep them all,
+    the latter relying on the 'Weight' column.
+    """
+    if df.empty or policy == 'keep':
+        return df
+    df = flag_tries(df)
+    if policy == 'exclude':
+        return df[df['Valid']]
+    return df
+
+
+def rejection_report(df, metrics=('Throughput',)):
+    """Return one row per cell with its tries, rejected tries by reason and the metric aggregates.
+
+    For each metric the mean of all the tries, of the valid ones and the
+    down-weighted mean are given side by side.
+    """
+    import pandas as pd
+
+    df = flag_tries(df)
+    keys = cell_keys(df)
+    rows = []
+    for key, cell in df.groupby(keys, sort=True):
+        row = dict(zip(keys, key), Tries=len(cell), Rejected=int((~cell['Valid']).sum()))
+        for reason in ('gc', 'short', 'max-latency'):
+            row[reason] = int(cell['Flags'].str.contains(reason, regex=False).sum())
+        for metric in metrics:
+            if metric not in cell.columns:
+                continue
+            valid = cell[cell['Valid']]
+            row[metric] = cell[metric].mean()
+            row[f'{metric}Valid'] = valid[metric].mean() if len(valid) else np.nan
+            row[f'{metric}Weighted'] = np.average(cell[metric], weights=cell['Weight'])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flag the tries whose measurement is not trustworthy.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory containing the result files')
+    parser.add_argument('--phase', choices=('load', 'run'), default='run')
+    parser.add_argument('--metrics', nargs='+', default=['Throughput'])
+    parser.add_argument('--list', action='store_true', help='also list every flagged try')
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from results_cache import load_results
+
+    df = load_results(args.results_dir, args.phase)
+    if df.empty:
+        print(f'No results found in {args.results_dir}')
+        return
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(rejection_report(df, args.metrics).to_string(index=False, float_format='%.1f'))
+        if args.list:
+            flagged = flag_tries(df)
+            flagged = flagged[~flagged['Valid']]
+            print()
+            columns = [c for c in ('Database', 'Nodes', 'Workload', 'Try', 'RunTime', GC_COLUMN, 'Flags')
+                       if c in flagged.columns]
+            print(flagged[columns].to_string(index=False, float_format='%.1f'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""Append-only SQLite warehouse of every ingested benchmark run.
+
+Each section of a results file becomes a row of the 'runs' table, keyed by
+its run id, with its ingestion host, source folder, file, timestamp (the
+mtime of the file), phase, database, topology ('<Database><Nodes>' plus the
+driver and client options), driver, workload file SHA-256 and try, and its
+metrics become rows of the indexed 'metrics' table.  Ingestion is
+idempotent: a section already stored with the same file content is
+skipped, while a changed file adds new runs next to the old ones.
+
+query() returns filtered frames in the format of results_cache.py
+(long or wide) straight from the indexes, without reading any raw file.
+
+Usage:
+    python3 warehouse.py ingest results/ results-pc-david/ --db results/warehouse.db
+    python3 warehouse.py query --db results/warehouse.db --phase run --database Mongo --metrics Throughput
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+from datetime import datetime, timezone
+
+from ingest import compact_to_frame, find_results_files, parse_files
+from results_cache import file_digest
+from ycsb_parser import COLUMNS, METRIC_ALIASES, OPTION_COLUMNS, file_metadata, wide_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKLOADS_DIR = os.path.join(BASE_DIR, 'YCSB', 'workloads')
+
+DEFAULT_DB = os.path.join('results', 'warehouse.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    ingested_at TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    host TEXT NOT NULL,
+    source TEXT NOT NULL,
+    file TEXT NOT NULL,
+    file_sha256 TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    database TEXT NOT NULL,
+    nodes INTEGER NOT NULL,
+    topology TEXT NOT NULL,
+    driver TEXT NOT NULL,
+    workload TEXT NOT NULL,
+    workload_sha256 TEXT NOT NULL,
+    try INTEGER NOT NULL,
+    settings_key TEXT NOT NULL DEFAULT '',
+    settings TEXT NOT NULL,
+    UNIQUE (file_sha256, phase, workload, try, settings_key)
+);
+CREATE INDEX IF NOT EXISTS runs_cell ON runs (phase, database, nodes, workload);
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs (timestamp);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    section TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics (section, metric, run_id);
+"""
+
+# Columns of the runs table returned by query(), renamed as in the results frames
+RUN_COLUMNS = {
+    'run_id': 'RunId', 'timestamp': 'Timestamp', 'host': 'Host', 'source': 'Source', 'file': 'File',
+    'phase': 'Phase', 'database': 'Database', 'nodes': 'Nodes', 'topology': 'Topology', 'driver': 'Driver',
+    'workload': 'Workload', 'workload_sha256': 'WorkloadSHA256', 'try': 'Try', 'settings_key': 'Settings',
+}
+
+
+_workload_digests = {}
+
+
+def workload_digest(workload):
+    """SHA-256 of the YCSB workload file of a workload letter, '' when the file is not in the tree."""
+    if workload not in _workload_digests:
+        path = os.path.join(WORKLOADS_DIR, f'workload{workload.lower()}')
+        _workload_digests[workload] = file_digest(path) if os.path.isfile(path) else ''
+    return _workload_digests[workload]
+
+
+def topology_name(database, nodes, driver, settings):
+    """'Mongo3', or 'Mongo3 mongodb w=majority' with the driver and client options of the run."""
+    options = [f'{name}={settings[name]}' for name in OPTION_COLUMNS if name in settings]
+    return ' '.join([f'{database}{nodes}'] + ([driver] if driver else []) + options)
+
+
+class Warehouse:
+    """A connection to the warehouse database, created on first use."""
+
+    def __init__(self, path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.migrate()
+        self.connection.executescript(SCHEMA)
+
+    def migrate(self):
+        """Rebuild a runs table of before the 'settings_key' column, whose sections of a try collided."""
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(runs)')]
+        if not columns or 'settings_key' in columns:
+            return
+        with self.connection:
+            self.connection.execute('ALTER TABLE runs RENAME TO runs_old')
+            self.connection.execute('DROP INDEX IF EXISTS runs_cell')
+            self.connection.execute('DROP INDEX IF EXISTS runs_timestamp')
+            self.connection.executescript(SCHEMA)
+            names = ', '.join(columns)
+            self.connection.execute(f'INSERT INTO runs ({names}) SELECT {names} FROM runs_old')
+            self.connection.execute('DROP TABLE runs_old')
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ingest_directories(self, directories, host=None, workers=None):
+        """Parse every results file below the directories and append its new runs; return their number."""
+        found = find_results_files(directories)
+        compacts = parse_files([path for _, path in found], workers=workers)
+        host = host or socket.gethostname()
+        added = 0
+        with self.connection:
+            for (source, path), compact in zip(found, compacts):
+                added += self.append(compact_to_frame(compact), path, source, host)
+        return added
+
+    def append(self, df, path, source, host):
+        """Append the runs of a parsed long frame of one file, skipping those already stored."""
+        filename = os.path.basename(path)
+        metadata = file_metadata(filename)
+        sha256 = file_digest(path)
+        timestamp = datetime.fromtimestamp(os.stat(path).st_mtime, timezone.utc).isoformat(timespec='seconds')
+        ingested_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        added = 0
+        cursor = self.connection.cursor()
+        for (phase, workload, try_number, settings_key), section in df.groupby(list(COLUMNS[:4]), sort=False):
+            # Header settings: numeric 'CONFIG' metrics and 'name=value' flags
+            config = section[section['Section'] == 'CONFIG']
+            settings = {}
+            for metric, value in zip(config['Metric'], config['Value']):
+                name, _, text = metric.partition('=')
+                settings[name] = text or f'{value:g}'
+            cursor.execute(
+                'INSERT OR IGNORE INTO runs (ingested_at, timestamp, host, source, file, file_sha256, phase, database,'
+                ' nodes, topology, driver, workload, workload_sha256, try, settings_key, settings)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (ingested_at, timestamp, host, source, filename, sha256, phase, metadata['Database'],
+                 metadata['Nodes'], topology_name(metadata['Database'], metadata['Nodes'], metadata['Driver'], settings),
+                 metadata['Driver'], workload, workload_digest(workload), int(try_number), settings_key,
+                 json.dumps(settings, sort_keys=True)))
+            if not cursor.rowcount:
+                continue
+            run_id = cursor.lastrowid
+            cursor.executemany('INSERT INTO metrics (run_id, section, metric, value) VALUES (?, ?, ?, ?)',
+                               [(run_id, s, m, float(v)) for s, m, v in
+                                zip(section['Section'], section['Metric'], section['Value'])])
+            added += 1
+        return added
+
+    def query(self, phase=None, database=None, nodes=None, driver=None, workload=None, host=None, source=None,
+              since=None, until=None, metrics=None, latest=False, wide=True):
+        """Return the runs matching the filters, as a wide (one row per run) or long frame.
+
+        Filters accept a value or a list of values; 'since' and 'until' bound
+        the run timestamps (ISO strings).  'metrics' restricts the metrics
+        read, given as METRIC_ALIASES names or '<SECTION>.<Metric>' columns.
+        With 'latest', only the last ingested version of each file is kept.
+        """
+        import pandas as pd
+
+        clauses, params = [], []
+        for column, value in (('phase', phase), ('database', database), ('nodes', nodes), ('driver', driver),
+                              ('workload', workload), ('host', host), ('source', source)):
+            if value is None:
+                continue
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f'r.{column} IN ({", ".join("?" * len(values))})')
+            params += values
+        if since:
+            clauses.append('r.timestamp >= ?')
+            params.append(since)
+        if until:
+            clauses.append('r.timestamp <= ?')
+            params.append(until)
+        if latest:
+            clauses.append('r.run_id = (SELECT MAX(l.run_id) FROM runs l WHERE l.source = r.source'
+                           ' AND l.file = r.file AND l.phase = r.phase AND l.workload = r.workload AND l.try = r.try'
+                           ' AND l.settings_key = r.settings_key)')
+        if metrics:
+            names = [METRIC_ALIASES.get(metric, metric).split('.', 1) for metric in metrics]
+            # Keep the header settings of the runs as well
+            clauses.append('(m.section = ? OR ' + ' OR '.join(['(m.section = ? AND m.metric = ?)'] * len(names)) + ')')
+            params += ['CONFIG'] + [part for name in names for part in name]
+
+        columns = ', '.join(f'r.{column} AS {name}' for column, name in RUN_COLUMNS.items())
+        sql = (f'SELECT {columns}, m.section AS Section, m.metric AS Metric, m.value AS Value'
+               ' FROM runs r JOIN metrics m ON m.run_id = r.run_id')
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        df = pd.read_sql_query(sql, self.connection, params=params)
+        return wide_frame(df) if wide else df
+
+    def summary(self):
+        """Number of runs per source, database, node count, driver and phase."""
+        import pandas as pd
+
+        return pd.read_sql_query(
+            'SELECT source AS Source, database AS Database, nodes AS Nodes, driver AS Driver, phase AS Phase,'
+            ' COUNT(*) AS Runs, MIN(timestamp) AS First, MAX(timestamp) AS Last FROM runs'
+            ' GROUP BY source, database, nodes, driver, phase ORDER BY source, database, nodes, driver, phase',
+            self.connection)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Store benchmark runs in a SQLite warehouse and query them.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help='append the runs of result directories')
+    ingest.add_argument('directories', nargs='+', help='result directories to walk recursively')
+    ingest.add_argument('--host', help='host that ran the benchmarks (default: this host)')
+    ingest.add_argument('--workers', type=int, default=None, help='number of parsing processes')
+
+    query = subparsers.add_parser('query', help='print or export the runs matching filters')
+    query.add_argument('--phase', choices=('load', 'run'))
+    query.add_argument('--database', nargs='+')
+    query.add_argument('--nodes', nargs='+', type=int)
+    query.add_argument('--driver', nargs='+')
+    query.add_argument('--workload', nargs='+')
+    query.add_argument('--host', nargs='+')
+    query.add_argument('--since', help='earliest run timestamp (ISO 8601)')
+    query.add_argument('--until', help='latest run timestamp (ISO 8601)')
+    query.add_argument('--metrics', nargs='+', help='metrics to read (default: all)')
+    query.add_argument('--latest', action='store_true', help='only the last ingested version of each file')
+    query.add_argument('--output', help='write the frame to this Parquet or CSV file')
+
+    subparsers.add_parser('summary', help='count the stored runs')
+    for sub in subparsers.choices.values():
+        sub.add_argument('--db', default=DEFAULT_DB, help='warehouse database (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    with Warehouse(args.db) as warehouse:
+        if args.command == 'ingest':
+            added = warehouse.ingest_directories(args.directories, args.host, args.workers)
+            print(f'Added {added} runs to {args.db}')
+        elif args.command == 'summary':
+            print(warehouse.summary().to_string(index=False))
+        else:
+            df = warehouse.query(args.phase, args.database, args.nodes, args.driver,
+                                 [workload.upper() for workload in args.workload] if args.workload else None,
+                                 args.host, since=args.since, until=args.until, metrics=args.metrics,
+                                 latest=args.latest)
+            if args.output and args.output.endswith('.parquet'):
+                df.to_parquet(args.output, index=False)
+            elif args.output:
+                df.to_csv(args.output, index=False)
+            else:
+                print(df.to_string(index=False, max_rows=50))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""Live view of a running benchmark: follows the results files and refreshes the figures.
+
+The results files of a directory are polled every 'interval' seconds.  Only
+the bytes appended since the previous poll are read, and the lines are
+buffered per file until the section they belong to is complete: a try is
+complete when the next separator or header is written, or once its
+[OVERALL] summary has been printed and the file stayed unchanged for
+'settle' seconds (the last try of a file).  Completed sections are parsed
+with ycsb_parser.iter_records() and appended to an in-memory results
+frame; the figures of the phases that changed are then redrawn and
+'<figures_dir>/dashboard.html' (which reloads itself) is rewritten with
+the tries done so far in each cell.
+
+A file that shrinks (e.g. restarted by the orchestrator) is read again
+from the start, and the tries read from it before are dropped.
+
+Usage: python3 watch.py results/ --figures-dir figures/live/ --interval 2
+"""
+import argparse
+import html
+import os
+import time
+
+from ycsb_parser import COLUMNS, file_metadata, iter_records, parse_header, wide_frame
+
+INTERVAL = 2.0
+SETTLE = 5.0
+
+# Figure kinds drawn from the results frame
+KINDS = ('bar', 'box')
+
+DASHBOARD_FILE = 'dashboard.html'
+
+# Fields of the records accumulated by Watcher
+RECORD_COLUMNS = ['File', 'Database', 'Nodes', 'Driver'] + list(COLUMNS)
+
+
+class FollowedFile:
+    """The read position and the pending section of one results file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.metadata = file_metadata(os.path.basename(path))
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.partial = ''
+        self.section = []
+        self.modified = time.monotonic()
+        self.restarted = False
+
+    def poll(self):
+        """Read the appended bytes; return the lines of the sections completed since the last poll.
+
+        'restarted' tells whether the file shrank since the last poll.
+        """
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            self.reset()
+            self.restarted = True
+        else:
+            self.restarted = False
+        completed = []
+        if size > self.offset:
+            with open(self.path, 'r') as file:
+                file.seek(self.offset)
+                data = self.partial + file.read()
+                self.offset = file.tell()
+            self.modified = time.monotonic()
+            lines = data.split('\n')
+            # The last line may still be incomplete
+            self.partial = lines.pop()
+            for line in lines:
+                stripped = line.strip()
+                if stripped.startswith('#') or parse_header(stripped):
+                    if self.section:
+                        completed += self.section
+                    self.section = []
+                self.section.append(line)
+        return completed
+
+    def flush(self, settle):
+        """Return the pending section once it has its summary and the file is idle for 'settle' seconds."""
+        idle = time.monotonic() - self.modified >= settle
+        if idle and any(line.startswith('[OVERALL], RunTime') for line in self.section):
+            completed, self.section = self.section + [self.partial], []
+            self.partial = ''
+            return completed
+        return []
+
+
+class Watcher:
+    """Follows the results files of a directory and accumulates their completed tries."""
+
+    def __init__(self, results_dir, settle=SETTLE):
+        self.results_dir = results_dir
+        self.settle = settle
+        self.files = {}
+        self.records = []
+
+    def poll(self):
+        """Read every results file; return the phases that got new tries."""
+        for filename in sorted(os.listdir(self.results_dir)):
+            if filename not in self.files and file_metadata(filename):
+                self.files[filename] = FollowedFile(os.path.join(self.results_dir, filename))
+
+        changed = set()
+        for filename, followed in list(self.files.items()):
+            try:
+                lines = followed.poll() + followed.flush(self.settle)
+            except FileNotFoundError:
+                del self.files[filename]
+                continue
+            if followed.restarted:
+                # The tries read before the restart are no longer in the file
+                phase = RECORD_COLUMNS.index('Phase')
+                changed.update(record[phase] for record in self.records if record[0] == filename)
+                self.records = [record for record in self.records if record[0] != filename]
+            for record in iter_records(lines):
+                self.records.append((filename,) + tuple(followed.metadata.values()) + record)
+                changed.add(record[0])
+        return changed
+
+    def frame(self, phase):
+        """Wide results frame of the tries of a phase completed so far."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+        df = df[df['Phase'] == phase].drop(columns='File')
+        # A try parsed twice (file restarted) keeps its latest values
+        df = df.drop_duplicates(subset=['Database', 'Nodes', 'Driver', 'Phase', 'Workload', 'Try', 'Settings',
+                                        'Section', 'Metric'], keep='last')
+        return wide_frame(df)
+
+
+def render(watcher, phases, figures_dir, kinds=KINDS, formats=('png',)):
+    """Redraw the figures of the given phases; returns the written paths."""
+    from figures import AXIS_COLUMNS, figure_task, prepare_frame, render_figure, select_figures
+
+    paths = []
+    for phase in sorted(phases):
+        df = watcher.frame(phase)
+        if df.empty:
+            continue
+        for spec in select_figures([phase], kinds):
+            if spec.get('data', 'results') != 'results':
+                continue
+            task = figure_task(spec, prepare_frame(df.copy(), AXIS_COLUMNS.get(spec['kind'], ())))
+            if task:
+                paths += render_figure(*task, figures_dir, formats)
+    return paths
+
+
+def write_dashboard(watcher, figures_dir, paths, interval):
+    """Write the self-refreshing HTML page with the tries per cell and the figures."""
+    rows = []
+    for phase in ('load', 'run'):
+        df = watcher.frame(phase)
+        if df.empty or 'Throughput' not in df.columns:
+            continue
+        cells = df.groupby(['Database', 'Nodes', 'Driver', 'Settings', 'Workload'])
+        for (db_name, nodes, driver, settings, workload), cell in cells:
+            latest = cell.sort_values('Try').iloc[-1]
+            rows.append(f'<tr><td>{phase}</td><td>{html.escape(db_name)}{nodes} {html.escape(driver)} '
+                        f'{html.escape(settings)}</td>'
+                        f'<td>{html.escape(workload)}</td><td>{len(cell)}</td>'
+                        f'<td>{cell["Throughput"].mean():.1f}</td><td>{cell["Throughput"].std():.1f}</td>'
+                        f'<td>{latest["Throughput"]:.1f}</td></tr>')
+
+    images = [f'<img src="{html.escape(os.path.relpath(path, figures_dir))}" width="900">'
+              for path in sorted(set(paths))]
+    page = '\n'.join([
+        '<!DOCTYPE html>',
+        f'<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{max(int(interval), 1)}">',
+        '<title>Benchmark progress</title></head><body>',
+        f'<h1>Benchmark progress ({time.strftime("%H:%M:%S")})</h1>',
+        '<table border="1" cellpadding="4"><tr><th>Phase</th><th>Configuration</th><th>Workload</th>'
+        '<th>Tries</th><th>Mean ops/sec</th><th>Std ops/sec</th><th>Last try ops/sec</th></tr>',
+    ] + rows + ['</table>'] + images + ['</body></html>'])
+
+    os.makedirs(figures_dir, exist_ok=True)
+    path = os.path.join(figures_dir, DASHBOARD_FILE)
+    with open(path + '.tmp', 'w') as file:
+        file.write(page)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Follow the results files and refresh the figures live.')
+    parser.add_argument('results_dir', nargs='?', default='results/', help='directory the benchmark writes to')
+    parser.add_argument('--figures-dir', default='figures/live/', help='directory of the live figures')
+    parser.add_argument('--interval', type=float, default=INTERVAL, help='polling period in seconds')
+    parser.add_argument('--settle', type=float, default=SETTLE,
+                        help='seconds without writes after which the last try of a file is complete')
+    parser.add_argument('--kind', nargs='+', choices=KINDS, default=list(KINDS), help='figure kinds to refresh')
+    parser.add_argument('--once', action='store_true', help='process the current content and exit')
+    args = parser.parse_args(argv)
+
+    watcher = Watcher(args.results_dir, 0 if args.once else args.settle)
+    paths = []
+    try:
+        while True:
+            changed = watcher.poll()
+            if changed:
+                paths += render(watcher, changed, args.figures_dir, args.kind)
+                dashboard = write_dashboard(watcher, args.figures_dir, paths, args.interval)
+                print(f'{time.strftime("%H:%M:%S")} {len(watcher.records)} metrics, refreshed {dashboard}')
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+"""YCSB CoreWorkload property files and request generators.
+
+Reads the same 'YCSB/workloads/workload*' property files as the Java client
+and reproduces the CoreWorkload key choosers (uniform, zipfian, latest,
+hotspot), operation mix and key naming, so the Python load generator and
+the YCSB client exercise the databases the same way.
+"""
+import math
+import os
+import random
+
+# Defaults of site.ycsb.workloads.CoreWorkload (see YCSB/workloads/workload_template)
+DEFAULTS = {
+    'recordcount': 0,
+    'operationcount': 0,
+    'insertstart': 0,
+    'fieldcount': 10,
+    'fieldlength': 100,
+    'readallfields': True,
+    'writeallfields': False,
+    'readproportion': 0.95,
+    'updateproportion': 0.05,
+    'insertproportion': 0.0,
+    'scanproportion': 0.0,
+    'readmodifywriteproportion': 0.0,
+    'maxscanlength': 1000,
+    'scanlengthdistribution': 'uniform',
+    'insertorder': 'hashed',
+    'requestdistribution': 'zipfian',
+    'zipfianconstant': 0.99,
+    'hotspotdatafraction': 0.2,
+    'hotspotopnfraction': 0.8,
+    'table': 'usertable',
+}
+
+# Operations in the order CoreWorkload builds its operation chooser
+OPERATIONS = (
+    ('READ', 'readproportion'),
+    ('UPDATE', 'updateproportion'),
+    ('INSERT', 'insertproportion'),
+    ('SCAN', 'scanproportion'),
+    ('READ-MODIFY-WRITE', 'readmodifywriteproportion'),
+)
+
+WORKLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'YCSB', 'workloads')
+
+# Names of the operations in the workload labels; the updates are the
+# writes of the plain read/write mixes
+LABEL_NAMES = {
+    'READ': 'Read',
+    'UPDATE': 'Write',
+    'INSERT': 'Insert',
+    'SCAN': 'Scan',
+    'READ-MODIFY-WRITE': 'Read-Modify-Write',
+}
+
+# Constants of site.ycsb.generator.ScrambledZipfianGenerator
+ZIPFIAN_CONSTANT = 0.99
+SCRAMBLED_ITEM_COUNT = 10000000000
+SCRAMBLED_ZETAN = 26.46902820178302
+
+FNV_OFFSET_BASIS_64 = 0xCBF29CE484222325
+FNV_PRIME_64 = 1099511628211
+MASK_64 = (1 << 64) - 1
+
+
+def read_properties(path):
+    """Parse a Java properties file ('key=value' lines, '#' and '!' comments)."""
+    properties = {}
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line[0] in '#!':
+                continue
+            separator = min((line.find(c) for c in '=:' if c in line), default=-1)
+            if separator < 0:
+                continue
+            properties[line[:separator].strip()] = line[separator + 1:].strip()
+    return properties
+
+
+def load_workload(path=None, overrides=None):
+    """Return the CoreWorkload settings of a workload file, typed after DEFAULTS.
+
+    'overrides' are applied on top of the file, like '-p key=value' options.
+    Unknown properties (e.g. 'redis.host') are kept as strings.
+    """
+    properties = read_properties(path) if path else {}
+    properties.update(overrides or {})
+
+    workload = dict(DEFAULTS)
+    for key, value in properties.items():
+        default = DEFAULTS.get(key)
+        if isinstance(default, bool):
+            workload[key] = str(value).lower() == 'true'
+        elif isinstance(default, int):
+            workload[key] = int(float(value))
+        elif isinstance(default, float):
+            workload[key] = float(value)
+        else:
+            workload[key] = value
+    if 'insertcount' not in properties:
+        workload['insertcount'] = workload['recordcount'] - workload['insertstart']
+    else:
+        workload['insertcount'] = int(workload['insertcount'])
+    return workload
+
+
+def operation_mix(workload):
+    """Return [(operation, proportion), ...] for the non-zero proportions."""
+    return [(name, workload[key]) for name, key in OPERATIONS if workload[key] > 0]
+
+
+def mix_label(workload):
+    """Describe the operation mix of a workload: '50% Read / 50% Write', '95% Scan / 5% Insert'.
+
+    Read/update mixes always name both sides ('100% Read / 0% Write'); a
+    request distribution other than zipfian is appended ('(latest)').
+    """
+    mix = dict(operation_mix(workload))
+    if set(mix) <= {'READ', 'UPDATE'}:
+        mix = {'READ': mix.get('READ', 0), 'UPDATE': mix.get('UPDATE', 0)}
+    label = ' / '.join(f'{round(proportion * 100, 2):g}% {LABEL_NAMES[name]}' for name, proportion in mix.items())
+    if workload['requestdistribution'] != DEFAULTS['requestdistribution']:
+        label += f" ({workload['requestdistribution']})"
+    return label
+
+
+def workload_labels(names, workloads_dir=WORKLOADS_DIR):
+    """Map workload names ('A', 'D') to the mix label of their '<workloads_dir>/workload<name>' file.
+
+    Workloads without a file keep their name, and workloads sharing a mix
+    get their name appended so they stay apart in the figures.
+    """
+    labels = {}
+    for name in names:
+        path = os.path.join(workloads_dir, f'workload{str(name).lower()}')
+        labels[name] = mix_label(load_workload(path)) if os.path.isfile(path) else str(name)
+    counts = {}
+    for label in labels.values():
+        counts[label] = counts.get(label, 0) + 1
+    return {name: f'{label} [{name}]' if counts[label] > 1 else label for name, label in labels.items()}
+
+
+def fnvhash64(value):
+    """FNV-1 64 bit hash as implemented by site.ycsb.Utils.fnvhash64."""
+    hashval = FNV_OFFSET_BASIS_64
+    for _ in range(8):
+        octet = value & 0xff
+        value >>= 8
+        hashval ^= octet
+        hashval = (hashval * FNV_PRIME_64) & MASK_64
+    # Java returns Math.abs() of the signed long
+    if hashval >= 1 << 63:
+        hashval = (1 << 64) - hashval
+    return hashval & MASK_64
+
+
+def build_key_name(keynum, ordered=False):
+    """Return the record key of a key number, as CoreWorkload.buildKeyName does."""
+    if not ordered:
+        keynum = fnvhash64(keynum)
+    return f'user{keynum}'
+
+
+def java_string_hash(value):
+    """Return Java's String.hashCode() of a string (used by the Redis binding)."""
+    h = 0
+    for char in value:
+        h = (31 * h + ord(char)) & 0xffffffff
+    return h - (1 << 32) if h >= 1 << 31 else h
+
+
+def zeta(n, theta, start=0, initial=0.0):
+    """Return sum(1 / i**theta for i in (start, n]), added to 'initial'."""
+    import numpy as np
+
+    total = initial
+    chunk = 1 << 22
+    for low in range(start + 1, n + 1, chunk):
+        i = np.arange(low, min(n, low + chunk - 1) + 1, dtype=np.float64)
+        total += float(np.sum(i ** -theta))
+    return total
+
+
+class ZipfianGenerator:
+    """Port of site.ycsb.generator.ZipfianGenerator (Gray et al. algorithm)."""
+
+    def __init__(self, min_value, max_value, constant=ZIPFIAN_CONSTANT, zetan=None, rng=random):
+        self.base = min_value
+        self.items = max_value - min_value + 1
+        self.theta = constant
+        self.rng = rng
+        self.zeta2theta = zeta(2, constant)
+        self.alpha = 1.0 / (1.0 - constant)
+        self.zetan = zetan if zetan is not None else zeta(self.items, constant)
+        self.count_for_zeta = self.items
+        self.eta = self._eta()
+
+    def _eta(self):
+        return (1 - math.pow(2.0 / self.items, 1 - self.theta)) / (1 - self.zeta2theta / self.zetan)
+
+    def next_long(self, item_count):
+        # The 'latest' distribution grows the item count between calls
+        if item_count != self.count_for_zeta:
+            if item_count > self.count_for_zeta:
+                self.zetan = zeta(item_count, self.theta, self.count_for_zeta, self.zetan)
+            else:
+                self.zetan = zeta(item_count, self.theta)
+            self.count_for_zeta = item_count
+            self.items = item_count
+            self.eta = self._eta()
+
+        u = self.rng.random()
+        uz = u * self.zetan
+        if uz < 1.0:
+            return self.base
+        if uz < 1.0 + math.pow(0.5, self.theta):
+            return self.base + 1
+        return self.base + int(item_count * math.pow(self.eta * u - self.eta + 1, self.alpha))
+
+    def next_value(self):
+        return self.next_long(self.items)
+
+
+class ScrambledZipfianGenerator:
+    """Zipfian popularity spread over the key space with an FNV hash."""
+
+    def __init__(self, min_value, max_value, rng=random):
+        self.min = min_value
+        self.item_count = max_value - min_value + 1
+        self.generator = ZipfianGenerator(0, SCRAMBLED_ITEM_COUNT, ZIPFIAN_CONSTANT, SCRAMBLED_ZETAN, rng=rng)
+
+    def next_value(self):
+        return self.min + fnvhash64(self.generator.next_value()) % self.item_count
+
+
+class SkewedLatestGenerator:
+    """Zipfian over the most recently inserted keys (requestdistribution=latest)."""
+
+    def __init__(self, counter, rng=random):
+        self.counter = counter
+        # Over the 'last_value()' keys below the latest one, as YCSB's ZipfianGenerator(items)
+        self.generator = ZipfianGenerator(0, max(counter.last_value() - 1, 0), rng=rng)
+
+    def next_value(self):
+        maximum = self.counter.last_value()
+        return maximum - self.generator.next_long(maximum)
+
+
+class UniformGenerator:
+    def __init__(self, min_value, max_value, rng=random):
+        self.min = min_value
+        self.max = max_value
+        self.rng = rng
+
+    def next_value(self):
+        return self.rng.randint(self.min, self.max)
+
+
+class HotspotGenerator:
+    """Port of site.ycsb.generator.HotspotIntegerGenerator."""
+
+    def __init__(self, min_value, max_value, hot_set_fraction, hot_opn_fraction, rng=random):
+        self.min = min_value
+        self.hot_opn_fraction = hot_opn_fraction
+        self.hot_interval = int((max_value - min_value + 1) * hot_set_fraction)
+        self.cold_interval = (max_value - min_value + 1) - self.hot_interval
+        self.rng = rng
+
+    def next_value(self):
+        if self.rng.random() < self.hot_opn_fraction:
+            return self.min + self.rng.randrange(max(self.hot_interval, 1))
+        return self.min + self.hot_interval + self.rng.randrange(max(self.cold_interval, 1))
+
+
+class InsertCounter:
+    """Sequence of insert key numbers; last_value() is the latest inserted key."""
+
+    def __init__(self, start):
+        self.next = start
+
+    def next_value(self):
+        value = self.next
+        self.next += 1
+        return value
+
+    def last_value(self):
+        return self.next - 1
+
+
+class DiscreteGenerator:
+    def __init__(self, choices, rng=random):
+        self.choices = [name for name, _ in choices]
+        self.weights = [weight for _, weight in choices]
+        self.rng = rng
+
+    def next_value(self):
+        return self.rng.choices(self.choices, self.weights)[0]
+
+
+def key_chooser(workload, insert_counter, rng=random):
+    """Return the generator of key numbers for read/update/scan operations."""
+    distribution = workload['requestdistribution']
+    start = workload['insertstart']
+    count = workload['insertcount']
+    if distribution == 'uniform':
+        return UniformGenerator(start, start + count - 1, rng=rng)
+    if distribution == 'zipfian':
+        # Leave room for the keys inserted during the run, as CoreWorkload does
+        new_keys = int(workload['operationcount'] * workload['insertproportion'] * 2.0)
+        return ScrambledZipfianGenerator(start, start + count + new_keys, rng=rng)
+    if distribution == 'latest':
+        return SkewedLatestGenerator(insert_counter, rng=rng)
+    if distribution == 'hotspot':
+        return HotspotGenerator(start, start + count - 1, workload['hotspotdatafraction'],
+                                workload['hotspotopnfraction'], rng=rng)
+    raise ValueError(f'Unknown requestdistribution: {distribution}')
+
+
+def scan_length_chooser(workload, rng=random):
+    if workload['scanlengthdistribution'] == 'zipfian':
+        return ZipfianGenerator(1, workload['maxscanlength'], rng=rng)
+    return UniformGenerator(1, workload['maxscanlength'], rng=rng)
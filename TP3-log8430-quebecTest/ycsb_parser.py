@@ -0,0 +1,306 @@
+"""Streaming parser for the YCSB output files written by the benchmark scripts.
+
+Each results file is a sequence of sections.  A section starts with a header
+line written by the scripts (e.g. 'Running workload A try 1') and contains the
+'[SECTION], Metric, value' lines printed by YCSB.  Files are read line by line
+so parse cost is linear and memory does not depend on the file size.
+"""
+import os
+import re
+
+# Header lines written before each YCSB invocation.  The scripts have drifted
+# over time, so every variant present in our files is accepted:
+#   Running workload A try 1       Loading workload A try 1
+#   Running test workload A try 1  Loading data workload A try 1
+#   Running test workoad A try 1   Loading data worload A try 1
+#   Running test workload workloadb try 1
+HEADER_RE = re.compile(r'^(Running|Loading)(?: test| data)? wor\w*?ad (?:workload)?(\w+) try (\d+)')
+
+# Client settings the orchestrator appends to the header of sweep runs
+# ('Running test workload A try 3 threads=16 target=2000 w=majority'); they
+# are stored as metrics of a 'CONFIG' section.  Numeric settings keep their
+# value, others become a 'name=value' metric of value 1
+HEADER_PARAM_RE = re.compile(r'(\w+)=(\S+)')
+
+# Header settings shared by every section of a results file (engines.py), left
+# out of the 'Settings' key that tells apart the configurations of one try
+FILE_SETTINGS = ('engine', 'deployment')
+
+# Settings segment of the per-run log names: '-threads=16-target=2000-w=majority'
+SETTINGS_SEGMENT_RE = r'((?:-\w+=[\w.]+)*)'
+
+# Metric lines printed by YCSB: '[READ], AverageLatency(us), 117.62'
+METRIC_RE = re.compile(r'^\[([^\]]+)\], ([^,]+), (.+)$')
+
+# Results files are named '<phase><Database><Nodes>.csv' (e.g. 'runMongo3.csv').
+# Older archives use 'output<Phase><Database><Nodes>[tests[N]].csv' instead
+# (e.g. 'outputRunRedis3.csv' or 'outputLoadAsyncMongo3tests.csv').
+FILENAME_RE = re.compile(r'^(?:output)?(load|run)(\w+?)(\d+)(?:tests\d*)?\.csv$', re.IGNORECASE)
+
+# Database labels of results filenames that also name the client binding;
+# any other label is the database itself with an unspecified driver
+DATABASE_DRIVERS = {
+    'AsyncMongo': ('Mongo', 'mongodb-async'),
+    'SyncMongo': ('Mongo', 'mongodb'),
+    'PyMongo': ('Mongo', 'pymongo'),
+}
+
+# MongoDB client options of the header, stored as text columns of the wide frame
+OPTION_COLUMNS = {
+    'w': 'WriteConcern',
+    'journal': 'Journal',
+    'readPreference': 'ReadPreference',
+    'maxPoolSize': 'MaxPoolSize',
+}
+
+# Engine registry name and deployment of the header (engines.py), stored as
+# text columns of the wide frame; the Database label already tells them apart
+SETTING_COLUMNS = {
+    'engine': 'Engine',
+    'deployment': 'Deployment',
+}
+
+# Configuration dimensions of a try besides Database and Nodes
+CONFIG_DIMENSIONS = ['Driver'] + list(OPTION_COLUMNS.values())
+
+# Columns of the table returned by parse_file()
+COLUMNS = ('Phase', 'Workload', 'Try', 'Settings', 'Section', 'Metric', 'Value')
+
+# Prefix of the sections measured from the intended start times of a
+# throttled run ('measurement.interval=both', see omission.py)
+INTENDED_PREFIX = 'Intended-'
+
+# Friendly column names used by the plotting scripts, mapped to the
+# '<SECTION>.<Metric>' columns of the wide results frame
+METRIC_ALIASES = {
+    'RunTime': 'OVERALL.RunTime(ms)',
+    'Throughput': 'OVERALL.Throughput(ops/sec)',
+    'AvgReadLatency': 'READ.AverageLatency(us)',
+    'AvgUpdateLatency': 'UPDATE.AverageLatency(us)',
+    'AvgInsertLatency': 'INSERT.AverageLatency(us)',
+    'Read95thLatency': 'READ.95thPercentileLatency(us)',
+    'Update95thLatency': 'UPDATE.95thPercentileLatency(us)',
+    'Insert95thLatency': 'INSERT.95thPercentileLatency(us)',
+    'Read99thLatency': 'READ.99thPercentileLatency(us)',
+    'Update99thLatency': 'UPDATE.99thPercentileLatency(us)',
+    'Insert99thLatency': 'INSERT.99thPercentileLatency(us)',
+    'AvgScanLatency': 'SCAN.AverageLatency(us)',
+    'Scan95thLatency': 'SCAN.95thPercentileLatency(us)',
+    'Scan99thLatency': 'SCAN.99thPercentileLatency(us)',
+    'AvgReadModifyWriteLatency': 'READ-MODIFY-WRITE.AverageLatency(us)',
+    'ReadModifyWrite95thLatency': 'READ-MODIFY-WRITE.95thPercentileLatency(us)',
+    'ReadModifyWrite99thLatency': 'READ-MODIFY-WRITE.99thPercentileLatency(us)',
+    'CorrectedRead99thLatency': 'Intended-READ.99thPercentileLatency(us)',
+    'CorrectedUpdate99thLatency': 'Intended-UPDATE.99thPercentileLatency(us)',
+    'Threads': 'CONFIG.threads',
+    'Target': 'CONFIG.target',
+    'RecordCount': 'CONFIG.recordcount',
+    'Clients': 'CONFIG.clients',
+    'ServerMemory': 'FOOTPRINT.ServerMemory(bytes)',
+    'DataSize': 'FOOTPRINT.DataSize(bytes)',
+    'DiskSize': 'FOOTPRINT.DiskSize(bytes)',
+}
+
+
+def parse_header(line):
+    """Return (phase, workload, try, settings) for a section header line, or None.
+
+    'settings' is the configuration of the section ('threads=16 target=2000'),
+    which tells apart the sections of one try in a sweep or an option matrix.
+    """
+    match = HEADER_RE.match(line)
+    if not match:
+        return None
+    phase = 'load' if match.group(1) == 'Loading' else 'run'
+    return phase, match.group(2).upper(), int(match.group(3)), settings_key(line[match.end():])
+
+
+def settings_key(text):
+    """Canonical 'threads=16 target=2000' key of the 'key=value' tokens of a header."""
+    return ' '.join(f'{name}={value}' for name, value in HEADER_PARAM_RE.findall(text) if name not in FILE_SETTINGS)
+
+
+def settings_segment(settings):
+    """'-threads=16-target=2000' segment of the per-run log names of a settings key."""
+    return ''.join(f'-{token}' for token in settings.split())
+
+
+def segment_settings(segment):
+    """Settings key of a log name segment matched by SETTINGS_SEGMENT_RE."""
+    return ' '.join(segment.split('-')[1:]) if segment else ''
+
+
+def settings_columns(settings):
+    """Wide frame columns of a settings key: {'Threads': 16.0, 'WriteConcern': 'majority'} for 'threads=16 w=majority'.
+
+    The OPTION_COLUMNS are kept as text, as in wide_frame().
+    """
+    aliases = {column[len('CONFIG.'):]: alias for alias, column in METRIC_ALIASES.items()
+               if column.startswith('CONFIG.')}
+    columns = {}
+    for token in settings.split():
+        name, _, value = token.partition('=')
+        if name in OPTION_COLUMNS:
+            columns[OPTION_COLUMNS[name]] = value
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            continue
+        if name in aliases:
+            columns[aliases[name]] = number
+    return columns
+
+
+def parse_header_params(line):
+    """Return the [('CONFIG', name, value), ...] records of the 'key=value' tokens after a header."""
+    match = HEADER_RE.match(line)
+    if not match:
+        return []
+    records = []
+    for name, value in HEADER_PARAM_RE.findall(line[match.end():]):
+        try:
+            records.append(('CONFIG', name, float(value)))
+        except ValueError:
+            records.append(('CONFIG', f'{name}={value}', 1.0))
+    return records
+
+
+def parse_metric(line):
+    """Return (section, metric, value) for a YCSB metric line, or None."""
+    match = METRIC_RE.match(line)
+    if not match:
+        return None
+    try:
+        value = float(match.group(3))
+    except ValueError:
+        return None
+    return match.group(1), match.group(2).strip(), value
+
+
+def parse_filename(filename):
+    """Return (phase, database, nodes) encoded in a results filename, or None."""
+    match = FILENAME_RE.match(filename)
+    if not match:
+        return None
+    return match.group(1).lower(), match.group(2), int(match.group(3))
+
+
+def file_metadata(filename):
+    """Return the Database, Nodes and Driver columns of a results filename, or None."""
+    parsed = parse_filename(filename)
+    if not parsed:
+        return None
+    _, label, nodes = parsed
+    db_name, driver = DATABASE_DRIVERS.get(label, (label, ''))
+    return {'Database': db_name, 'Nodes': nodes, 'Driver': driver}
+
+
+def config_dimensions(df):
+    """Return the CONFIG_DIMENSIONS columns present in a wide results frame."""
+    return [column for column in CONFIG_DIMENSIONS if column in df.columns]
+
+
+def iter_records(lines):
+    """Yield one (phase, workload, try, settings, section, metric, value) tuple per metric line.
+
+    Metric lines that do not belong to a recognised section (e.g. lines before
+    the first header or after a '####' separator) are ignored.
+    """
+    header = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # A separator closes the current section
+        if line.startswith('#'):
+            header = None
+            continue
+
+        record = parse_metric(line) if header else None
+        if record:
+            # '[READ], 100, 117.6' lines are time-series buckets (see timeseries.py)
+            if not record[1].isdigit():
+                yield header + record
+            continue
+
+        # Anything else is either a new header or noise (driver logs, etc.)
+        parsed = parse_header(line)
+        if parsed:
+            header = parsed
+            for record in parse_header_params(line):
+                yield header + record
+
+
+def parse_file(path):
+    """Parse a results file into a columnar table (a dict of equal-length lists)."""
+    table = {column: [] for column in COLUMNS}
+    columns = [table[column] for column in COLUMNS]
+    with open(path, 'r') as file:
+        for record in iter_records(file):
+            for column, value in zip(columns, record):
+                column.append(value)
+    return table
+
+
+def to_frame(table, **metadata):
+    """Build a long DataFrame from a parsed table, adding constant metadata columns."""
+    import pandas as pd
+
+    df = pd.DataFrame(table, columns=list(COLUMNS))
+    for position, (name, value) in enumerate(metadata.items()):
+        df.insert(position, name, value)
+    return df
+
+
+def wide_frame(long_df):
+    """Pivot a long results frame into one row per try with a column per metric.
+
+    Metric columns are named '<SECTION>.<Metric>' and the friendly names of
+    METRIC_ALIASES are added for the metrics that are present.  Text header
+    settings and the OPTION_COLUMNS become one text column per setting (the
+    SETTING_COLUMNS become Engine and Deployment), empty for the tries that
+    did not set it.
+    """
+    import pandas as pd
+
+    if long_df.empty:
+        return pd.DataFrame()
+
+    index = [column for column in long_df.columns if column not in ('Section', 'Metric', 'Value')]
+    long_df = long_df.assign(Column=long_df['Section'] + '.' + long_df['Metric'])
+    df = long_df.pivot_table(index=index, columns='Column', values='Value', aggfunc='last')
+    df = df.reset_index()
+    df.columns.name = None
+
+    for alias, column in METRIC_ALIASES.items():
+        if column in df.columns:
+            df[alias] = df[column]
+
+    # Collapse the 'CONFIG.<name>=<value>' flags into a column per setting
+    settings = {}
+    for column in df.columns:
+        if column.startswith('CONFIG.'):
+            name, _, value = column[len('CONFIG.'):].partition('=')
+            if value or name in OPTION_COLUMNS:
+                settings.setdefault(name, []).append((column, value))
+    for name, columns in settings.items():
+        text = pd.Series('', index=df.index, dtype=object)
+        for column, value in columns:
+            present = df[column].notna()
+            text[present] = value or df.loc[present, column].map('{:g}'.format)
+        df = df.drop(columns=[column for column, _ in columns])
+        df[OPTION_COLUMNS.get(name, SETTING_COLUMNS.get(name, name))] = text
+    return df
+
+
+def parse_results_file(path):
+    """Parse a '<phase><Database><Nodes>.csv' file into a long DataFrame.
+
+    Returns None when the filename does not follow the results naming scheme.
+    """
+    metadata = file_metadata(os.path.basename(path))
+    if not metadata:
+        return None
+    return to_frame(parse_file(path), **metadata)